@@ -4,19 +4,95 @@
 Tracks user moods over time, provides insights, and identifies patterns.
 """
 
-import json
+import re
+import time
 import uuid
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 import numpy as np
-import pandas as pd
-from textblob import TextBlob
+import orjson
+
+from analytics.sentiment_lexicon import score_sentiment
+
+
+# Note themes, each compiled into one alternation so a note is scanned once per theme
+_THEME_KEYWORDS = {
+    "work_stress": ["work", "job", "boss", "deadline", "meeting", "colleague"],
+    "relationship": ["friend", "family", "partner", "relationship", "argue", "fight"],
+    "health": ["tired", "sick", "pain", "sleep", "energy", "health"],
+    "achievement": ["accomplished", "proud", "success", "goal", "achievement"],
+    "anxiety": ["worried", "anxious", "nervous", "scared", "panic"],
+    "gratitude": ["thankful", "grateful", "blessed", "appreciate"]
+}
+_THEME_PATTERNS = {
+    theme: re.compile("|".join(map(re.escape, keywords)))
+    for theme, keywords in _THEME_KEYWORDS.items()
+}
+_THEME_NAMES = tuple(_THEME_KEYWORDS)
+_THEME_INDEX = {theme: index for index, theme in enumerate(_THEME_NAMES)}
+_POSITIVE_WORDS_RE = re.compile("good|great|happy|love|wonderful|amazing")
+_NEGATIVE_WORDS_RE = re.compile("bad|terrible|hate|awful|sad|angry")
+
+# Mood value mappings (1-10 scale)
+_MOOD_VALUES = {
+    "terrible": 1,
+    "very_bad": 2,
+    "bad": 3,
+    "poor": 4,
+    "okay": 5,
+    "good": 6,
+    "very_good": 7,
+    "great": 8,
+    "excellent": 9,
+    "amazing": 10
+}
+
+# Reverse mapping, indexed directly by mood value (index 0 is unused)
+_VALUE_MOODS = (None,) + tuple(sorted(_MOOD_VALUES, key=_MOOD_VALUES.get))
+
+# Suggestions and encouragement per mood level, shared (immutable) by every mood log
+_MOOD_SUGGESTIONS = {
+    "low": (
+        "Consider reaching out to a friend or family member",
+        "Try some gentle breathing exercises",
+        "Take a short walk if possible",
+        "Listen to calming music",
+        "Consider professional support if feelings persist"
+    ),
+    "moderate": (
+        "Practice gratitude by listing 3 things you're thankful for",
+        "Engage in a creative activity",
+        "Connect with nature",
+        "Do some light exercise or stretching",
+        "Journal about your thoughts and feelings"
+    ),
+    "high": (
+        "Share your positive energy with others",
+        "Reflect on what's contributing to your good mood",
+        "Plan something nice for your future self",
+        "Practice mindfulness to stay present",
+        "Consider helping someone else who might need support"
+    )
+}
+_ENCOURAGEMENT_MESSAGES = {
+    "low": "I'm here for you. It's okay to have difficult days - they don't last forever. You're stronger than you know.",
+    "moderate": "You're doing well by checking in with yourself. Every small step towards wellness matters.",
+    "high": "It's wonderful to see you feeling good! Remember to appreciate these positive moments."
+}
+
+_SECONDS_PER_DAY = 86400
+_WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Cached analytics expire after this many seconds so the sliding date window stays fresh
+_ANALYTICS_CACHE_TTL = 60.0
 
 
 class MoodTracker:
     """Handles mood logging, tracking, and analytics"""
     
+    __slots__ = ("memory_manager", "_analytics_cache", "_cache_enabled")
+    
     def __init__(self, memory_manager):
         """
         Initialize mood tracker
@@ -26,26 +102,85 @@ class MoodTracker:
         """
         self.memory_manager = memory_manager
         
-        # Mood value mappings (1-10 scale)
-        self.mood_values = {
-            "terrible": 1,
-            "very_bad": 2,
-            "bad": 3,
-            "poor": 4,
-            "okay": 5,
-            "good": 6,
-            "very_good": 7,
-            "great": 8,
-            "excellent": 9,
-            "amazing": 10
-        }
+        # Analytics results keyed by (kind, days) -> (computed_at, result), cleared on every log
+        self._analytics_cache: Dict[Tuple[str, int], Tuple[float, Dict[str, Any]]] = {}
+        # Moods logged in another worker process can't clear this cache (see set_worker_count)
+        self._cache_enabled = True
         
-        # Reverse mapping
-        self.value_moods = {v: k for k, v in self.mood_values.items()}
+        # Entries logged before epoch/theme metadata existed can't be filtered or aggregated
+        self._backfill_entry_metadata()
         
         print("✅ Mood Tracker initialized successfully")
     
-    def log_mood(self, mood: str, note: str = "", context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def _backfill_entry_metadata(self):
+        """Add ts_epoch and note theme metadata to mood entries that were stored without it"""
+        try:
+            collection = self.memory_manager.mood_data_collection
+            results = collection.get(
+                where={"type": "mood_entry"},
+                include=["metadatas"]
+            )
+            
+            stale_ids = [
+                mood_id for mood_id, metadata in zip(results['ids'], results['metadatas'] or [])
+                if "ts_epoch" not in metadata or "themes" not in metadata
+            ]
+            if not stale_ids:
+                return
+            
+            # Only the stale entries need their documents parsed
+            stale = collection.get(ids=stale_ids, include=["documents", "metadatas"])
+            
+            mood_entries = [orjson.loads(doc) for doc in stale['documents']]
+            notes = [mood_data.get('note') or "" for mood_data in mood_entries]
+            theme_matrix = self._detect_note_themes(notes)
+            
+            metadatas = []
+            for mood_data, note, has_theme, metadata in zip(mood_entries, notes, theme_matrix, stale['metadatas']):
+                entry_time = datetime.fromisoformat(metadata['timestamp'].replace('Z', '+00:00'))
+                
+                note_analysis = {"themes": [_THEME_NAMES[i] for i in np.flatnonzero(has_theme)]} if note else None
+                sentiment = mood_data.get('note_sentiment') or (self._analyze_note_sentiment(note) if note else None)
+                
+                metadatas.append({
+                    **metadata,
+                    "ts_epoch": int(entry_time.timestamp()),
+                    **self._get_note_metadata(note_analysis, sentiment)
+                })
+            
+            collection.update(ids=stale['ids'], metadatas=metadatas)
+            print(f"✅ Backfilled metadata for {len(metadatas)} mood entries")
+                
+        except Exception as e:
+            print(f"❌ Error backfilling mood metadata: {e}")
+    
+    def _detect_note_themes(self, notes: List[str]) -> np.ndarray:
+        """Match every theme against a batch of notes, returning a notes x themes boolean matrix"""
+        if not notes:
+            return np.zeros((0, len(_THEME_NAMES)), dtype=bool)
+        
+        # pandas is only needed for this batch path, so import it lazily
+        import pandas as pd
+        
+        lowered = pd.Series(notes, dtype=object).str.lower()
+        return np.column_stack([
+            lowered.str.contains(_THEME_PATTERNS[theme].pattern, regex=True).to_numpy(dtype=bool)
+            for theme in _THEME_NAMES
+        ])
+    
+    def _get_note_metadata(self, note_analysis: Optional[Dict[str, Any]],
+                           sentiment: Optional[Dict[str, float]]) -> Dict[str, Any]:
+        """Flatten note themes and polarity into ChromaDB-compatible metadata fields"""
+        if not note_analysis:
+            return {"themes": ""}
+        
+        return {
+            "themes": "|".join(sorted(note_analysis.get("themes", []))),
+            "polarity": float(sentiment["polarity"]) if sentiment else 0.0
+        }
+    
+    def log_mood(self, mood: str, note: str = "", context: Dict[str, Any] = None,
+                 with_insights: bool = True) -> Dict[str, Any]:
         """
         Log a mood entry
         
@@ -53,6 +188,7 @@ class MoodTracker:
             mood: Mood value (string or numeric)
             note: Optional note about the mood
             context: Additional context (triggers, activities, etc.)
+            with_insights: Whether to build suggestions/encouragement for the entry
             
         Returns:
             Dictionary with logging result
@@ -65,104 +201,179 @@ class MoodTracker:
                 return {"success": False, "error": "Invalid mood value"}
             
             # Create mood entry
-            mood_id = str(uuid.uuid4())
-            timestamp = datetime.now(timezone.utc).isoformat()
-            
-            mood_data = {
-                "id": mood_id,
-                "mood_value": mood_value,
-                "mood_label": self.value_moods.get(mood_value, "unknown"),
-                "note": note,
-                "timestamp": timestamp,
-                "context": context or {}
-            }
-            
-            # Analyze sentiment of note if provided
-            if note:
-                sentiment = self._analyze_note_sentiment(note)
-                mood_data["note_sentiment"] = sentiment
-            
-            # Store in ChromaDB
-            content = json.dumps(mood_data, indent=2)
-            
-            metadata = {
-                "id": mood_id,
-                "mood_value": mood_value,
-                "timestamp": timestamp,
-                "type": "mood_entry",
-                "has_note": bool(note)
-            }
+            mood_data, content, metadata, note_analysis = self._build_mood_entry(mood_value, note, context)
             
             self.memory_manager.mood_data_collection.add(
-                ids=[mood_id],
+                ids=[mood_data["id"]],
                 documents=[content],
                 metadatas=[metadata]
             )
             
-            # Get insights for this mood entry
-            insights = self._get_mood_insights(mood_value, note)
+            # New data makes any cached analytics stale
+            self._analytics_cache.clear()
             
-            return {
+            result = {
                 "success": True,
                 "mood_entry": mood_data,
-                "insights": insights,
-                "timestamp": timestamp
+                "timestamp": mood_data["timestamp"]
             }
             
+            # Get insights for this mood entry
+            if with_insights:
+                result["insights"] = self._get_mood_insights(mood_value, note_analysis)
+            
+            return result
+            
         except Exception as e:
             print(f"❌ Error logging mood: {e}")
             return {"success": False, "error": str(e)}
     
-    def _parse_mood_value(self, mood) -> Optional[int]:
-        """Parse mood input to numeric value"""
-        try:
-            # If it's already a number
-            if isinstance(mood, (int, float)):
-                value = int(mood)
-                return value if 1 <= value <= 10 else None
+    def log_moods_bulk(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Log several mood entries with a single ChromaDB write
+        
+        Args:
+            entries: List of dicts with a "mood" value and optional "note", "context"
+                and "id" (generated when missing)
             
-            # If it's a string
-            mood_str = str(mood).lower().strip()
+        Returns:
+            Dictionary with the logged entries and any rejected inputs
+        """
+        try:
+            ids = []
+            documents = []
+            metadatas = []
+            mood_entries = []
+            errors = []
             
-            # Check if it's a numeric string
-            try:
-                value = int(float(mood_str))
-                return value if 1 <= value <= 10 else None
-            except ValueError:
-                pass
+            for index, entry in enumerate(entries):
+                mood_value = self._parse_mood_value(entry.get("mood")) if isinstance(entry, dict) else None
+                if mood_value is None:
+                    errors.append({"index": index, "error": "Invalid mood value"})
+                    continue
+                
+                mood_data, content, metadata, _ = self._build_mood_entry(
+                    mood_value, entry.get("note", ""), entry.get("context"), entry.get("id")
+                )
+                ids.append(mood_data["id"])
+                documents.append(content)
+                metadatas.append(metadata)
+                mood_entries.append(mood_data)
+            
+            if ids:
+                self.memory_manager.mood_data_collection.add(
+                    ids=ids,
+                    documents=documents,
+                    metadatas=metadatas
+                )
+                
+                # New data makes any cached analytics stale
+                self._analytics_cache.clear()
             
-            # Check if it's a mood label
-            return self.mood_values.get(mood_str)
+            return {
+                "success": True,
+                "logged": len(mood_entries),
+                "mood_entries": mood_entries,
+                "errors": errors
+            }
             
         except Exception as e:
-            print(f"❌ Error parsing mood value: {e}")
+            print(f"❌ Error logging mood entries: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def _build_mood_entry(self, mood_value: int, note: str = "", context: Dict[str, Any] = None,
+                          mood_id: Optional[str] = None
+                          ) -> Tuple[Dict[str, Any], str, Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Build the mood document, its serialized content, metadata and note analysis"""
+        mood_id = mood_id or str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        timestamp = now.isoformat()
+        
+        mood_data = {
+            "id": mood_id,
+            "mood_value": mood_value,
+            "mood_label": _VALUE_MOODS[mood_value] if 1 <= mood_value <= 10 else "unknown",
+            "note": note,
+            "timestamp": timestamp,
+            "context": context or {}
+        }
+        
+        # Analyze sentiment and themes of note if provided
+        note_analysis = None
+        if note:
+            mood_data["note_sentiment"] = self._analyze_note_sentiment(note)
+            note_analysis = self._analyze_note_content(note)
+        
+        # Compact JSON for storage; the document is never read by humans
+        content = orjson.dumps(mood_data).decode()
+        
+        metadata = {
+            "id": mood_id,
+            "mood_value": mood_value,
+            "timestamp": timestamp,
+            "ts_epoch": int(now.timestamp()),
+            "type": "mood_entry",
+            "has_note": bool(note),
+            **self._get_note_metadata(note_analysis, mood_data.get("note_sentiment"))
+        }
+        
+        return mood_data, content, metadata, note_analysis
+    
+    def _parse_mood_value(self, mood) -> Optional[int]:
+        """Parse mood input to numeric value"""
+        # Numeric input, the common case from the API
+        if isinstance(mood, int):
+            return int(mood) if 1 <= mood <= 10 else None
+        
+        # Floats truncate like int(); NaN and infinities fail the range check
+        if isinstance(mood, float):
+            return int(mood) if 1 <= mood < 11 else None
+        
+        mood_str = str(mood).strip().lower()
+        
+        # Plain integer strings
+        if mood_str.isdecimal():
+            value = int(mood_str)
+            return value if 1 <= value <= 10 else None
+        
+        # Mood labels
+        value = _MOOD_VALUES.get(mood_str)
+        if value is not None:
+            return value
+        
+        # Anything else must be a numeric string such as "7.5"
+        try:
+            number = float(mood_str)
+        except ValueError:
             return None
+        return int(number) if 1 <= number < 11 else None
     
     def _analyze_note_sentiment(self, note: str) -> Dict[str, float]:
         """Analyze sentiment of mood note"""
         try:
-            blob = TextBlob(note)
+            polarity, subjectivity = score_sentiment(note)
             
             return {
-                "polarity": blob.sentiment.polarity,  # -1 to 1
-                "subjectivity": blob.sentiment.subjectivity  # 0 to 1
+                "polarity": polarity,  # -1 to 1
+                "subjectivity": subjectivity  # 0 to 1
             }
             
         except Exception as e:
             print(f"❌ Error analyzing note sentiment: {e}")
             return {"polarity": 0.0, "subjectivity": 0.0}
     
-    def _get_mood_insights(self, mood_value: int, note: str = "") -> Dict[str, Any]:
+    def _get_mood_insights(self, mood_value: int, note_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get insights for a mood entry"""
+        level = self._get_mood_level(mood_value)
         insights = {
-            "level": self._get_mood_level(mood_value),
-            "suggestions": self._get_mood_suggestions(mood_value),
-            "encouragement": self._get_encouragement_message(mood_value)
+            "level": level,
+            "suggestions": _MOOD_SUGGESTIONS[level],
+            "encouragement": _ENCOURAGEMENT_MESSAGES[level]
         }
         
         # Add note-specific insights if note provided
-        if note:
-            insights["note_analysis"] = self._analyze_note_content(note)
+        if note_analysis:
+            insights["note_analysis"] = note_analysis
         
         return insights
     
@@ -175,41 +386,13 @@ class MoodTracker:
         else:
             return "high"
     
-    def _get_mood_suggestions(self, mood_value: int) -> List[str]:
+    def _get_mood_suggestions(self, mood_value: int) -> Tuple[str, ...]:
         """Get mood-appropriate suggestions"""
-        if mood_value <= 3:
-            return [
-                "Consider reaching out to a friend or family member",
-                "Try some gentle breathing exercises",
-                "Take a short walk if possible",
-                "Listen to calming music",
-                "Consider professional support if feelings persist"
-            ]
-        elif mood_value <= 6:
-            return [
-                "Practice gratitude by listing 3 things you're thankful for",
-                "Engage in a creative activity",
-                "Connect with nature",
-                "Do some light exercise or stretching",
-                "Journal about your thoughts and feelings"
-            ]
-        else:
-            return [
-                "Share your positive energy with others",
-                "Reflect on what's contributing to your good mood",
-                "Plan something nice for your future self",
-                "Practice mindfulness to stay present",
-                "Consider helping someone else who might need support"
-            ]
+        return _MOOD_SUGGESTIONS[self._get_mood_level(mood_value)]
     
     def _get_encouragement_message(self, mood_value: int) -> str:
         """Get encouraging message based on mood"""
-        if mood_value <= 3:
-            return "I'm here for you. It's okay to have difficult days - they don't last forever. You're stronger than you know."
-        elif mood_value <= 6:
-            return "You're doing well by checking in with yourself. Every small step towards wellness matters."
-        else:
-            return "It's wonderful to see you feeling good! Remember to appreciate these positive moments."
+        return _ENCOURAGEMENT_MESSAGES[self._get_mood_level(mood_value)]
     
     def _analyze_note_content(self, note: str) -> Dict[str, Any]:
         """Analyze mood note content for themes and patterns"""
@@ -217,114 +400,127 @@ class MoodTracker:
             note_lower = note.lower()
             
             # Common theme detection
-            themes = {
-                "work_stress": ["work", "job", "boss", "deadline", "meeting", "colleague"],
-                "relationship": ["friend", "family", "partner", "relationship", "argue", "fight"],
-                "health": ["tired", "sick", "pain", "sleep", "energy", "health"],
-                "achievement": ["accomplished", "proud", "success", "goal", "achievement"],
-                "anxiety": ["worried", "anxious", "nervous", "scared", "panic"],
-                "gratitude": ["thankful", "grateful", "blessed", "appreciate"]
-            }
-            
-            detected_themes = []
-            for theme, keywords in themes.items():
-                if any(keyword in note_lower for keyword in keywords):
-                    detected_themes.append(theme)
+            detected_themes = [
+                theme for theme, pattern in _THEME_PATTERNS.items()
+                if pattern.search(note_lower)
+            ]
             
             return {
                 "themes": detected_themes,
                 "word_count": len(note.split()),
-                "has_positive_words": any(word in note_lower for word in 
-                                        ["good", "great", "happy", "love", "wonderful", "amazing"]),
-                "has_negative_words": any(word in note_lower for word in 
-                                        ["bad", "terrible", "hate", "awful", "sad", "angry"])
+                "has_positive_words": _POSITIVE_WORDS_RE.search(note_lower) is not None,
+                "has_negative_words": _NEGATIVE_WORDS_RE.search(note_lower) is not None
             }
             
         except Exception as e:
             print(f"❌ Error analyzing note content: {e}")
             return {"themes": [], "word_count": 0}
     
+    def set_worker_count(self, workers: int):
+        """Tell the tracker how many worker processes serve the app; analytics caching needs exactly one"""
+        self._cache_enabled = workers == 1
+        if not self._cache_enabled:
+            self._analytics_cache.clear()
+    
+    def _get_cached_analytics(self, key: Tuple[str, int]) -> Optional[Dict[str, Any]]:
+        """Return a cached analytics result if it is still fresh"""
+        if not self._cache_enabled:
+            return None
+        cached = self._analytics_cache.get(key)
+        if cached and time.monotonic() - cached[0] < _ANALYTICS_CACHE_TTL:
+            return cached[1]
+        return None
+    
+    def _cache_analytics(self, key: Tuple[str, int], result: Dict[str, Any]) -> Dict[str, Any]:
+        """Store an analytics result and return it"""
+        if self._cache_enabled:
+            self._analytics_cache[key] = (time.monotonic(), result)
+        return result
+    
     def get_analytics(self, days: int = 7) -> Dict[str, Any]:
         """Get mood analytics for specified time period"""
+        cached = self._get_cached_analytics(("analytics", days))
+        if cached is not None:
+            return cached
+        
         try:
             # Calculate date range
             end_date = datetime.now(timezone.utc)
             start_date = end_date - timedelta(days=days)
             
             # Get mood entries from the period
-            mood_entries = self._get_mood_entries_in_range(start_date, end_date)
+            mood_values, ts_epochs, _ = self._get_mood_entries_in_range(start_date, end_date)
             
-            if not mood_entries:
-                return {
+            if not mood_values.size:
+                return self._cache_analytics(("analytics", days), {
                     "period": f"Last {days} days",
                     "total_entries": 0,
                     "message": "No mood entries found for this period"
-                }
+                })
             
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(mood_entries)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df['date'] = df['timestamp'].dt.date
+            # Shared statistics, computed once (sample standard deviation, as pandas reports)
+            avg_mood = float(mood_values.mean())
+            mood_std = float(mood_values.std(ddof=1)) if mood_values.size > 1 else 0.0
+            trend = self._calculate_mood_trend(mood_values)
             
             analytics = {
                 "period": f"Last {days} days",
-                "total_entries": len(mood_entries),
-                "average_mood": float(df['mood_value'].mean()),
-                "mood_trend": self._calculate_mood_trend(df),
-                "mood_distribution": self._get_mood_distribution(df),
-                "daily_summary": self._get_daily_summary(df),
-                "insights": self._generate_analytics_insights(df),
-                "recommendations": self._get_analytics_recommendations(df)
+                "total_entries": int(mood_values.size),
+                "average_mood": avg_mood,
+                "mood_trend": trend,
+                "mood_distribution": self._get_mood_distribution(mood_values),
+                "daily_summary": self._get_daily_summary(mood_values, ts_epochs),
+                "insights": self._generate_analytics_insights(avg_mood, trend, mood_std),
+                "recommendations": self._get_analytics_recommendations(avg_mood, trend)
             }
             
-            return analytics
+            return self._cache_analytics(("analytics", days), analytics)
             
         except Exception as e:
             print(f"❌ Error generating analytics: {e}")
             return {"error": str(e)}
     
-    def _get_mood_entries_in_range(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
-        """Get mood entries within date range"""
+    def _get_mood_entries_in_range(self, start_date: datetime,
+                                   end_date: datetime) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """Get mood values, epoch timestamps and note themes within date range, oldest first"""
         try:
-            # Get all mood entries
+            # Let ChromaDB filter on the epoch metadata; analytics only needs metadata fields
             results = self.memory_manager.mood_data_collection.get(
-                where={"type": "mood_entry"},
-                include=["documents", "metadatas"]
+                where={
+                    "$and": [
+                        {"type": "mood_entry"},
+                        {"ts_epoch": {"$gte": int(start_date.timestamp())}},
+                        {"ts_epoch": {"$lte": int(end_date.timestamp())}}
+                    ]
+                },
+                include=["metadatas"]
             )
             
-            mood_entries = []
-            if results['documents']:
-                for i, doc in enumerate(results['documents']):
-                    try:
-                        mood_data = json.loads(doc)
-                        entry_time = datetime.fromisoformat(mood_data['timestamp'].replace('Z', '+00:00'))
-                        
-                        if start_date <= entry_time <= end_date:
-                            mood_entries.append(mood_data)
-                    except Exception as e:
-                        print(f"❌ Error parsing mood entry: {e}")
-                        continue
-            
-            # Sort by timestamp
-            mood_entries.sort(key=lambda x: x['timestamp'])
-            
-            return mood_entries
+            # Sort by timestamp (the ISO string keeps sub-second order that ts_epoch drops)
+            metadatas = sorted(results['metadatas'] or [], key=lambda x: x['timestamp'])
+            
+            count = len(metadatas)
+            mood_values = np.fromiter((m['mood_value'] for m in metadatas), dtype=np.int8, count=count)
+            ts_epochs = np.fromiter((m['ts_epoch'] for m in metadatas), dtype=np.int64, count=count)
+            note_themes = [m.get('themes', "") for m in metadatas]
+            
+            return mood_values, ts_epochs, note_themes
             
         except Exception as e:
             print(f"❌ Error getting mood entries: {e}")
-            return []
+            return np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int64), []
     
-    def _calculate_mood_trend(self, df: pd.DataFrame) -> str:
+    def _calculate_mood_trend(self, mood_values: np.ndarray) -> str:
         """Calculate overall mood trend"""
         try:
-            if len(df) < 2:
+            n = mood_values.size
+            if n < 2:
                 return "insufficient_data"
             
-            # Calculate trend using linear regression
-            x = np.arange(len(df))
-            y = df['mood_value'].values
-            
-            slope = np.polyfit(x, y, 1)[0]
+            # Least-squares slope against x = 0..n-1, in closed form
+            y = mood_values.astype(np.float64)
+            x_centered = np.arange(n) - (n - 1) / 2
+            slope = float(x_centered @ (y - y.mean())) / (n * (n * n - 1) / 12)
             
             if slope > 0.1:
                 return "improving"
@@ -337,52 +533,62 @@ class MoodTracker:
             print(f"❌ Error calculating trend: {e}")
             return "unknown"
     
-    def _get_mood_distribution(self, df: pd.DataFrame) -> Dict[str, int]:
+    def _get_mood_distribution(self, mood_values: np.ndarray) -> Dict[str, int]:
         """Get distribution of mood levels"""
         try:
-            distribution = {
-                "low": len(df[df['mood_value'] <= 3]),
-                "moderate": len(df[(df['mood_value'] > 3) & (df['mood_value'] <= 6)]),
-                "high": len(df[df['mood_value'] > 6])
-            }
+            # Bucket 0: 1-3 (low), 1: 4-6 (moderate), 2: 7-10 (high)
+            counts = np.bincount(np.digitize(mood_values, [4, 7]), minlength=3)
             
-            return distribution
+            return {
+                "low": int(counts[0]),
+                "moderate": int(counts[1]),
+                "high": int(counts[2])
+            }
             
         except Exception as e:
             print(f"❌ Error calculating distribution: {e}")
             return {"low": 0, "moderate": 0, "high": 0}
     
-    def _get_daily_summary(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _get_daily_summary(self, mood_values: np.ndarray, ts_epochs: np.ndarray) -> List[Dict[str, Any]]:
         """Get daily mood summary"""
         try:
-            daily_summary = []
-            
-            for date, group in df.groupby('date'):
-                summary = {
-                    "date": date.isoformat(),
-                    "entries": len(group),
-                    "average_mood": float(group['mood_value'].mean()),
+            # Entries are sorted by time, so each UTC day is a contiguous run
+            day_numbers = ts_epochs // _SECONDS_PER_DAY
+            days, starts, counts = np.unique(day_numbers, return_index=True, return_counts=True)
+            values = mood_values.astype(np.int64)
+            sums = np.add.reduceat(values, starts)
+            minimums = np.minimum.reduceat(values, starts)
+            maximums = np.maximum.reduceat(values, starts)
+            
+            # Day numbers count days since the epoch, so they convert straight to ISO dates
+            dates = days.astype("datetime64[D]").astype(str)
+            averages = sums / counts
+            
+            # Convert to Python types only at the JSON boundary
+            return [
+                {
+                    "date": date,
+                    "entries": count,
+                    "average_mood": average,
                     "mood_range": {
-                        "min": int(group['mood_value'].min()),
-                        "max": int(group['mood_value'].max())
+                        "min": minimum,
+                        "max": maximum
                     }
                 }
-                daily_summary.append(summary)
-            
-            return daily_summary
+                for date, count, average, minimum, maximum in zip(
+                    dates.tolist(), counts.tolist(), averages.tolist(), minimums.tolist(), maximums.tolist()
+                )
+            ]
             
         except Exception as e:
             print(f"❌ Error generating daily summary: {e}")
             return []
     
-    def _generate_analytics_insights(self, df: pd.DataFrame) -> List[str]:
+    def _generate_analytics_insights(self, avg_mood: float, trend: str, mood_std: float) -> List[str]:
         """Generate insights from mood analytics"""
         insights = []
         
         try:
-            avg_mood = df['mood_value'].mean()
-            trend = self._calculate_mood_trend(df)
-            
             # Average mood insights
             if avg_mood >= 7:
                 insights.append("Your overall mood has been quite positive recently!")
@@ -400,7 +606,6 @@ class MoodTracker:
                 insights.append("Your mood has been relatively stable.")
             
             # Consistency insights
-            mood_std = df['mood_value'].std()
             if mood_std > 2:
                 insights.append("Your mood varies quite a bit - tracking patterns might help identify triggers.")
             else:
@@ -412,14 +617,11 @@ class MoodTracker:
             print(f"❌ Error generating insights: {e}")
             return ["Unable to generate insights from current data."]
     
-    def _get_analytics_recommendations(self, df: pd.DataFrame) -> List[str]:
+    def _get_analytics_recommendations(self, avg_mood: float, trend: str) -> List[str]:
         """Get recommendations based on analytics"""
         recommendations = []
         
         try:
-            avg_mood = df['mood_value'].mean()
-            trend = self._calculate_mood_trend(df)
-            
             if avg_mood < 5:
                 recommendations.extend([
                     "Consider establishing a daily self-care routine",
@@ -446,80 +648,110 @@ class MoodTracker:
     
     def get_mood_patterns(self, days: int = 30) -> Dict[str, Any]:
         """Identify mood patterns over time"""
+        cached = self._get_cached_analytics(("patterns", days))
+        if cached is not None:
+            return cached
+        
         try:
             end_date = datetime.now(timezone.utc)
             start_date = end_date - timedelta(days=days)
             
-            mood_entries = self._get_mood_entries_in_range(start_date, end_date)
+            mood_values, ts_epochs, note_themes = self._get_mood_entries_in_range(start_date, end_date)
             
-            if not mood_entries:
-                return {"patterns": [], "message": "Not enough data for pattern analysis"}
+            if not mood_values.size:
+                return self._cache_analytics(
+                    ("patterns", days),
+                    {"patterns": [], "message": "Not enough data for pattern analysis"}
+                )
             
-            df = pd.DataFrame(mood_entries)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df['hour'] = df['timestamp'].dt.hour
-            df['day_of_week'] = df['timestamp'].dt.day_name()
+            # UTC hour of day and weekday (Monday = 0) straight from the epoch seconds
+            hours = (ts_epochs // 3600) % 24
+            weekdays = (ts_epochs // _SECONDS_PER_DAY + 3) % 7
             
             patterns = {
-                "time_of_day": self._analyze_hourly_patterns(df),
-                "day_of_week": self._analyze_weekly_patterns(df),
-                "note_themes": self._analyze_theme_patterns(df)
+                "time_of_day": self._analyze_hourly_patterns(mood_values, hours),
+                "day_of_week": self._analyze_weekly_patterns(mood_values, weekdays),
+                "note_themes": self._analyze_theme_patterns(mood_values, note_themes)
             }
             
-            return {"patterns": patterns, "period": f"Last {days} days"}
+            return self._cache_analytics(
+                ("patterns", days),
+                {"patterns": patterns, "period": f"Last {days} days"}
+            )
             
         except Exception as e:
             print(f"❌ Error analyzing patterns: {e}")
             return {"error": str(e)}
     
-    def _analyze_hourly_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _bucket_means(self, keys: np.ndarray, mood_values: np.ndarray, size: int) -> np.ndarray:
+        """Average mood value per bucket 0..size-1, NaN where a bucket has no entries"""
+        sums = np.bincount(keys, weights=mood_values, minlength=size)
+        counts = np.bincount(keys, minlength=size)
+        with np.errstate(invalid="ignore"):
+            return sums / counts
+    
+    def _analyze_hourly_patterns(self, mood_values: np.ndarray, hours: np.ndarray) -> Dict[str, Any]:
         """Analyze mood patterns by hour of day"""
         try:
-            hourly_mood = df.groupby('hour')['mood_value'].mean()
+            means = self._bucket_means(hours, mood_values, 24)
+            present = np.flatnonzero(~np.isnan(means))
             
-            best_hour = int(hourly_mood.idxmax()) if not hourly_mood.empty else None
-            worst_hour = int(hourly_mood.idxmin()) if not hourly_mood.empty else None
+            best_hour = int(np.nanargmax(means)) if present.size else None
+            worst_hour = int(np.nanargmin(means)) if present.size else None
             
             return {
                 "best_time": f"{best_hour}:00" if best_hour is not None else None,
                 "worst_time": f"{worst_hour}:00" if worst_hour is not None else None,
-                "hourly_averages": hourly_mood.to_dict()
+                "hourly_averages": {int(hour): float(means[hour]) for hour in present}
             }
             
         except Exception as e:
             print(f"❌ Error analyzing hourly patterns: {e}")
             return {}
     
-    def _analyze_weekly_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_weekly_patterns(self, mood_values: np.ndarray, weekdays: np.ndarray) -> Dict[str, Any]:
         """Analyze mood patterns by day of week"""
         try:
-            daily_mood = df.groupby('day_of_week')['mood_value'].mean()
+            means = self._bucket_means(weekdays, mood_values, 7)
+            present = np.flatnonzero(~np.isnan(means))
             
-            best_day = daily_mood.idxmax() if not daily_mood.empty else None
-            worst_day = daily_mood.idxmin() if not daily_mood.empty else None
+            best_day = _WEEKDAY_NAMES[np.nanargmax(means)] if present.size else None
+            worst_day = _WEEKDAY_NAMES[np.nanargmin(means)] if present.size else None
             
             return {
                 "best_day": best_day,
                 "worst_day": worst_day,
-                "daily_averages": daily_mood.to_dict()
+                "daily_averages": {_WEEKDAY_NAMES[day]: float(means[day]) for day in present}
             }
             
         except Exception as e:
             print(f"❌ Error analyzing weekly patterns: {e}")
             return {}
     
-    def _analyze_theme_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_theme_patterns(self, mood_values: np.ndarray, note_themes: List[str]) -> Dict[str, Any]:
         """Analyze themes from mood notes"""
         try:
-            # This would require the note analysis to be stored
-            # For now, return placeholder
+            # Boolean entry x theme matrix from the "|"-joined theme metadata
+            has_theme = np.zeros((len(note_themes), len(_THEME_NAMES)), dtype=bool)
+            for row, themes in enumerate(note_themes):
+                for theme in themes.split("|") if themes else ():
+                    column = _THEME_INDEX.get(theme)
+                    if column is not None:
+                        has_theme[row, column] = True
+            
+            counts = has_theme.sum(axis=0)
+            present = np.flatnonzero(counts)
+            if not present.size:
+                return {"common_themes": [], "theme_impact": {}}
+            
+            # Impact = average mood when a theme is mentioned minus the overall average
+            theme_means = (mood_values.astype(np.float64) @ has_theme)[present] / counts[present]
+            impact = theme_means - mood_values.mean()
+            order = np.argsort(-counts[present], kind="stable")
+            
             return {
-                "common_themes": ["work_stress", "social_connection", "self_care"],
-                "theme_impact": {
-                    "work_stress": -1.2,
-                    "social_connection": 1.5,
-                    "self_care": 2.1
-                }
+                "common_themes": [_THEME_NAMES[present[i]] for i in order[:3]],
+                "theme_impact": {_THEME_NAMES[present[i]]: round(float(impact[i]), 2) for i in order}
             }
             
         except Exception as e:
@@ -5,11 +5,188 @@ Analyzes emotional tone and sentiment of user messages to provide
 better contextual responses and insights.
 """
 
+import functools
+import logging
+import os
 import re
-from typing import Dict, List, Any, Optional
-from textblob import TextBlob
+import string
+import threading
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Set, Tuple
 import numpy as np
 
+from analytics.sentiment_lexicon import get_sentiment_lexicon, score_sentiment
+
+logger = logging.getLogger(f"wellness.{__name__}")
+
+
+_MENTAL_HEALTH_KEYWORDS = {
+    "depression_signs": (
+        "hopeless", "worthless", "empty", "numb", "exhausted",
+        "can't sleep", "no energy", "don't care", "giving up",
+        "pointless", "useless", "burden"
+    ),
+    "anxiety_signs": (
+        "panic", "racing thoughts", "can't breathe", "heart racing",
+        "sweating", "shaking", "dizzy", "nauseous", "restless",
+        "on edge", "jumpy"
+    ),
+    "stress_indicators": (
+        "overwhelmed", "pressure", "deadline", "too much",
+        "can't handle", "breaking point", "stressed out",
+        "burned out", "exhausted"
+    ),
+    "positive_coping": (
+        "meditation", "exercise", "therapy", "counseling",
+        "support group", "self care", "journaling", "mindfulness",
+        "breathing exercises", "talking to someone"
+    ),
+    "support_seeking": (
+        "need help", "talk to someone", "therapist", "counselor",
+        "support", "advice", "guidance", "professional help"
+    ),
+    "crisis_indicators": (
+        "end it all", "can't go on", "no point", "better off dead",
+        "hurt myself", "suicide", "kill myself", "end my life"
+    )
+}
+
+_URGENCY_PATTERNS = (
+    ("crisis", frozenset((
+        "end it all", "can't go on", "hurt myself", "kill myself",
+        "suicide", "end my life", "no point living"
+    ))),
+    ("high", frozenset((
+        "emergency", "urgent", "crisis", "immediate help",
+        "can't breathe", "panic attack", "breaking down"
+    ))),
+    ("medium", frozenset((
+        "really struggling", "need help", "can't handle",
+        "breaking point", "overwhelmed", "desperate"
+    )))
+)
+# Emotions that tip an otherwise neutral polarity towards a sentiment
+_NEGATIVE_EMOTIONS = frozenset(("sadness", "fear", "anger", "disgust"))
+_POSITIVE_EMOTIONS = frozenset(("joy", "trust", "anticipation"))
+
+# Analyses of recent messages are memoized; longer texts bypass the cache
+_ANALYSIS_CACHE_SIZE = 4096
+_MAX_CACHED_TEXT_LENGTH = 2000
+
+# Upper bound on distinct words remembered by the emotion lookup
+_WORD_EMOTIONS_CACHE_SIZE = 50000
+
+# Inflections accepted after an emotion keyword stem, so "happily" and "crying"
+# match while "unhappy", "average" (rage) or "crystal" (cry) do not
+_WORD_PUNCTUATION = string.punctuation
+_BASE_SUFFIXES = frozenset(("", "s", "es", "ed", "ing", "ly", "ness", "er", "est", "ful", "fully"))
+_Y_SUFFIXES = frozenset(("y", "ies", "ied", "ying", "ier", "iest", "ily", "iness"))
+_E_SUFFIXES = frozenset(("e", "es", "ed", "ing", "ely", "eness", "er", "est"))
+_PARTICIPLE_SUFFIXES = frozenset(("ing", "ingly"))
+_DOUBLED_SUFFIXES = ("ed", "ing", "er", "est", "en", "ening")
+_VOWELS = frozenset("aeiou")
+
+_URGENCY_LEVELS = ("low", "medium", "high", "crisis")
+_URGENCY_CODES = {level: code for code, level in enumerate(_URGENCY_LEVELS)}
+
+_CONTRACTIONS = {
+    "won't": "will not",
+    "can't": "cannot",
+    "n't": " not",
+    "'re": " are",
+    "'ve": " have",
+    "'ll": " will",
+    "'d": " would",
+    "'m": " am"
+}
+
+# Longest first so "won't" and "can't" win over the generic "n't"
+_CONTRACTION_RE = re.compile(
+    "|".join(map(re.escape, sorted(_CONTRACTIONS, key=len, reverse=True)))
+)
+_PUNCTUATION_RE = re.compile(r'!{2,}|\?{2,}|\.{3,}')
+_COLLAPSED_PUNCTUATION = {"!": "!", "?": "?", ".": "..."}
+
+# Read-only result templates, copied by _copy_analysis before being handed out
+_EMPTY_INDICATORS = MappingProxyType({category: () for category in _MENTAL_HEALTH_KEYWORDS})
+
+_NEUTRAL_SENTIMENT = MappingProxyType({
+    "overall_sentiment": "neutral",
+    "polarity": 0.0,
+    "subjectivity": 0.0,
+    "emotions": MappingProxyType({}),
+    "mental_health_indicators": _EMPTY_INDICATORS,
+    "urgency_level": "low",
+    "insights": ("No text provided for analysis",),
+    "confidence": 0.0
+})
+
+_ERROR_SENTIMENT = MappingProxyType({
+    **_NEUTRAL_SENTIMENT,
+    "overall_sentiment": "unknown",
+    "insights": ("Error occurred during sentiment analysis",)
+})
+
+
+def _expand_contraction(match) -> str:
+    """Replacement callback for a matched contraction"""
+    return _CONTRACTIONS[match.group(0)]
+
+
+def _collapse_punctuation(match) -> str:
+    """Replacement callback for a run of repeated punctuation"""
+    return _COLLAPSED_PUNCTUATION[match.group(0)[0]]
+
+
+def _keyword_stems(keyword: str) -> List[Tuple[str, frozenset]]:
+    """Derive (stem, allowed suffixes) pairs covering the inflected forms of a keyword"""
+    if " " in keyword or "'" in keyword:
+        return []  # Phrases never match a single word
+    
+    if keyword.endswith("y") and keyword[-2] not in _VOWELS:
+        return [(keyword[:-1], _Y_SUFFIXES)]
+    if keyword.endswith("e"):
+        return [(keyword[:-1], _E_SUFFIXES)]
+    
+    suffixes = set(_BASE_SUFFIXES)
+    
+    # Short consonant-vowel-consonant words double their last letter ("sadder", "madden")
+    if (len(keyword) <= 4 and keyword[-1] not in _VOWELS and keyword[-1] not in "wxy"
+            and keyword[-2] in _VOWELS and keyword[-3] not in _VOWELS):
+        suffixes.update(keyword[-1] + suffix for suffix in _DOUBLED_SUFFIXES)
+    stems = [(keyword, frozenset(suffixes))]
+    
+    # Participles also cover their present forms ("terrified" -> "terrifying", "annoyed" -> "annoying")
+    if keyword.endswith("ied"):
+        stems.append((keyword[:-3], frozenset(("y", "ies", "ying", "yingly"))))
+    elif keyword.endswith("ed"):
+        stems.append((keyword[:-2], _PARTICIPLE_SUFFIXES))
+    return stems
+
+
+def _build_signal_matcher():
+    """Compile every signal keyword into one pattern scanned once per message"""
+    keywords = set()
+    for category_keywords in _MENTAL_HEALTH_KEYWORDS.values():
+        keywords.update(category_keywords)
+    for _, patterns in _URGENCY_PATTERNS:
+        keywords.update(patterns)
+    
+    # The lookahead reports the longest keyword starting at every position, so
+    # overlapping matches are kept; shorter keywords nested inside a match are
+    # recovered through the containment table.
+    ordered = sorted(keywords, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+    contained = {
+        keyword: tuple(other for other in ordered if other in keyword)
+        for keyword in ordered
+    }
+    return pattern, contained
+
+
+_SIGNAL_RE, _CONTAINED_KEYWORDS = _build_signal_matcher()
+
 
 class SentimentAnalyzer:
     """Analyzes sentiment and emotional tone of user messages"""
@@ -19,7 +196,31 @@ class SentimentAnalyzer:
         self.emotion_keywords = self._load_emotion_keywords()
         self.intensity_modifiers = self._load_intensity_modifiers()
         
-        print("✅ Sentiment Analyzer initialized successfully")
+        # TextBlob gives the same scores as the lexicon scorer but is much slower to run
+        self.use_textblob = os.getenv('SENTIMENT_USE_TEXTBLOB', 'False').lower() == 'true'
+        self._cached_analyze = functools.lru_cache(maxsize=_ANALYSIS_CACHE_SIZE)(self._analyze_text)
+        self._emotion_order = tuple(self.emotion_keywords)
+        self._emotion_index = {emotion: i for i, emotion in enumerate(self._emotion_order)}
+        self._emotion_sentiments = np.array([
+            "negative" if emotion in _NEGATIVE_EMOTIONS
+            else "positive" if emotion in _POSITIVE_EMOTIONS
+            else "neutral"
+            for emotion in self.emotion_keywords
+        ])
+        
+        # Word -> emotion columns lookup, seeded with the keywords themselves
+        self._emotion_trie = self._build_emotion_trie()
+        self._word_emotions = {}
+        for keywords in self.emotion_keywords.values():
+            for keyword in keywords:
+                self._get_word_emotions(keyword)
+        
+        # Parse the polarity lexicon now rather than during the first analyzed message
+        if not self.use_textblob:
+            try:
+                get_sentiment_lexicon()
+            except Exception:
+                logger.warning("Could not preload the sentiment lexicon", exc_info=True)
     
     def _load_emotion_keywords(self) -> Dict[str, List[str]]:
         """Load emotion keyword dictionaries"""
@@ -90,7 +291,7 @@ class SentimentAnalyzer:
             "hardly": 0.4,
             "scarcely": 0.4,
             
-            # Negations (handled separately)
+            # Negations (multiply by -1.0 to flip the emotion)
             "not": -1.0,
             "no": -1.0,
             "never": -1.0,
@@ -113,242 +314,223 @@ class SentimentAnalyzer:
             if not text or not text.strip():
                 return self._get_neutral_sentiment()
             
-            # Clean and preprocess text
-            cleaned_text = self._preprocess_text(text)
-            
-            # Basic sentiment analysis using TextBlob
-            blob_sentiment = self._get_textblob_sentiment(cleaned_text)
-            
-            # Emotion detection
-            emotions = self._detect_emotions(cleaned_text)
-            
-            # Mental health indicators
-            mental_health_indicators = self._detect_mental_health_indicators(cleaned_text)
-            
-            # Urgency detection
-            urgency_level = self._detect_urgency(cleaned_text)
+            # Long messages are nearly always unique, so keep them out of the cache
+            if len(text) > _MAX_CACHED_TEXT_LENGTH:
+                return self._analyze_text(text)
             
-            # Overall sentiment classification
-            overall_sentiment = self._classify_overall_sentiment(blob_sentiment, emotions)
-            
-            # Generate insights
-            insights = self._generate_sentiment_insights(
-                overall_sentiment, emotions, mental_health_indicators, urgency_level
-            )
-            
-            return {
-                "overall_sentiment": overall_sentiment,
-                "polarity": blob_sentiment["polarity"],
-                "subjectivity": blob_sentiment["subjectivity"],
-                "emotions": emotions,
-                "mental_health_indicators": mental_health_indicators,
-                "urgency_level": urgency_level,
-                "insights": insights,
-                "confidence": self._calculate_confidence(blob_sentiment, emotions)
-            }
+            return self._copy_analysis(self._cached_analyze(text))
             
-        except Exception as e:
-            print(f"❌ Error in sentiment analysis: {e}")
+        except Exception:
+            logger.exception("Error in sentiment analysis")
             return self._get_error_sentiment()
     
-    def _preprocess_text(self, text: str) -> str:
-        """Clean and preprocess text for analysis"""
-        # Convert to lowercase
-        text = text.lower()
+    def _analyze_text(self, text: str) -> Dict[str, Any]:
+        """Run the full analysis pipeline on non-empty text"""
+        # Clean and preprocess text
+        cleaned_text = self._preprocess_text(text)
         
-        # Remove excessive punctuation
-        text = re.sub(r'[!]{2,}', '!', text)
-        text = re.sub(r'[?]{2,}', '?', text)
-        text = re.sub(r'[.]{3,}', '...', text)
+        # Basic sentiment analysis from the polarity lexicon
+        blob_sentiment = self._get_lexicon_sentiment(cleaned_text)
         
-        # Handle contractions
-        contractions = {
-            "won't": "will not",
-            "can't": "cannot",
-            "n't": " not",
-            "'re": " are",
-            "'ve": " have",
-            "'ll": " will",
-            "'d": " would",
-            "'m": " am"
-        }
+        # Emotion detection
+        emotions = self._detect_emotions(cleaned_text)
+        
+        # Mental health indicators and urgency share a single keyword scan
+        found_keywords = self._find_signal_keywords(cleaned_text)
+        mental_health_indicators = self._detect_mental_health_indicators(
+            cleaned_text, found_keywords
+        )
+        
+        # Urgency detection
+        urgency_level = self._detect_urgency(cleaned_text, found_keywords)
+        
+        # Overall sentiment classification
+        overall_sentiment = self._classify_overall_sentiment(blob_sentiment, emotions)
         
-        for contraction, expansion in contractions.items():
-            text = text.replace(contraction, expansion)
+        # Generate insights
+        insights = self._generate_sentiment_insights(
+            overall_sentiment, emotions, mental_health_indicators, urgency_level
+        )
         
-        return text
+        return {
+            "overall_sentiment": overall_sentiment,
+            "polarity": blob_sentiment["polarity"],
+            "subjectivity": blob_sentiment["subjectivity"],
+            "emotions": self._emotions_to_dict(emotions),
+            "mental_health_indicators": mental_health_indicators,
+            "urgency_level": urgency_level,
+            "insights": insights,
+            "confidence": self._calculate_confidence(blob_sentiment, emotions)
+        }
     
-    def _get_textblob_sentiment(self, text: str) -> Dict[str, float]:
-        """Get sentiment using TextBlob"""
+    def _copy_analysis(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a cached analysis or result template so callers can mutate it freely"""
+        result = dict(analysis)
+        result["emotions"] = dict(analysis["emotions"])
+        result["mental_health_indicators"] = {
+            category: list(keywords)
+            for category, keywords in analysis["mental_health_indicators"].items()
+        }
+        result["insights"] = list(analysis["insights"])
+        return result
+    
+    def _preprocess_text(self, text: str) -> str:
+        """Clean and preprocess text for analysis"""
+        # Convert to lowercase and remove excessive punctuation
+        text = _PUNCTUATION_RE.sub(_collapse_punctuation, text.lower())
+        
+        # Handle contractions
+        return _CONTRACTION_RE.sub(_expand_contraction, text)
+    
+    def _get_lexicon_sentiment(self, text: str) -> Dict[str, float]:
+        """Get polarity and subjectivity from the sentiment lexicon"""
         try:
-            blob = TextBlob(text)
-            return {
-                "polarity": blob.sentiment.polarity,
-                "subjectivity": blob.sentiment.subjectivity
-            }
-        except Exception as e:
-            print(f"❌ Error in TextBlob sentiment: {e}")
+            if self.use_textblob:
+                return self._get_textblob_sentiment(text)
+            
+            polarity, subjectivity = score_sentiment(text)
+            return {"polarity": polarity, "subjectivity": subjectivity}
+        except Exception:
+            logger.exception("Error in lexicon sentiment")
             return {"polarity": 0.0, "subjectivity": 0.0}
     
-    def _detect_emotions(self, text: str) -> Dict[str, float]:
-        """Detect emotions in text using keyword matching"""
-        emotion_scores = {}
+    def _get_textblob_sentiment(self, text: str) -> Dict[str, float]:
+        """Get sentiment using TextBlob"""
+        from textblob import TextBlob
+        
+        blob = TextBlob(text)
+        return {
+            "polarity": blob.sentiment.polarity,
+            "subjectivity": blob.sentiment.subjectivity
+        }
+    
+    def _detect_emotions(self, text: str) -> List[float]:
+        """Detect emotions in text using keyword matching, as scores in _emotion_order"""
+        # Scores accumulate by emotion column, in _emotion_order
+        scores = [0.0] * len(self._emotion_order)
         words = text.split()
         
-        for emotion, keywords in self.emotion_keywords.items():
-            score = 0.0
+        # Resolve every word through the memo with C-level map, then visit only the hits.
+        # Words not seen before are filled in place rather than rebuilding the list.
+        word_columns = list(map(self._word_emotions.get, words))
+        if None in word_columns:
+            for i, columns in enumerate(word_columns):
+                if columns is None:
+                    word_columns[i] = self._get_word_emotions(words[i])
+        
+        # Short acknowledgements ("ok", "thanks") usually have no emotion words
+        if not any(word_columns):
+            return [0.0] * len(self._emotion_order)
+        
+        get_modifier = self.intensity_modifiers.get
+        for i, columns in filter(itemgetter(1), enumerate(word_columns)):
+            # Apply intensity modifiers; negations are stored as -1.0 and flip the score
+            base_score = get_modifier(words[i-1], 1.0) if i else 1.0
             
-            for i, word in enumerate(words):
-                # Check if word matches emotion keyword
-                if any(keyword in word for keyword in keywords):
-                    base_score = 1.0
-                    
-                    # Apply intensity modifiers
-                    if i > 0:
-                        prev_word = words[i-1]
-                        if prev_word in self.intensity_modifiers:
-                            modifier = self.intensity_modifiers[prev_word]
-                            if modifier < 0:  # Negation
-                                base_score *= -1
-                            else:
-                                base_score *= modifier
-                    
-                    score += base_score
-            
-            # Normalize score
-            emotion_scores[emotion] = min(score / max(len(words) / 10, 1), 1.0)
+            for column in columns:
+                scores[column] += base_score
         
-        return emotion_scores
+        # Normalize scores
+        scale = max(len(words) / 10, 1)
+        return [min(score / scale, 1.0) for score in scores]
+    
+    def _emotions_to_dict(self, emotions: List[float]) -> Dict[str, float]:
+        """Convert emotion scores to the emotion -> score mapping returned to callers"""
+        return dict(zip(self._emotion_order, emotions))
     
-    def _detect_mental_health_indicators(self, text: str) -> Dict[str, Any]:
+    def _get_word_emotions(self, word: str) -> Tuple[int, ...]:
+        """Get the columns of emotions whose keywords the word is a form of, memoized per word"""
+        columns = self._word_emotions.get(word)
+        if columns is None:
+            columns = self._match_emotion_stems(word.strip(_WORD_PUNCTUATION))
+            if len(self._word_emotions) < _WORD_EMOTIONS_CACHE_SIZE:
+                self._word_emotions[word] = columns
+        return columns
+    
+    def _build_emotion_trie(self) -> Dict[Optional[str], Any]:
+        """Build a character trie over keyword stems; stem nodes hold (suffixes, column) pairs"""
+        trie: Dict[Optional[str], Any] = {}
+        for emotion, keywords in self.emotion_keywords.items():
+            column = self._emotion_index[emotion]
+            for keyword in keywords:
+                for stem, suffixes in _keyword_stems(keyword):
+                    node = trie
+                    for char in stem:
+                        node = node.setdefault(char, {})
+                    node.setdefault(None, []).append((suffixes, column))
+        return trie
+    
+    def _match_emotion_stems(self, word: str) -> Tuple[int, ...]:
+        """Walk the trie along a word, keeping stems whose remaining letters are an allowed suffix"""
+        columns = set()
+        node = self._emotion_trie
+        for position, char in enumerate(word):
+            node = node.get(char)
+            if node is None:
+                break
+            stem_ends = node.get(None)
+            if stem_ends:
+                rest = word[position + 1:]
+                columns.update(column for suffixes, column in stem_ends if rest in suffixes)
+        return tuple(sorted(columns))
+    
+    def _find_signal_keywords(self, text: str) -> Set[str]:
+        """Find every mental health and urgency keyword occurring in text"""
+        found = set()
+        for match in _SIGNAL_RE.finditer(text):
+            found.update(_CONTAINED_KEYWORDS[match.group(1)])
+        return found
+    
+    def _detect_mental_health_indicators(self, text: str,
+                                         found: Optional[Set[str]] = None) -> Dict[str, Any]:
         """Detect mental health-related indicators"""
-        indicators = {
-            "depression_signs": [],
-            "anxiety_signs": [],
-            "stress_indicators": [],
-            "positive_coping": [],
-            "support_seeking": [],
-            "crisis_indicators": []
-        }
-        
-        # Depression indicators
-        depression_keywords = [
-            "hopeless", "worthless", "empty", "numb", "exhausted",
-            "can't sleep", "no energy", "don't care", "giving up",
-            "pointless", "useless", "burden"
-        ]
-        
-        # Anxiety indicators
-        anxiety_keywords = [
-            "panic", "racing thoughts", "can't breathe", "heart racing",
-            "sweating", "shaking", "dizzy", "nauseous", "restless",
-            "on edge", "jumpy"
-        ]
-        
-        # Stress indicators
-        stress_keywords = [
-            "overwhelmed", "pressure", "deadline", "too much",
-            "can't handle", "breaking point", "stressed out",
-            "burned out", "exhausted"
-        ]
-        
-        # Positive coping
-        positive_keywords = [
-            "meditation", "exercise", "therapy", "counseling",
-            "support group", "self care", "journaling", "mindfulness",
-            "breathing exercises", "talking to someone"
-        ]
-        
-        # Support seeking
-        support_keywords = [
-            "need help", "talk to someone", "therapist", "counselor",
-            "support", "advice", "guidance", "professional help"
-        ]
-        
-        # Crisis indicators
-        crisis_keywords = [
-            "end it all", "can't go on", "no point", "better off dead",
-            "hurt myself", "suicide", "kill myself", "end my life"
-        ]
-        
-        # Check for indicators
-        for keyword in depression_keywords:
-            if keyword in text:
-                indicators["depression_signs"].append(keyword)
-        
-        for keyword in anxiety_keywords:
-            if keyword in text:
-                indicators["anxiety_signs"].append(keyword)
-        
-        for keyword in stress_keywords:
-            if keyword in text:
-                indicators["stress_indicators"].append(keyword)
+        if found is None:
+            found = self._find_signal_keywords(text)
         
-        for keyword in positive_keywords:
-            if keyword in text:
-                indicators["positive_coping"].append(keyword)
+        # Most messages carry no indicator keywords at all
+        if not found:
+            return {category: [] for category in _MENTAL_HEALTH_KEYWORDS}
         
-        for keyword in support_keywords:
-            if keyword in text:
-                indicators["support_seeking"].append(keyword)
-        
-        for keyword in crisis_keywords:
-            if keyword in text:
-                indicators["crisis_indicators"].append(keyword)
-        
-        return indicators
+        return {
+            category: [keyword for keyword in keywords if keyword in found]
+            for category, keywords in _MENTAL_HEALTH_KEYWORDS.items()
+        }
     
-    def _detect_urgency(self, text: str) -> str:
+    def _detect_urgency(self, text: str, found: Optional[Set[str]] = None) -> str:
         """Detect urgency level of the message"""
-        # Crisis indicators
-        crisis_patterns = [
-            "end it all", "can't go on", "hurt myself", "kill myself",
-            "suicide", "end my life", "no point living"
-        ]
-        
-        # High urgency indicators
-        high_urgency_patterns = [
-            "emergency", "urgent", "crisis", "immediate help",
-            "can't breathe", "panic attack", "breaking down"
-        ]
-        
-        # Medium urgency indicators
-        medium_urgency_patterns = [
-            "really struggling", "need help", "can't handle",
-            "breaking point", "overwhelmed", "desperate"
-        ]
+        if found is None:
+            found = self._find_signal_keywords(text)
         
-        # Check patterns
-        if any(pattern in text for pattern in crisis_patterns):
-            return "crisis"
-        elif any(pattern in text for pattern in high_urgency_patterns):
-            return "high"
-        elif any(pattern in text for pattern in medium_urgency_patterns):
-            return "medium"
-        else:
+        if not found:
             return "low"
+        
+        # Levels are ordered most urgent first
+        for level, patterns in _URGENCY_PATTERNS:
+            if not patterns.isdisjoint(found):
+                return level
+        return "low"
     
     def _classify_overall_sentiment(self, blob_sentiment: Dict[str, float], 
-                                  emotions: Dict[str, float]) -> str:
+                                  emotions: List[float]) -> str:
         """Classify overall sentiment"""
         polarity = blob_sentiment["polarity"]
         
         # Get dominant emotion
-        dominant_emotion = max(emotions.items(), key=lambda x: x[1])[0] if emotions else None
+        dominant_emotion = self._emotion_order[emotions.index(max(emotions))] if emotions else None
         
         # Classify based on polarity and emotions
         if polarity >= 0.3:
             return "positive"
         elif polarity <= -0.3:
             return "negative"
-        elif dominant_emotion in ["sadness", "fear", "anger", "disgust"]:
+        elif dominant_emotion in _NEGATIVE_EMOTIONS:
             return "negative"
-        elif dominant_emotion in ["joy", "trust", "anticipation"]:
+        elif dominant_emotion in _POSITIVE_EMOTIONS:
             return "positive"
         else:
             return "neutral"
     
-    def _generate_sentiment_insights(self, sentiment: str, emotions: Dict[str, float],
+    def _generate_sentiment_insights(self, sentiment: str, emotions: List[float],
                                    mental_health: Dict[str, Any], urgency: str) -> List[str]:
         """Generate insights based on sentiment analysis"""
         insights = []
@@ -362,7 +544,9 @@ class SentimentAnalyzer:
             insights.append("The message has a neutral emotional tone")
         
         # Emotion insights
-        dominant_emotions = [k for k, v in emotions.items() if v > 0.3]
+        dominant_emotions = [
+            emotion for emotion, score in zip(self._emotion_order, emotions) if score > 0.3
+        ]
         if dominant_emotions:
             insights.append(f"Dominant emotions detected: {', '.join(dominant_emotions)}")
         
@@ -391,66 +575,101 @@ class SentimentAnalyzer:
         return insights
     
     def _calculate_confidence(self, blob_sentiment: Dict[str, float], 
-                            emotions: Dict[str, float]) -> float:
+                            emotions: List[float]) -> float:
         """Calculate confidence score for the analysis"""
-        try:
-            # Base confidence from subjectivity (more subjective = more confident about sentiment)
-            subjectivity_confidence = blob_sentiment["subjectivity"]
-            
-            # Emotion detection confidence
-            emotion_confidence = max(emotions.values()) if emotions else 0.0
-            
-            # Combined confidence
-            confidence = (subjectivity_confidence + emotion_confidence) / 2
-            
-            return min(confidence, 1.0)
-            
-        except Exception:
-            return 0.5
+        # Base confidence from subjectivity (more subjective = more confident about sentiment)
+        subjectivity_confidence = blob_sentiment["subjectivity"]
+        
+        # Emotion detection confidence
+        emotion_confidence = max(emotions, default=0.0)
+        
+        # Combined confidence
+        confidence = (subjectivity_confidence + emotion_confidence) / 2
+        
+        return min(confidence, 1.0)
     
     def _get_neutral_sentiment(self) -> Dict[str, Any]:
         """Return neutral sentiment for empty input"""
-        return {
-            "overall_sentiment": "neutral",
-            "polarity": 0.0,
-            "subjectivity": 0.0,
-            "emotions": {},
-            "mental_health_indicators": {
-                "depression_signs": [],
-                "anxiety_signs": [],
-                "stress_indicators": [],
-                "positive_coping": [],
-                "support_seeking": [],
-                "crisis_indicators": []
-            },
-            "urgency_level": "low",
-            "insights": ["No text provided for analysis"],
-            "confidence": 0.0
-        }
+        return self._copy_analysis(_NEUTRAL_SENTIMENT)
     
     def _get_error_sentiment(self) -> Dict[str, Any]:
         """Return error sentiment for analysis failures"""
-        return {
-            "overall_sentiment": "unknown",
-            "polarity": 0.0,
-            "subjectivity": 0.0,
-            "emotions": {},
-            "mental_health_indicators": {
-                "depression_signs": [],
-                "anxiety_signs": [],
-                "stress_indicators": [],
-                "positive_coping": [],
-                "support_seeking": [],
-                "crisis_indicators": []
-            },
-            "urgency_level": "low",
-            "insights": ["Error occurred during sentiment analysis"],
-            "confidence": 0.0
-        }
+        return self._copy_analysis(_ERROR_SENTIMENT)
     
     def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
-        """Analyze sentiment for multiple texts"""
-        return [self.analyze(text) for text in texts]
+        """
+        Analyze sentiment for multiple texts
+        
+        Per-text scores are gathered into arrays so the overall sentiment and
+        confidence of the whole batch are classified in one vectorized pass.
+        
+        Args:
+            texts: Input texts to analyze
+            
+        Returns:
+            List of sentiment analysis results, one per text
+        """
+        try:
+            results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+            rows = []
+            for i, text in enumerate(texts):
+                if not text or not text.strip():
+                    results[i] = self._get_neutral_sentiment()
+                else:
+                    rows.append(i)
+            
+            count = len(rows)
+            polarities = np.empty(count)
+            subjectivities = np.empty(count)
+            emotion_scores = np.empty((count, len(self._emotion_index)))
+            emotions_list = []
+            indicators_list = []
+            urgency_list = []
+            
+            for row, i in enumerate(rows):
+                cleaned_text = self._preprocess_text(texts[i])
+                blob_sentiment = self._get_lexicon_sentiment(cleaned_text)
+                polarities[row] = blob_sentiment["polarity"]
+                subjectivities[row] = blob_sentiment["subjectivity"]
+                
+                emotions = self._detect_emotions(cleaned_text)
+                emotion_scores[row] = emotions
+                emotions_list.append(emotions)
+                
+                found_keywords = self._find_signal_keywords(cleaned_text)
+                indicators_list.append(self._detect_mental_health_indicators(cleaned_text, found_keywords))
+                urgency_list.append(self._detect_urgency(cleaned_text, found_keywords))
+            
+            # Classify the whole batch at once, as _classify_overall_sentiment does per text
+            if count:
+                dominant = emotion_scores.argmax(axis=1)
+                sentiments = np.where(
+                    polarities >= 0.3, "positive",
+                    np.where(polarities <= -0.3, "negative", self._emotion_sentiments[dominant])
+                ).tolist()
+                confidences = np.minimum((subjectivities + emotion_scores.max(axis=1)) / 2, 1.0).tolist()
+            else:
+                sentiments = confidences = []
+            
+            for row, i in enumerate(rows):
+                results[i] = {
+                    "overall_sentiment": sentiments[row],
+                    "polarity": float(polarities[row]),
+                    "subjectivity": float(subjectivities[row]),
+                    "emotions": self._emotions_to_dict(emotions_list[row]),
+                    "mental_health_indicators": indicators_list[row],
+                    "urgency_level": urgency_list[row],
+                    "insights": self._generate_sentiment_insights(
+                        sentiments[row], emotions_list[row], indicators_list[row], urgency_list[row]
+                    ),
+                    "confidence": confidences[row]
+                }
+            
+            return results
+            
+        except Exception:
+            logger.exception("Error in batch sentiment analysis")
+            return [self.analyze(text) for text in texts]
     
     def get_emotional_summary(self, sentiments: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Get emotional summary from multiple sentiment analyses"""
@@ -458,40 +677,61 @@ class SentimentAnalyzer:
             if not sentiments:
                 return {"error": "No sentiments to summarize"}
             
-            # Aggregate emotions
-            emotion_totals = {}
-            total_polarity = 0
-            total_subjectivity = 0
-            urgency_counts = {"low": 0, "medium": 0, "high": 0, "crisis": 0}
+            # Stack scores into arrays so averages are single vectorized reductions
+            count = len(sentiments)
+            emotion_index = self._emotion_index
+            emotion_scores = np.zeros((count, len(emotion_index)))
+            seen_emotions = np.zeros(len(emotion_index), dtype=bool)
+            urgency_codes = np.empty(count, dtype=np.intp)
             
-            for sentiment in sentiments:
-                # Sum emotions
+            for row, sentiment in enumerate(sentiments):
                 for emotion, score in sentiment.get("emotions", {}).items():
-                    emotion_totals[emotion] = emotion_totals.get(emotion, 0) + score
-                
-                # Sum polarities
-                total_polarity += sentiment.get("polarity", 0)
-                total_subjectivity += sentiment.get("subjectivity", 0)
-                
-                # Count urgency levels
-                urgency = sentiment.get("urgency_level", "low")
-                urgency_counts[urgency] += 1
+                    column = emotion_index[emotion]
+                    emotion_scores[row, column] = score
+                    seen_emotions[column] = True
+                urgency_codes[row] = _URGENCY_CODES[sentiment.get("urgency_level", "low")]
+            
+            polarities = np.fromiter(
+                (sentiment.get("polarity", 0) for sentiment in sentiments), dtype=float, count=count
+            )
+            subjectivities = np.fromiter(
+                (sentiment.get("subjectivity", 0) for sentiment in sentiments), dtype=float, count=count
+            )
             
             # Calculate averages
-            count = len(sentiments)
-            avg_emotions = {k: v/count for k, v in emotion_totals.items()}
-            avg_polarity = total_polarity / count
-            avg_subjectivity = total_subjectivity / count
+            emotion_means = emotion_scores.mean(axis=0)
+            avg_emotions = {
+                emotion: float(emotion_means[column])
+                for emotion, column in emotion_index.items()
+                if seen_emotions[column]
+            }
+            urgency_counts = dict(zip(
+                _URGENCY_LEVELS, np.bincount(urgency_codes, minlength=len(_URGENCY_LEVELS)).tolist()
+            ))
             
             return {
                 "average_emotions": avg_emotions,
-                "average_polarity": avg_polarity,
-                "average_subjectivity": avg_subjectivity,
+                "average_polarity": float(polarities.mean()),
+                "average_subjectivity": float(subjectivities.mean()),
                 "urgency_distribution": urgency_counts,
                 "total_messages": count,
                 "dominant_emotion": max(avg_emotions.items(), key=lambda x: x[1])[0] if avg_emotions else None
             }
             
         except Exception as e:
-            print(f"❌ Error generating emotional summary: {e}")
+            logger.exception("Error generating emotional summary")
             return {"error": str(e)}
+
+
+_default_analyzer: Optional[SentimentAnalyzer] = None
+_default_analyzer_lock = threading.Lock()
+
+
+def get_sentiment_analyzer() -> SentimentAnalyzer:
+    """Get the process-wide SentimentAnalyzer, building its keyword tables only once"""
+    global _default_analyzer
+    if _default_analyzer is None:
+        with _default_analyzer_lock:
+            if _default_analyzer is None:
+                _default_analyzer = SentimentAnalyzer()
+    return _default_analyzer
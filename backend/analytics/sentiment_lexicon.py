@@ -0,0 +1,276 @@
+"""
+📖 Sentiment Lexicon - Lexicon-based polarity and subjectivity scoring
+
+Scores text against the en-sentiment.xml lexicon that ships with TextBlob,
+following the same tokenization and assessment rules as TextBlob's default
+PatternAnalyzer, without importing textblob (and nltk) or building a TextBlob
+object per message.
+"""
+
+import importlib.util
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, List, Optional, Tuple
+
+
+# Marks split from the start and end of tokens (periods are handled separately)
+_PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+_SPLIT_PUNCTUATION = tuple(_PUNCTUATION.replace(".", ""))
+_TRAILING_PUNCTUATION = _SPLIT_PUNCTUATION + (".",)
+
+_ABBREVIATIONS = frozenset((
+    "a.", "adj.", "adv.", "al.", "a.m.", "c.", "cf.", "comp.", "conf.", "def.",
+    "ed.", "e.g.", "esp.", "etc.", "ex.", "f.", "fig.", "gen.", "id.", "i.e.",
+    "int.", "l.", "m.", "Med.", "Mil.", "Mr.", "n.", "n.q.", "orig.", "pl.",
+    "pred.", "pres.", "p.m.", "ref.", "v.", "vs.", "w/"
+))
+_ABBREVIATION_RES = (
+    re.compile(r"^[A-Za-z]\.$"),
+    re.compile(r"^([A-Za-z]\.)+$"),
+    re.compile("^[A-Z][" + "|".join("bcdfghjklmnpqrstvwxz") + "]+.$")
+)
+
+_CONTRACTION_SPLITS = (
+    ("'d", " 'd"), ("'m", " 'm"), ("'s", " 's"), ("'ll", " 'll"),
+    ("'re", " 're"), ("'ve", " 've"), ("n't", " n't")
+)
+_CONTRACTION_TOKENS = frozenset(contraction for contraction, _ in _CONTRACTION_SPLITS)
+_QUOTES_RE = re.compile("([“”‘’'\"])")
+_LINEBREAK_RE = re.compile(r"\n{2,}")
+_EOS = "END-OF-SENTENCE"
+_SENTENCE_END_TOKENS = frozenset(("...", ".", "!", "?", _EOS))
+_SENTENCE_TAIL_TOKENS = frozenset(("'", "\"", "”", "’", "...", ".", "!", "?", ")", _EOS))
+
+_EMOTICONS = (
+    (+1.00, ("<3", "♥")),
+    (+1.00, (">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD", "8-D")),
+    (+0.75, (">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)")),
+    (+0.50, (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)")),
+    (+0.25, (">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)")),
+    (+0.05, (">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°")),
+    (-0.25, (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S", ">.>")),
+    (-0.75, (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/")),
+    (-1.00, (":'(", ":'''(", ";'("))
+)
+_EMOTICONS_RE = re.compile(r"(%s)($|\s)" % "|".join(
+    r" ?".join(map(re.escape, emoticon))
+    for _, emoticons in _EMOTICONS for emoticon in emoticons
+))
+_SARCASM_RE = re.compile(r"\( ?\! ?\)")
+
+# Characters that can end a sentence or take part in an emoticon or sarcasm mark.
+# Letters only matter in "XD"/"xD", which need an uppercase D.
+_SENTENCE_MARKS_RE = re.compile("[%s]" % re.escape("".join(sorted(
+    {char for _, emoticons in _EMOTICONS for emoticon in emoticons
+     for char in emoticon if not char.isalnum()} | set("D.!?()\n")
+))))
+
+# Reversed so the first listed expression wins for emoticons that lowercase alike
+_EMOTICON_POLARITY = {
+    emoticon.lower(): polarity
+    for polarity, emoticons in reversed(_EMOTICONS) for emoticon in emoticons
+}
+
+_NEGATIONS = frozenset(("no", "not", "n't", "never"))
+
+# word -> (polarity, subjectivity, intensity, is_adverb)
+_LEXICON: Optional[Dict[str, Tuple[float, float, float, bool]]] = None
+
+
+def _average(scores: List[Tuple[float, ...]]) -> List[float]:
+    """Average each component of a list of score tuples"""
+    return [sum(component) / float(len(component) or 1) for component in zip(*scores)]
+
+
+def get_sentiment_lexicon() -> Dict[str, Tuple[float, float, float, bool]]:
+    """Load TextBlob's en-sentiment.xml once into a word -> scores table"""
+    global _LEXICON
+    if _LEXICON is None:
+        # Locate the lexicon without importing textblob (and nltk) into the process
+        package_dir = importlib.util.find_spec("textblob").submodule_search_locations[0]
+        path = os.path.join(package_dir, "en", "en-sentiment.xml")
+        
+        # Collect (polarity, subjectivity, intensity) per sense, by word and part of speech
+        words: Dict[str, Dict[Optional[str], list]] = {}
+        for node in ElementTree.parse(path).getroot().findall("word"):
+            form = node.get("form")
+            if form:
+                words.setdefault(form, {}).setdefault(node.get("pos"), []).append((
+                    float(node.get("polarity", 0.0)),
+                    float(node.get("subjectivity", 0.0)),
+                    float(node.get("intensity", 1.0))
+                ))
+        
+        # Average senses per part of speech, then across parts of speech
+        for form, by_pos in words.items():
+            averaged = {pos: _average(scores) for pos, scores in by_pos.items()}
+            averaged[None] = _average(list(averaged.values()))
+            words[form] = averaged
+        
+        # Map adjectives to their adverbs ("terrible" -> "terribly")
+        for form, by_pos in list(words.items()):
+            if "JJ" in by_pos:
+                if form.endswith("y"):
+                    form = form[:-1] + "i"
+                if form.endswith("le"):
+                    form = form[:-2]
+                adverb = words.setdefault(form + "ly", {})
+                adverb["RB"] = adverb[None] = by_pos["JJ"]
+        
+        _LEXICON = {
+            form: (*by_pos[None], "RB" in by_pos)
+            for form, by_pos in words.items()
+        }
+    
+    return _LEXICON
+
+
+def _is_abbreviation(token: str) -> bool:
+    """Check whether a token ending in a period is an abbreviation"""
+    return token in _ABBREVIATIONS or any(
+        pattern.match(token) is not None for pattern in _ABBREVIATION_RES
+    )
+
+
+def _split_token(token: str, tokens: List[str]):
+    """Split leading and trailing punctuation off a whitespace-delimited token"""
+    tail = []
+    while token.startswith(_SPLIT_PUNCTUATION) and token not in _CONTRACTION_TOKENS:
+        tokens.append(token[0])
+        token = token[1:]
+    while token.endswith(_TRAILING_PUNCTUATION) and token not in _CONTRACTION_TOKENS:
+        if token.endswith(_SPLIT_PUNCTUATION):
+            tail.append(token[-1])
+            token = token[:-1]
+        if token.endswith("..."):
+            tail.append("...")
+            token = token[:-3].rstrip(".")
+        if token.endswith("."):
+            if _is_abbreviation(token):
+                break
+            tail.append(".")
+            token = token[:-1]
+    if token:
+        tokens.append(token)
+    tokens.extend(reversed(tail))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into words and punctuation marks the way TextBlob's sentiment does"""
+    if "'" in text:
+        for contraction, replacement in _CONTRACTION_SPLITS:
+            if contraction in text:
+                text = text.replace(contraction, replacement)
+    text = _QUOTES_RE.sub(r" \1 ", text)
+    text = text.replace("\r\n", "\n")
+    text = _LINEBREAK_RE.sub(" %s " % _EOS, text)
+    
+    tokens: List[str] = []
+    for token in text.split():
+        if token.startswith(_SPLIT_PUNCTUATION) or token.endswith(_TRAILING_PUNCTUATION):
+            _split_token(token, tokens)
+        else:
+            tokens.append(token)
+    
+    # Without sentence ends or emoticon characters there is a single sentence to rejoin
+    if _SENTENCE_MARKS_RE.search(text) is None:
+        return tokens
+    
+    # Group into sentences so sarcasm marks and emoticons are rejoined per sentence
+    sentences: List[List[str]] = [[]]
+    i = j = 0
+    while j < len(tokens):
+        if tokens[j] in _SENTENCE_END_TOKENS:
+            while j < len(tokens) and tokens[j] in _SENTENCE_TAIL_TOKENS:
+                if tokens[j] in ("'", "\"") and sentences[-1].count(tokens[j]) % 2 == 0:
+                    break  # Balanced quotes
+                j += 1
+            sentences[-1].extend(token for token in tokens[i:j] if token != _EOS)
+            sentences.append([])
+            i = j
+        j += 1
+    sentences[-1].extend(tokens[i:j])
+    
+    words: List[str] = []
+    for sentence in sentences:
+        if sentence:
+            joined = _SARCASM_RE.sub("(!)", " ".join(sentence))
+            joined = _EMOTICONS_RE.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), joined)
+            words.extend(joined.split())
+    return words
+
+
+def score_sentiment(text: str) -> Tuple[float, float]:
+    """
+    Score text polarity and subjectivity from the sentiment lexicon
+    
+    Known words are assessed in order: a preceding adverb scales the next word by
+    its intensity, a preceding negation halves and flips it, and exclamation marks
+    and emoticons adjust the score, as in TextBlob's PatternAnalyzer.
+    
+    Args:
+        text: Input text to score
+    
+    Returns:
+        Tuple of (polarity from -1 to 1, subjectivity from 0 to 1)
+    """
+    lexicon = get_sentiment_lexicon()
+    
+    # Each assessment is [polarity, subjectivity, intensity, negated]
+    assessments: List[list] = []
+    modifier = None  # Preceding adverb ("very good")
+    negation = None  # Preceding negation ("not good")
+    
+    for word in tokenize(text):
+        word = word.lower()
+        entry = lexicon.get(word)
+        if entry is not None:
+            polarity, subjectivity, intensity, is_adverb = entry
+            if modifier is None:
+                assessments.append([polarity, subjectivity, intensity, False])
+            else:
+                last = assessments[-1]
+                last[0] = max(-1.0, min(polarity * last[2], +1.0))
+                last[1] = max(-1.0, min(subjectivity * last[2], +1.0))
+                last[2] = intensity
+            if negation is not None:
+                last = assessments[-1]
+                last[2] = 1.0 / last[2]
+                last[3] = True
+            modifier = word if is_adverb else None
+            negation = word if word in _NEGATIONS else None
+            continue
+        
+        # Unknown words may be a negation; negations carry across small words ("not a good")
+        if word in _NEGATIONS:
+            negation = word
+        elif negation and len(word.strip("'")) > 1:
+            negation = None
+        
+        # A negation after an -ly adverb ("really not good") negates the adverb's assessment
+        if negation is not None and modifier is not None and modifier.endswith("ly"):
+            assessments[-1][3] = True
+            negation = None
+        elif modifier and len(word) > 2:
+            modifier = None
+        
+        if word == "!" and assessments:
+            assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, +1.0))
+        if word == "(!)":
+            assessments.append([0.0, 1.0, 1.0, False])
+        if word.isalpha() is False and len(word) <= 5 and word not in _PUNCTUATION:
+            emoticon_polarity = _EMOTICON_POLARITY.get(word)
+            if emoticon_polarity is not None:
+                assessments.append([emoticon_polarity, 1.0, 1.0, False])
+    
+    if not assessments:
+        return 0.0, 0.0
+    
+    total_polarity = 0
+    total_subjectivity = 0
+    for polarity, subjectivity, _, negated in assessments:
+        total_polarity += polarity * -0.5 if negated else polarity
+        total_subjectivity += subjectivity
+    count = float(len(assessments))
+    return total_polarity / count, total_subjectivity / count
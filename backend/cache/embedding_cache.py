@@ -0,0 +1,88 @@
+"""
+💾 Embedding Cache - Persistent store of text embeddings
+
+Keeps embeddings on disk in SQLite, keyed by a SHA-256 of the model name and
+text, so repeated queries skip the embedding model across restarts.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    """Build the cache key for a text embedded by a model"""
+    return hashlib.sha256(f"{model}:{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed map of cache key -> float32 embedding with expiry"""
+    
+    def __init__(self, path: str, ttl_seconds: float = _TTL_SECONDS):
+        """
+        Set up a cache backed by a SQLite file, opened on first use
+        
+        Args:
+            path: Location of the SQLite database file
+            ttl_seconds: Age after which a stored embedding is recomputed
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Return this process's connection, opening it and dropping expired entries if needed"""
+        # A connection inherited across fork() must not be used, so each process opens its own
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection_pid = os.getpid()
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._connection.execute("DELETE FROM embeddings WHERE expires_at < ?", (time.time(),))
+            self._connection.commit()
+        return self._connection
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the stored embedding for a key, or None if missing or expired"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT vector, expires_at FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        
+        if row is None or row[1] < time.time():
+            return None
+        return np.frombuffer(row[0], dtype=np.float32)
+    
+    def set(self, key: str, embedding: Sequence[float]):
+        """Store an embedding for a key, replacing any earlier one"""
+        vector = np.asarray(embedding, dtype=np.float32).tobytes()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, expires_at) VALUES (?, ?, ?)",
+                (key, vector, time.time() + self.ttl_seconds)
+            )
+            connection.commit()
+    
+    def close(self):
+        """Close this process's database connection, if one is open"""
+        with self._lock:
+            if self._connection is not None and self._connection_pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+            self._connection_pid = None
@@ -5,39 +5,201 @@ This module manages the main conversation flow using LangChain,
 integrating memory systems and personality modes.
 """
 
+import atexit
+import functools
+import hashlib
+import json
+import logging
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Iterator, Set, Tuple, Sequence
 import re
 import random
 
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
+import httpx
+import openai
+import tiktoken
+from langchain.prompts import (
+    ChatPromptTemplate,
+    HumanMessagePromptTemplate,
+    MessagesPlaceholder,
+    SystemMessagePromptTemplate,
+)
 from langchain_openai import ChatOpenAI
-from langchain.schema import BaseMessage
+from langchain.schema import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable
 
+from chains.response_cache import SemanticResponseCache
 
-def generate_prompt(user_message, user_data):
+logger = logging.getLogger(f"wellness.{__name__}")
+
+
+# Personality descriptions; each mode gets its own pre-built prompt and chain
+_PERSONALITY_CONTEXTS = MappingProxyType({
+    "calm_coach": "You are a calm, patient, and nurturing coach. Speak gently and offer reassuring guidance. Focus on mindfulness and gradual progress.",
+    
+    "assertive_buddy": "You are an encouraging and motivational friend. Be direct but supportive, help users take action and build confidence. Use an energetic but caring tone.",
+    
+    "playful_companion": "You are a lighthearted and optimistic companion. Use humor appropriately, keep things positive, and help users see the bright side while still being supportive of their struggles.",
+    
+    "wise_mentor": "You are a thoughtful and experienced mentor. Provide deep insights, ask reflective questions, and guide users toward self-discovery and growth.",
+    
+    "practical_helper": "You are a solution-focused helper. Provide concrete advice, practical strategies, and actionable steps. Be organized and systematic in your approach."
+})
+_DEFAULT_PERSONALITY = "calm_coach"
+_DEFAULT_LANGUAGE = "english"
+
+_LANGUAGE_INSTRUCTIONS = MappingProxyType({
+    "english": "Respond in English. Use clear, accessible language appropriate for mental health support.",
+    
+    "sinhala": "Respond in Sinhala (සිංහල). Use culturally appropriate expressions and be mindful of local mental health perspectives. Use respectful and supportive language.",
+    
+    "tamil": "Respond in Tamil (தமிழ்). Use culturally appropriate expressions and be mindful of local mental health perspectives. Use respectful and supportive language."
+})
+
+_ERROR_RESPONSES = MappingProxyType({
+    "english": "I'm sorry, I'm having trouble processing your message right now. Please try again, and if the problem persists, consider reaching out to a mental health professional for immediate support.",
+    
+    "sinhala": "මට කණගාටුයි, මම දැන් ඔබේ පණිවිඩය සැකසීමේ දී අසුවියක් ඇත. කරුණාකර නැවත උත්සාහ කරන්න, ගැටලුව දිගටම පවතින්නේ නම්,즉시 සහාය සඳහා මානසික සෞඛ්‍ය වෘත්තිකයෙකු සම්බන්ධ කර ගැනීම සලකා බලන්න.",
+    
+    "tamil": "மன்னிக்கவும், உங்கள் செய்தியை இப்போது செயல்படுத்துவதில் எனக்கு சிரமம் உள்ளது. தயவுசெய்து மீண்டும் முயற்சிக்கவும், பிரச்சனை தொடர்ந்தால், உடனடி ஆதரவிற்காக மனநல நிபுணரை தொடர்பு கொள்ளவும்."
+})
+
+# "Store this: ..." notes and name introductions in user messages
+_STORE_RE = re.compile(r"store this ?:(.*)", re.IGNORECASE | re.DOTALL)
+_NAME_RE = re.compile(r"(?:my name is|call me)\s+([a-zA-Z][a-zA-Z\s]{1,40})", re.IGNORECASE)
+
+# Response formatting for frontend bubbles
+_SECTION_EMOJIS = ("😊", "🧘", "🧠", "💡", "⭐")
+_IMPORTANT_RE = re.compile(r"\bimportant\b")
+_SHOW_MORE_THRESHOLD = 220
+_SHOW_MORE_LENGTH = 200
+# Enough of a long section to bold every word that starts within the kept prefix
+_SHOW_MORE_SCAN_LENGTH = _SHOW_MORE_LENGTH + len("important") + 1
+
+# Messages that only make sense in their conversation ("yes", "tell me more", "why is that")
+# are never answered from the response cache
+_MIN_REUSABLE_WORDS = 3
+_ANAPHORIC_RE = re.compile(
+    r"\b(?:it|that|this|these|those|they|them|he|she|him|her|there|more|again|else|yes|no|ok|okay)\b",
+    re.IGNORECASE
+)
+
+# Extracted user facts are merged into the stored profile in batches
+_FACT_FLUSH_DELAY_SECONDS = 2.0
+_FACT_FLUSH_BATCH_SIZE = 10
+
+# Caps in-flight OpenAI requests across request threads; rate-limited calls are retried
+# with exponential backoff by the OpenAI client
+_LLM_SEMAPHORE = threading.BoundedSemaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "10")))
+_LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+
+# Token budgets for the per-turn prompt fields (the user message itself is not cut)
+_HISTORY_TOKEN_BUDGET = 1500
+_MEMORY_TOKEN_BUDGET = 600
+_PROFILE_TOKEN_BUDGET = 200
+_MESSAGE_TOKEN_OVERHEAD = 4  # Role and separators per chat message
+_CHARS_PER_TOKEN = 4  # Fallback estimate when the tokenizer cannot be loaded
+
+# Runs the independent memory lookups made before each LLM call side by side
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=6, thread_name_prefix="conversation-prefetch")
+
+# Records finished exchanges in short-term memory after the response is returned;
+# a single worker keeps them in conversation order
+_WRITE_BACK_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-write-back")
+
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(model: str, temperature: float, max_tokens: int) -> ChatOpenAI:
+    """Get the process-wide ChatOpenAI for a model configuration, sharing one connection pool"""
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    
+    # Keep-alive pool reused by every chain and request thread
+    http_client = httpx.Client(limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+    client = openai.OpenAI(api_key=api_key, max_retries=_LLM_MAX_RETRIES, http_client=http_client)
+    
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        max_retries=_LLM_MAX_RETRIES,
+        openai_api_key=api_key,
+        client=client.chat.completions
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding() -> Optional[tiktoken.Encoding]:
+    """Load the chat model's tokenizer once, or None if it is unavailable"""
+    try:
+        return tiktoken.encoding_for_model("gpt-3.5-turbo")
+    except Exception:
+        logger.warning("Error loading tokenizer, estimating prompt budgets from characters", exc_info=True)
+        return None
+
+
+def _count_tokens(text: str) -> int:
+    """Count the tokens text takes up in the chat model's prompt"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // _CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def fit_to_token_budget(text: str, budget: int, keep_end: bool = False) -> str:
+    """
+    Cut text to at most budget tokens
+    
+    Args:
+        text: Text to cut
+        budget: Maximum number of tokens to keep
+        keep_end: Keep the last tokens instead of the first ones
+        
+    Returns:
+        The text unchanged if it fits, otherwise its first (or last) budget tokens
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        limit = budget * _CHARS_PER_TOKEN
+        if len(text) <= limit:
+            return text
+        return text[-limit:] if keep_end else text[:limit]
+    
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= budget:
+        return text
+    return encoding.decode(tokens[-budget:] if keep_end else tokens[:budget])
+
+
+def fit_messages_to_token_budget(messages: Sequence[BaseMessage], budget: int) -> List[BaseMessage]:
+    """Keep the most recent messages whose combined size fits in budget tokens"""
+    kept = []
+    used = 0
+    for message in reversed(messages):
+        used += _count_tokens(message.content) + _MESSAGE_TOKEN_OVERHEAD
+        if used > budget:
+            break
+        kept.append(message)
+    kept.reverse()
+    return kept
+
+
+def format_user_profile(user_data: Optional[Dict[str, Any]]) -> str:
+    """Render the stored user profile as a compact one-line prompt field"""
     if not user_data:
         user_data = {}
     favorite_activity = user_data.get("favorite_calming_activity", "not specified yet")
     user_name = user_data.get("name", "Friend")
-    pets = ", ".join(user_data.get("pets", [])) if user_data.get("pets") else "none mentioned"
-    support_prefs = ", ".join(user_data.get("support_preferences", [])) if user_data.get("support_preferences") else "not specified"
-    prompt = f"""
-You are a compassionate mental wellness coach named Reflective. Speak in a warm and encouraging tone. Be empathetic and supportive.
-
-User profile:
-- Name: {user_name}
-- Favorite calming activity: {favorite_activity}
-- Pets: {pets}
-- Support preferences: {support_prefs}
-
-User said: \"{user_message}\"
-
-Respond as Reflective. If the user shares something about their emotions, reflect back with empathy. If they mention calming activities, affirm them. If the user says \"Store this: ...\", extract and remember it but also confirm in your response.
-""".strip()
-    return prompt
+    # Sorted so the rendered profile does not depend on how the lists were merged
+    pets = ", ".join(sorted(user_data.get("pets", []))) if user_data.get("pets") else "none mentioned"
+    support_prefs = ", ".join(sorted(user_data.get("support_preferences", []))) if user_data.get("support_preferences") else "not specified"
+    return f"Name: {user_name}; Favorite calming activity: {favorite_activity}; Pets: {pets}; Support preferences: {support_prefs}"
 
 
 class ConversationChain:
@@ -54,59 +216,99 @@ class ConversationChain:
         self.current_personality = "calm_coach"
         self.current_language = "english"
         
+        # Recent responses reused for near-identical messages
+        self.response_cache = SemanticResponseCache()
+        
+        # User facts waiting to be written to the profile
+        self._pending_facts: List[Dict[str, Any]] = []
+        self._pending_facts_lock = threading.Lock()
+        self._fact_flush_lock = threading.Lock()
+        self._fact_flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush_user_facts)
+        
+        # Short-term memory writes still running in the background
+        self._pending_writes: Set[Future] = set()
+        self._pending_writes_lock = threading.Lock()
+        atexit.register(self.wait_for_pending_writes)
+        
+        # Rolling conversation summary and how many short-term messages it covers
+        self._last_summary = ""
+        self._last_summary_turn = 0
+        self._summary_lock = threading.Lock()
+        
         # Initialize OpenAI LLM
         self._init_llm()
         
         # Initialize conversation chain
         self._init_conversation_chain()
         
-        print("✅ Conversation Chain initialized successfully")
+        logger.info("Conversation Chain initialized")
     
     def _init_llm(self):
         """Initialize the OpenAI language model"""
         try:
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key:
-                raise ValueError("OPENAI_API_KEY not found in environment variables")
+            self.llm = _get_llm("gpt-3.5-turbo", 0.7, 1000)
+            # Same model constrained to reply with a single valid JSON object
+            self.json_llm = self.llm.bind(response_format={"type": "json_object"})
             
-            self.llm = ChatOpenAI(
-                model="gpt-3.5-turbo",
-                temperature=0.7,
-                max_tokens=1000,
-                openai_api_key=api_key
-            )
+            logger.info("OpenAI LLM initialized")
             
-            print("✅ OpenAI LLM initialized")
-            
-        except Exception as e:
-            print(f"❌ Error initializing LLM: {e}")
+        except Exception:
+            logger.exception("Error initializing LLM")
             raise
     
     def _init_conversation_chain(self):
-        """Initialize the LangChain conversation chain with custom prompt"""
+        """Initialize one LangChain conversation chain per personality mode and language"""
         try:
-            # Create custom prompt template
-            self.prompt_template = PromptTemplate(
-                input_variables=["history", "input", "personality_context", "memory_context", "language_context"],
-                template=self._get_prompt_template()
-            )
+            # Create chat prompt templates with the personality and language baked into the static
+            # system message; per-message context follows in its own message so it never changes that prefix
+            self.prompt_templates = {
+                (mode, language): ChatPromptTemplate.from_messages([
+                    SystemMessagePromptTemplate.from_template(
+                        self._get_system_prompt(self._get_personality_context(mode), self._get_language_context(language))
+                    ),
+                    SystemMessagePromptTemplate.from_template(
+                        "USER PROFILE: {user_profile}\n\nRELEVANT MEMORY CONTEXT: {memory_context}"
+                    ),
+                    MessagesPlaceholder(variable_name="history"),
+                    HumanMessagePromptTemplate.from_template("{input}")
+                ])
+                for mode in _PERSONALITY_CONTEXTS
+                for language in _LANGUAGE_INSTRUCTIONS
+            }
             
-            # Create LLMChain instead of ConversationChain
-            self.chain = LLMChain(
-                llm=self.llm,
-                prompt=self.prompt_template,
-                verbose=False
-            )
+            # Pipe each prompt straight into the shared LLM
+            self.chains: Dict[Tuple[str, str], Runnable] = {
+                key: prompt_template | self.llm
+                for key, prompt_template in self.prompt_templates.items()
+            }
+            self.prompt_template = self.prompt_templates[(_DEFAULT_PERSONALITY, _DEFAULT_LANGUAGE)]
+            self.chain = self.chains[(_DEFAULT_PERSONALITY, _DEFAULT_LANGUAGE)]
             
-            print("✅ LangChain conversation chain initialized")
+            logger.info("LangChain conversation chains initialized")
             
-        except Exception as e:
-            print(f"❌ Error initializing conversation chain: {e}")
+        except Exception:
+            logger.exception("Error initializing conversation chain")
             raise
     
-    def _get_prompt_template(self) -> str:
-        """Get the base prompt template for the AI assistant"""
-        return """You are a compassionate mental wellness AI assistant. Your primary role is to provide emotional support, guidance, and encouragement to users who may be dealing with stress, anxiety, depression, or other mental health challenges.
+    def _get_chain(self, personality_mode: str, language: str) -> Runnable:
+        """Get the pre-built chain for a personality mode and language, falling back to the defaults"""
+        chain = self.chains.get((personality_mode, language))
+        if chain is None:
+            chain = self.chains[(
+                personality_mode if personality_mode in _PERSONALITY_CONTEXTS else _DEFAULT_PERSONALITY,
+                language if language in _LANGUAGE_INSTRUCTIONS else _DEFAULT_LANGUAGE
+            )]
+        return chain
+    
+    def _get_system_prompt(self, personality_context: str, language_context: str) -> str:
+        """
+        Get the static system prompt for the AI assistant
+        
+        It is identical across turns for a personality and language, so the provider
+        can reuse it as a cached prompt prefix.
+        """
+        return """You are Reflective, a compassionate mental wellness AI assistant. Your primary role is to provide emotional support, guidance, and encouragement to users who may be dealing with stress, anxiety, depression, or other mental health challenges.
 
 CORE PRINCIPLES:
 - Be empathetic, non-judgmental, and supportive
@@ -115,12 +317,11 @@ CORE PRINCIPLES:
 - Respect user privacy and maintain confidentiality
 - Use active listening techniques in your responses
 - Offer practical coping strategies and self-care tips
+- Speak in a warm and encouraging tone
 
-PERSONALITY MODE: {personality_context}
+PERSONALITY MODE: """ + personality_context + """
 
-LANGUAGE PREFERENCES: {language_context}
-
-RELEVANT MEMORY CONTEXT: {memory_context}
+LANGUAGE PREFERENCES: """ + language_context + """
 
 SPECIAL COMMANDS YOU SUPPORT:
 - #reflect: Help user process reflections (save to long-term memory)
@@ -129,11 +330,6 @@ SPECIAL COMMANDS YOU SUPPORT:
 - #remember: Save important conversation points
 - #sos: Emergency support and crisis resources
 
-CONVERSATION HISTORY:
-{history}
-
-Current User Message: {input}
-
 Instructions:
 1. Respond according to your assigned personality mode
 2. Use the specified language preference
@@ -142,8 +338,8 @@ Instructions:
 5. If the user seems in crisis, prioritize safety and professional resources
 6. Encourage self-care and positive coping strategies
 7. Be conversational but professional
-
-Your Response:"""
+8. Personalize your response using the user profile; if the user shares emotions, reflect them back with empathy, and affirm calming activities they mention
+9. If the user says "Store this: ...", confirm in your response that you will remember it"""
     
     def process_message(self, user_message: str, personality_mode: str = "calm_coach", 
                        language: str = "english") -> str:
@@ -159,62 +355,220 @@ Your Response:"""
             AI response string
         """
         try:
-            # Update current settings
-            self.current_personality = personality_mode
-            self.current_language = language
-
-            # Get user profile data for prompt
-            user_profile = self.memory_manager.get_user_profile().get("profile", {})
-            # Compose personalized prompt
-            personalized_prompt = generate_prompt(user_message, user_profile)
+            cache_key, cached_response = self._get_cached_response(user_message, personality_mode, language)
+            if cached_response is not None:
+                return cached_response
             
-            # Get relevant context from memory
-            memory_context = self._get_memory_context(user_message)
-            # Get personality context
-            personality_context = self._get_personality_context(personality_mode)
-            # Get language context
-            language_context = self._get_language_context(language)
-            # Get history from memory
-            memory_variables = self.memory_manager.short_term_memory.load_memory_variables({"input": user_message})
-            history = memory_variables.get("history", "")
+            chain_input, memory_feedback = self._prepare_chain_input(user_message, personality_mode, language)
             
-            # Check for new facts to store
-            new_facts = self._extract_user_facts(user_message)
-            memory_feedback = ""
-            if new_facts:
-                self._store_user_facts(new_facts)
-                memory_feedback = self._generate_memory_feedback(new_facts, language)
+            # Get response from the personality's chain
+            with _LLM_SEMAPHORE:
+                response = self._get_chain(personality_mode, language).invoke(chain_input).content
             
-            # Prepare input for chain
-            chain_input = {
-                "input": personalized_prompt,
-                "personality_context": personality_context,
-                "memory_context": memory_context,
-                "language_context": language_context,
-                "history": history
-            }
-            
-            # Get response from chain
-            response = self.chain.predict(**chain_input)
-            
-            # Add memory feedback if there are new facts
-            if memory_feedback:
-                response = response + "\n\n" + memory_feedback
+            response = self._finish_response(user_message, response, memory_feedback)
+            if cache_key is not None and not memory_feedback:
+                embedding, context = cache_key
+                self.response_cache.store(embedding, personality_mode, language, response, context)
             
-            # Add to memory
-            self.memory_manager.add_message_to_short_term(user_message, response)
-            
-            # Add memory feedback if there are new facts
-            if memory_feedback:
-                response += f"\n\n🧠 **Memory updated!** {memory_feedback}"
-                
             # Format response
-            response = self._format_friendly_response(response)
-            return response.strip()
+            return self._format_friendly_response(response).strip()
             
-        except Exception as e:
-            print(f"❌ Error processing message: {e}")
+        except Exception:
+            logger.exception("Error processing message")
             return self._get_error_response(language)
+    
+    def stream_message(self, user_message: str, personality_mode: str = "calm_coach", 
+                       language: str = "english") -> Iterator[str]:
+        """
+        Process user message and yield the formatted response as it is generated
+        
+        Tokens are buffered until a paragraph break, so each yielded section goes
+        through the same formatting as process_message. Joining the yielded chunks
+        gives the same text process_message would return.
+        
+        Args:
+            user_message: The user's input message
+            personality_mode: Current AI personality mode
+            language: Preferred language for responses
+            
+        Yields:
+            Formatted response text, one section (with its leading separator) at a time
+        """
+        emitted = False
+        try:
+            cache_key, cached_response = self._get_cached_response(user_message, personality_mode, language)
+            if cached_response is not None:
+                yield cached_response
+                return
+            
+            chain_input, memory_feedback = self._prepare_chain_input(user_message, personality_mode, language)
+            chain = self._get_chain(personality_mode, language)
+            
+            started = time.perf_counter()
+            first_token_at = None
+            chunks = []
+            buffer = ""
+            with _LLM_SEMAPHORE:
+                for chunk in chain.stream(chain_input):
+                    if not chunk.content:
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        logger.info("First token after %.0f ms", (first_token_at - started) * 1000)
+                    chunks.append(chunk.content)
+                    buffer += chunk.content
+                    
+                    # Emit every complete paragraph, keep the unfinished one buffered
+                    *paragraphs, buffer = buffer.split("\n\n")
+                    for paragraph in paragraphs:
+                        section = self._format_friendly_response(paragraph)
+                        if section:
+                            yield "\n\n" + section if emitted else section
+                            emitted = True
+            
+            # The last paragraph plus any memory feedback
+            response = self._finish_response(user_message, "".join(chunks), memory_feedback)
+            tail = buffer + response[len("".join(chunks)):]
+            for section in self._format_friendly_response(tail).split("\n\n"):
+                if section:
+                    yield "\n\n" + section if emitted else section
+                    emitted = True
+            
+            if cache_key is not None and not memory_feedback:
+                embedding, context = cache_key
+                self.response_cache.store(embedding, personality_mode, language, response, context)
+            
+            logger.info("Streamed response in %.0f ms", (time.perf_counter() - started) * 1000)
+            
+        except Exception:
+            logger.exception("Error streaming message")
+            error_response = self._get_error_response(language)
+            yield "\n\n" + error_response if emitted else error_response
+    
+    def _get_cached_response(self, user_message: str, personality_mode: str, 
+                             language: str) -> Tuple[Optional[Tuple[list, str]], Optional[str]]:
+        """
+        Look up a cached response for a near-identical earlier message
+        
+        Only responses given with the same recent history match, and messages that
+        share facts or lean on earlier turns always go to the LLM. Responses are
+        cached as the LLM gave them; on a hit that text is recorded in short-term
+        memory, as on a miss, and the formatted version is returned.
+        
+        Returns:
+            Tuple of (cache key as (message embedding, history digest), or None if
+            the message is not cacheable; formatted cached response or None on a miss)
+        """
+        if not self.can_reuse_response(user_message):
+            return None, None
+        
+        try:
+            embedding = self.memory_manager.embed_query_cached(user_message)
+        except Exception:
+            logger.warning("Error embedding message for response cache", exc_info=True)
+            return None, None
+        
+        context = self._history_digest()
+        cached_response = self.response_cache.lookup(embedding, personality_mode, language, context)
+        if cached_response is None:
+            return (embedding, context), None
+        
+        self.current_personality = personality_mode
+        self.current_language = language
+        self._record_exchange(user_message, cached_response)
+        return (embedding, context), self._format_friendly_response(cached_response).strip()
+    
+    def _history_digest(self) -> str:
+        """Digest of the recent conversation, keying cached responses to the context they were given in"""
+        self.wait_for_pending_writes()
+        context = self.memory_manager.get_short_term_context()
+        return hashlib.blake2b(context.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def can_reuse_response(self, user_message: str) -> bool:
+        """
+        Check whether an earlier response may answer this message
+        
+        Short or anaphoric messages depend on the turns before them, and messages
+        sharing facts to remember must reach the LLM.
+        """
+        if len(user_message.split()) < _MIN_REUSABLE_WORDS or _ANAPHORIC_RE.search(user_message):
+            return False
+        return not self._extract_user_facts(user_message)
+    
+    def _prepare_chain_input(self, user_message: str, personality_mode: str, 
+                             language: str) -> Tuple[Dict[str, Any], str]:
+        """Gather prompt variables for a message and store any facts it shares"""
+        # Update current settings
+        self.current_personality = personality_mode
+        self.current_language = language
+
+        # Fetch the user profile, relevant memories and history concurrently
+        profile_future = _PREFETCH_EXECUTOR.submit(self.memory_manager.get_user_profile)
+        memory_future = _PREFETCH_EXECUTOR.submit(self._get_memory_context, user_message)
+        history_future = _PREFETCH_EXECUTOR.submit(self._load_history, user_message)
+        
+        # Get user profile data for prompt
+        user_profile = fit_to_token_budget(
+            format_user_profile(self._with_pending_facts(profile_future.result().get("profile", {}))),
+            _PROFILE_TOKEN_BUDGET
+        )
+        
+        # Get relevant context from memory
+        memory_context = memory_future.result()
+        # Get history from memory
+        memory_variables = history_future.result()
+        history = fit_messages_to_token_budget(memory_variables.get("history", []), _HISTORY_TOKEN_BUDGET)
+        
+        # Check for new facts to store
+        new_facts = self._extract_user_facts(user_message)
+        memory_feedback = ""
+        if new_facts:
+            self._store_user_facts(new_facts)
+            memory_feedback = self._generate_memory_feedback(new_facts, language)
+        
+        # Prepare input for chain
+        chain_input = {
+            "input": user_message,
+            "user_profile": user_profile,
+            "memory_context": memory_context,
+            "history": history
+        }
+        return chain_input, memory_feedback
+    
+    def _finish_response(self, user_message: str, response: str, memory_feedback: str) -> str:
+        """Append memory feedback to the response and record the exchange in short-term memory"""
+        # Add memory feedback if there are new facts
+        if memory_feedback:
+            response = "".join((response, "\n\n🧠 **Memory updated!** ", memory_feedback))
+        
+        # Add to memory without holding up the response
+        self._record_exchange(user_message, response)
+        return response
+    
+    def _record_exchange(self, user_message: str, response: str):
+        """Queue an exchange to be added to short-term memory in the background"""
+        future = _WRITE_BACK_EXECUTOR.submit(self.memory_manager.add_message_to_short_term, user_message, response)
+        with self._pending_writes_lock:
+            self._pending_writes.add(future)
+        future.add_done_callback(self._discard_pending_write)
+    
+    def _discard_pending_write(self, future: Future):
+        """Forget a finished short-term memory write"""
+        with self._pending_writes_lock:
+            self._pending_writes.discard(future)
+    
+    def wait_for_pending_writes(self):
+        """Block until queued short-term memory writes have been applied"""
+        with self._pending_writes_lock:
+            pending = list(self._pending_writes)
+        if pending:
+            wait(pending)
+    
+    def _load_history(self, user_message: str) -> Dict[str, Any]:
+        """Load short-term memory variables once earlier exchanges are written"""
+        self.wait_for_pending_writes()
+        messages, _ = self.memory_manager.get_short_term_messages()
+        return {"history": messages}
 
     def _format_friendly_response(self, text: str) -> str:
         """Format response to be short, emoji-rich, and split into sections for frontend bubbles."""
@@ -225,13 +579,15 @@ Your Response:"""
             if not part:
                 continue
             # Add emoji section breaks if not present
-            if not part.startswith(("😊", "🧘", "🧠", "💡", "⭐")):
+            if not part.startswith(_SECTION_EMOJIS):
                 part = "😊 " + part
-            # Bold important phrases
-            part = part.replace("important", "**important**")
-            # Add Show More if too long
-            if len(part) > 220:
-                part = part[:200] + "... [Show More]"
+            # Add Show More if too long, bolding important phrases in what is kept
+            if len(part) > _SHOW_MORE_THRESHOLD:
+                part = _IMPORTANT_RE.sub("**important**", part[:_SHOW_MORE_SCAN_LENGTH])[:_SHOW_MORE_LENGTH] + "... [Show More]"
+            else:
+                part = _IMPORTANT_RE.sub("**important**", part)
+                if len(part) > _SHOW_MORE_THRESHOLD:
+                    part = part[:_SHOW_MORE_LENGTH] + "... [Show More]"
             sections.append(part)
         return "\n\n".join(sections)
     
@@ -244,91 +600,104 @@ Your Response:"""
             if not relevant_memories:
                 return "No specific relevant memories found."
             
+            # Share the memory budget evenly between the retrieved memories
+            memory_budget = _MEMORY_TOKEN_BUDGET // len(relevant_memories)
             context_parts = ["Relevant memories:"]
             for memory in relevant_memories:
                 memory_type = memory.get('metadata', {}).get('type', 'unknown')
-                content = memory.get('content', '')[:200] + "..." if len(memory.get('content', '')) > 200 else memory.get('content', '')
+                full_content = memory.get('content', '')
+                content = fit_to_token_budget(full_content, memory_budget)
+                if content != full_content:
+                    content += "..."
                 timestamp = memory.get('metadata', {}).get('timestamp', 'Unknown time')
                 
                 context_parts.append(f"- {memory_type}: {content} (from {timestamp})")
             
             return "\n".join(context_parts)
             
-        except Exception as e:
-            print(f"❌ Error getting memory context: {e}")
+        except Exception:
+            logger.warning("Error getting memory context", exc_info=True)
             return "Unable to retrieve memory context."
     
     def _get_personality_context(self, personality_mode: str) -> str:
         """Get personality context based on the selected mode"""
-        personality_modes = {
-            "calm_coach": "You are a calm, patient, and nurturing coach. Speak gently and offer reassuring guidance. Focus on mindfulness and gradual progress.",
-            
-            "assertive_buddy": "You are an encouraging and motivational friend. Be direct but supportive, help users take action and build confidence. Use an energetic but caring tone.",
-            
-            "playful_companion": "You are a lighthearted and optimistic companion. Use humor appropriately, keep things positive, and help users see the bright side while still being supportive of their struggles.",
-            
-            "wise_mentor": "You are a thoughtful and experienced mentor. Provide deep insights, ask reflective questions, and guide users toward self-discovery and growth.",
-            
-            "practical_helper": "You are a solution-focused helper. Provide concrete advice, practical strategies, and actionable steps. Be organized and systematic in your approach."
-        }
-        
-        return personality_modes.get(personality_mode, personality_modes["calm_coach"])
+        return _PERSONALITY_CONTEXTS.get(personality_mode, _PERSONALITY_CONTEXTS[_DEFAULT_PERSONALITY])
     
     def _get_language_context(self, language: str) -> str:
         """Get language-specific context and instructions"""
-        language_instructions = {
-            "english": "Respond in English. Use clear, accessible language appropriate for mental health support.",
-            
-            "sinhala": "Respond in Sinhala (සිංහල). Use culturally appropriate expressions and be mindful of local mental health perspectives. Use respectful and supportive language.",
-            
-            "tamil": "Respond in Tamil (தமிழ்). Use culturally appropriate expressions and be mindful of local mental health perspectives. Use respectful and supportive language."
-        }
-        
-        return language_instructions.get(language, language_instructions["english"])
+        return _LANGUAGE_INSTRUCTIONS.get(language, _LANGUAGE_INSTRUCTIONS[_DEFAULT_LANGUAGE])
     
     def _get_error_response(self, language: str) -> str:
         """Get appropriate error response based on language"""
-        error_responses = {
-            "english": "I'm sorry, I'm having trouble processing your message right now. Please try again, and if the problem persists, consider reaching out to a mental health professional for immediate support.",
-            
-            "sinhala": "මට කණගාටුයි, මම දැන් ඔබේ පණිවිඩය සැකසීමේ දී අසුවියක් ඇත. කරුණාකර නැවත උත්සාහ කරන්න, ගැටලුව දිගටම පවතින්නේ නම්,즉시 සහාය සඳහා මානසික සෞඛ්‍ය වෘත්තිකයෙකු සම්බන්ධ කර ගැනීම සලකා බලන්න.",
-            
-            "tamil": "மன்னிக்கவும், உங்கள் செய்தியை இப்போது செயல்படுத்துவதில் எனக்கு சிரமம் உள்ளது. தயவுசெய்து மீண்டும் முயற்சிக்கவும், பிரச்சனை தொடர்ந்தால், உடனடி ஆதரவிற்காக மனநல நிபுணரை தொடர்பு கொள்ளவும்."
-        }
-        
-        return error_responses.get(language, error_responses["english"])
+        return _ERROR_RESPONSES.get(language, _ERROR_RESPONSES[_DEFAULT_LANGUAGE])
     
     def get_conversation_summary(self) -> str:
-        """Get a summary of the current conversation"""
+        """
+        Get a summary of the current conversation
+        
+        The summary is refined incrementally: only messages added since the last
+        summary are sent to the LLM, together with that previous summary.
+        """
         try:
-            recent_context = self.memory_manager.get_short_term_context()
-            
-            if not recent_context:
-                return "No recent conversation to summarize."
-            
-            # Use LLM to generate summary
-            summary_prompt = f"""Please provide a brief summary of this mental health conversation, focusing on:
+            self.wait_for_pending_writes()
+            with self._summary_lock:
+                messages, total = self.memory_manager.get_short_term_messages()
+                if total < self._last_summary_turn:
+                    # Short-term memory was cleared; start over
+                    self._last_summary = ""
+                    self._last_summary_turn = 0
+                
+                # Messages added since the last summary that are still in the window
+                unsummarized = min(total - self._last_summary_turn, len(messages))
+                new_messages = fit_messages_to_token_budget(messages[len(messages) - unsummarized:], _HISTORY_TOKEN_BUDGET)
+                recent_context = "\n".join(
+                    f"Human: {message.content}" if isinstance(message, HumanMessage) else f"AI: {message.content}"
+                    for message in new_messages
+                    if isinstance(message, (HumanMessage, AIMessage))
+                )
+                
+                if not recent_context:
+                    return self._last_summary or "No recent conversation to summarize."
+                
+                # Use LLM to generate summary
+                summary_prompt = f"""Please provide a brief summary of this mental health conversation, focusing on:
 1. Main concerns or topics discussed
 2. User's emotional state
 3. Key advice or strategies mentioned
 4. Any important progress or insights
+"""
+                if self._last_summary:
+                    summary_prompt += f"""
+Previous summary:
+{self._last_summary}
+
+New turns:
+{recent_context}
 
+Updated summary:"""
+                else:
+                    summary_prompt += f"""
 Conversation:
 {recent_context}
 
 Summary:"""
+                
+                with _LLM_SEMAPHORE:
+                    summary = self.llm.predict(summary_prompt)
+                
+                self._last_summary = summary.strip()
+                self._last_summary_turn = total
+                return self._last_summary
             
-            summary = self.llm.predict(summary_prompt)
-            return summary.strip()
-            
-        except Exception as e:
-            print(f"❌ Error generating conversation summary: {e}")
+        except Exception:
+            logger.exception("Error generating conversation summary")
             return "Unable to generate conversation summary."
     
     def suggest_next_steps(self, user_message: str) -> Dict[str, Any]:
         """Suggest helpful next steps based on conversation context"""
         try:
             # Get conversation context
+            self.wait_for_pending_writes()
             context = self.memory_manager.get_short_term_context()
             
             # Generate suggestions using LLM
@@ -348,35 +717,30 @@ Provide suggestions in the following categories:
 
 Format as a JSON object with categories and suggestions."""
             
-            suggestions_text = self.llm.predict(suggestion_prompt)
-            
-            # Try to parse as JSON, fallback to text if needed
-            try:
-                import json
-                suggestions = json.loads(suggestions_text)
-            except:
-                suggestions = {"general": [suggestions_text]}
+            # JSON mode guarantees the reply parses
+            with _LLM_SEMAPHORE:
+                suggestions = json.loads(self.json_llm.invoke(suggestion_prompt).content)
             
             return suggestions
             
-        except Exception as e:
-            print(f"❌ Error generating suggestions: {e}")
+        except Exception:
+            logger.exception("Error generating suggestions")
             return {"error": "Unable to generate suggestions"}
     
     def update_conversation_settings(self, personality_mode: str, language: str):
         """Update conversation settings"""
         self.current_personality = personality_mode
         self.current_language = language
-        print(f"✅ Updated settings: personality={personality_mode}, language={language}")
+        logger.info("Updated settings: personality=%s, language=%s", personality_mode, language)
 
     def _extract_user_facts(self, message: str) -> Dict[str, str]:
         """Extract user facts from the message only if a clear pattern is matched."""
         facts = {}
-        message_lower = message.lower().strip()
         
         # Handle 'store this:' pattern
-        if message_lower.startswith('store this:') or message_lower.startswith('store this :'):
-            fact_text = message_lower.split(':', 1)[1].strip()
+        store_match = _STORE_RE.match(message.strip())
+        if store_match:
+            fact_text = store_match.group(1).strip().lower()
             # Try to categorize the fact
             if "dog" in fact_text and "name is" in fact_text:
                 # e.g., "my dog's name is bruno"
@@ -394,40 +758,83 @@ Format as a JSON object with categories and suggestions."""
                 facts['notes'] = [fact_text]
             return facts
 
+        # Most messages introduce no name; a substring check is far cheaper than the regex scan
+        message_lower = message.lower()
+        if "name is" not in message_lower and "call me" not in message_lower:
+            return facts
+        
         # Name extraction (only if clear pattern)
-        name_patterns = [
-            r"my name is ([a-zA-Z\s]+)",
-            r"call me ([a-zA-Z\s]+)"
-        ]
-        for pattern in name_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                name = match.group(1).strip().title()
-                if len(name) > 1:
-                    facts['name'] = name
+        match = _NAME_RE.search(message)
+        if match:
+            name = match.group(1).strip().title()
+            if len(name) > 1:
+                facts['name'] = name
         return facts
     
     def _store_user_facts(self, facts: Dict[str, str]):
-        """Store user facts in the memory manager, merging lists for categories like pets and support_preferences."""
-        try:
-            if facts:
+        """Queue user facts for the next batched profile update."""
+        if not facts:
+            return
+        
+        flush_now = False
+        with self._pending_facts_lock:
+            self._pending_facts.append(facts)
+            if len(self._pending_facts) >= _FACT_FLUSH_BATCH_SIZE:
+                flush_now = True
+            elif self._fact_flush_timer is None:
+                self._fact_flush_timer = threading.Timer(_FACT_FLUSH_DELAY_SECONDS, self.flush_user_facts)
+                self._fact_flush_timer.daemon = True
+                self._fact_flush_timer.start()
+        
+        if flush_now:
+            self.flush_user_facts()
+    
+    def flush_user_facts(self):
+        """Merge all queued user facts into the stored profile with a single read and write."""
+        with self._fact_flush_lock:
+            with self._pending_facts_lock:
+                if self._fact_flush_timer is not None:
+                    self._fact_flush_timer.cancel()
+                    self._fact_flush_timer = None
+                batch = list(self._pending_facts)
+            if not batch:
+                return
+            
+            try:
                 existing_profile = self.memory_manager.get_user_profile()
                 profile_data = existing_profile.get("profile", {})
-                for key, value in facts.items():
-                    if isinstance(value, list):
-                        # Merge lists for categories
-                        existing = profile_data.get(key, [])
-                        if not isinstance(existing, list):
-                            existing = []
-                        # Avoid duplicates
-                        merged = list(set(existing + value))
-                        profile_data[key] = merged
-                    else:
-                        profile_data[key] = value
+                for facts in batch:
+                    self._merge_user_facts(profile_data, facts)
                 profile_data['last_updated'] = datetime.now(timezone.utc).isoformat()
                 self.memory_manager.update_user_profile(profile_data)
-        except Exception as e:
-            print(f"❌ Error storing user facts: {e}")
+            except Exception:
+                logger.exception("Error storing user facts")
+            finally:
+                # Facts stay visible through _with_pending_facts until the write is done
+                with self._pending_facts_lock:
+                    del self._pending_facts[:len(batch)]
+    
+    def _with_pending_facts(self, profile_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Overlay queued facts that are not written yet onto a fetched profile."""
+        with self._pending_facts_lock:
+            pending = list(self._pending_facts)
+        for facts in pending:
+            self._merge_user_facts(profile_data, facts)
+        return profile_data
+    
+    def _merge_user_facts(self, profile_data: Dict[str, Any], facts: Dict[str, Any]):
+        """Merge facts into profile data, merging lists for categories like pets and support_preferences."""
+        for key, value in facts.items():
+            if isinstance(value, list):
+                # Merge lists for categories
+                existing = profile_data.get(key, [])
+                if not isinstance(existing, list):
+                    existing = []
+                # Avoid duplicates, keeping the order facts were learned in
+                merged = list(dict.fromkeys(existing + value))
+                profile_data[key] = merged
+            else:
+                profile_data[key] = value
     
     def _generate_memory_feedback(self, facts: Dict[str, str], language: str) -> str:
         """Generate specific feedback about stored memories."""
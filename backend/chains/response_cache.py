@@ -0,0 +1,103 @@
+"""
+♻️ Response Cache - Reuse responses for near-identical user messages
+
+Keeps the most recent responses alongside the embedding of the message that
+produced them and a key for the conversation it was said in, so a repeated
+message in the same context can be answered without another LLM call.
+"""
+
+import threading
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+_MAX_ENTRIES = 500
+_SIMILARITY_THRESHOLD = 0.97
+_TTL_SECONDS = 24 * 60 * 60
+
+
+class SemanticResponseCache:
+    """Ring buffer of (message embedding, response) pairs searched by cosine similarity"""
+    
+    def __init__(self, max_entries: int = _MAX_ENTRIES, threshold: float = _SIMILARITY_THRESHOLD,
+                 ttl_seconds: float = _TTL_SECONDS):
+        """
+        Initialize an empty cache
+        
+        Args:
+            max_entries: Number of recent responses to keep
+            threshold: Minimum cosine similarity for a cached response to be reused
+            ttl_seconds: Age after which a cached response is no longer reused
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        
+        # Unit-length embeddings, one row per entry; allocated on first insert
+        self._embeddings: Optional[np.ndarray] = None
+        # (stored at, personality mode, language, context, response) per row
+        self._entries: List[Tuple[float, str, str, str, Any]] = []
+        self._next_row = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        """Scale an embedding to unit length so dot products are cosine similarities"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def lookup(self, embedding: Sequence[float], personality_mode: str, language: str,
+               context: str = "") -> Optional[Any]:
+        """
+        Find a fresh cached response for a similar message in the same mode, language and context
+        
+        Args:
+            embedding: Embedding of the incoming user message
+            personality_mode: Personality mode the response must have been generated in
+            language: Language the response must have been generated in
+            context: Key of the conversation state the message was sent in, e.g. a
+                digest of the recent history; only responses stored with the same key match
+        
+        Returns:
+            The most similar cached response above the threshold, or None
+        """
+        vector = self._normalize(embedding)
+        now = time.time()
+        
+        with self._lock:
+            if self._embeddings is None or self._embeddings.shape[1] != vector.shape[0]:
+                return None
+            
+            scores = self._embeddings[:len(self._entries)] @ vector
+            best_response = None
+            best_score = self.threshold
+            for row in np.flatnonzero(scores >= self.threshold):
+                stored_at, entry_mode, entry_language, entry_context, response = self._entries[row]
+                if (entry_mode == personality_mode and entry_language == language and entry_context == context
+                        and now - stored_at < self.ttl_seconds and scores[row] >= best_score):
+                    best_response = response
+                    best_score = scores[row]
+            return best_response
+    
+    def store(self, embedding: Sequence[float], personality_mode: str, language: str, response: Any,
+              context: str = ""):
+        """Add a response, replacing the oldest entry once the cache is full"""
+        vector = self._normalize(embedding)
+        
+        with self._lock:
+            if self._embeddings is None or self._embeddings.shape[1] != vector.shape[0]:
+                self._embeddings = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                self._entries = []
+                self._next_row = 0
+            
+            entry = (time.time(), personality_mode, language, context, response)
+            row = self._next_row
+            self._embeddings[row] = vector
+            if row < len(self._entries):
+                self._entries[row] = entry
+            else:
+                self._entries.append(entry)
+            self._next_row = (row + 1) % self.max_entries
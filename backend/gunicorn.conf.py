@@ -0,0 +1,32 @@
+"""
+Gunicorn settings for the Mental Wellness AI Assistant
+
+Run from the backend directory with: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+# One process by default; concurrency comes from its threads. The embedded ChromaDB and the
+# in-process memory state (short-term history, search mirrors, caches) are per process, so
+# more workers need a Chroma server (CHROMA_HOST)
+workers = int(os.getenv("GUNICORN_WORKERS", 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+# LLM calls can take a while; don't recycle workers mid-response
+timeout = 120
+
+
+def on_starting(server):
+    """Refuse several workers over the embedded ChromaDB, which each would open on its own"""
+    if server.cfg.workers > 1 and not os.getenv("CHROMA_HOST"):
+        raise RuntimeError(
+            f"{server.cfg.workers} workers need a ChromaDB server; set CHROMA_HOST or run one worker"
+        )
+
+
+def post_fork(server, worker):
+    """Open services and warm the memory mirrors in each worker before it serves requests"""
+    from main import ensure_services, set_worker_count
+    set_worker_count(server.cfg.workers)
+    ensure_services()
@@ -14,8 +14,18 @@ Features:
 
 import os
 import json
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime, timezone
-from flask import Flask, request, jsonify
+import orjson
+from flask import Blueprint, Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+from pydantic import ValidationError
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -23,15 +33,49 @@ from dotenv import load_dotenv
 from chains.conversation_chain import ConversationChain
 from memory.memory_manager import MemoryManager
 from analytics.mood_tracker import MoodTracker
-from analytics.sentiment_analyzer import SentimentAnalyzer
+from analytics.sentiment_analyzer import get_sentiment_analyzer
 from personality_modes.mode_manager import PersonalityModeManager
 from todo.task_manager import TaskManager
+from schemas import (
+    ChatRequest, MoodRequest, MoodBulkRequest, TaskCreateRequest, ReflectionRequest,
+    RememberRequest, PersonalityModeRequest, JournalEntryRequest
+)
 
 # Load environment variables
 load_dotenv()
 
+# Records go onto a queue and are written by a listener thread, so logging never blocks a request
+# Module loggers are named "wellness.<module>", so their records take this path too
+logger = logging.getLogger("wellness")
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(_log_queue))
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(process)d] %(message)s"))
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson, used by jsonify and request.get_json"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=_ORJSON_OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response without a str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=DefaultJSONProvider.default, option=_ORJSON_OPTIONS),
+            mimetype="application/json"
+        )
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Configure CORS with more permissive settings for development
 CORS(app, resources={r"/api/*": {"origins": "*"}})
@@ -53,21 +97,62 @@ sentiment_analyzer = None
 personality_manager = None
 task_manager = None
 
+# Current UTC time in ISO format, refreshed in the background for response timestamps
+_ts_cache = {"s": datetime.now(timezone.utc).isoformat(timespec='milliseconds')}
+_TIMESTAMP_REFRESH_SECONDS = 0.1
+
+def _refresh_timestamp():
+    """Keep the cached timestamp current"""
+    while True:
+        _ts_cache["s"] = datetime.fromtimestamp(time.time(), timezone.utc).isoformat(timespec='milliseconds')
+        time.sleep(_TIMESTAMP_REFRESH_SECONDS)
+
+# Process that started the background threads (threads do not survive a fork)
+_background_pid = None
+
+def start_background_workers():
+    """
+    Start the log listener and timestamp clock threads for this process
+    
+    Safe to call more than once. A server that loads the app before forking
+    workers calls it again in each worker (see gunicorn.conf.py).
+    """
+    global _background_pid
+    if _background_pid == os.getpid():
+        return
+    _background_pid = os.getpid()
+    
+    log_listener = QueueListener(_log_queue, _log_stream_handler)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    
+    threading.Thread(target=_refresh_timestamp, name="timestamp-clock", daemon=True).start()
+
+# Runs work that can overlap with the LLM call in chat requests
+_chat_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="chat")
+# Runs independent ChromaDB reads for one request in parallel
+_memory_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="memory")
+
 def initialize_services():
     """Initialize all AI and memory services"""
     global memory_manager, conversation_chain, mood_tracker
     global sentiment_analyzer, personality_manager, task_manager
     
     try:
-        # Initialize memory systems
-        memory_manager = MemoryManager()
+        # Start background workers: logging and the timestamp clock
+        start_background_workers()
+        
+        # Initialize memory systems (one Chroma client shared by all request threads)
+        memory_manager = MemoryManager.get_instance()
+        memory_manager.set_worker_count(_worker_count)
         
         # Initialize conversation chain with memory
         conversation_chain = ConversationChain(memory_manager)
         
         # Initialize analytics
         mood_tracker = MoodTracker(memory_manager)
-        sentiment_analyzer = SentimentAnalyzer()
+        mood_tracker.set_worker_count(_worker_count)
+        sentiment_analyzer = get_sentiment_analyzer()
         
         # Initialize personality modes
         personality_manager = PersonalityModeManager()
@@ -75,18 +160,51 @@ def initialize_services():
         # Initialize task manager
         task_manager = TaskManager(memory_manager)
         
-        print("✅ All services initialized successfully!")
+        logger.info("All services initialized")
         
-    except Exception as e:
-        print(f"❌ Error initializing services: {e}")
+    except Exception:
+        logger.exception("Error initializing services")
         raise
 
+# Process whose services are up; ChromaDB and SQLite connections are opened per process
+_services_pid = None
+_services_lock = threading.Lock()
+
+def ensure_services():
+    """
+    Initialize services and warm the memory search mirrors once in this process
+    
+    Production servers call it in each worker after the fork (see wsgi.py and
+    gunicorn.conf.py), so no database connection is carried across a fork.
+    """
+    global _services_pid
+    if _services_pid == os.getpid():
+        return
+    with _services_lock:
+        if _services_pid == os.getpid():
+            return
+        initialize_services()
+        memory_manager.warm_up()
+        _services_pid = os.getpid()
+
+def _parse_body(model, error_message: str):
+    """
+    Parse and validate the JSON request body against a schema in one pass
+    
+    Returns:
+        Tuple of (parsed body, None), or (None, 400 error response) if the body is invalid
+    """
+    try:
+        return model.model_validate_json(request.get_data(cache=False)), None
+    except ValidationError:
+        return None, (jsonify({"error": error_message}), 400)
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         "status": "healthy",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": _ts_cache["s"],
         "service": "Mental Wellness AI Assistant"
     })
 
@@ -98,17 +216,17 @@ def test():
 def chat():
     """Main chat endpoint for AI conversations"""
     try:
-        data = request.get_json()
-        
-        if not data or 'message' not in data:
-            return jsonify({"error": "Message is required"}), 400
+        body, error = _parse_body(ChatRequest, "Message is required")
+        if error:
+            return error
         
-        user_message = data['message']
-        personality_mode = data.get('personality_mode', 'calm_coach')
-        language = data.get('language', 'english')
+        data = body.model_dump()
+        user_message = body.message
+        personality_mode = body.personality_mode
+        language = body.language
         
-        # Set personality mode
-        personality_manager.set_mode(personality_mode)
+        # Analyze sentiment in the background while the conversation chain runs
+        sentiment_future = _chat_pool.submit(sentiment_analyzer.analyze, user_message)
         
         # Process the message through conversation chain
         response = conversation_chain.process_message(
@@ -117,13 +235,10 @@ def chat():
             language=language
         )
         
-        # Analyze sentiment
-        sentiment = sentiment_analyzer.analyze(user_message)
+        sentiment = sentiment_future.result()
         
         # Check for special commands
-        command_result = None
-        if user_message.startswith('#'):
-            command_result = process_command(user_message, data)
+        command_result = process_command(user_message, data) if is_command(user_message) else None
         
         return jsonify({
             "response": response,
@@ -134,35 +249,116 @@ def chat():
             "timestamp": datetime.now(timezone.utc).isoformat()
         })
         
-    except Exception as e:
-        print(f"❌ Chat error: {e}")
+    except Exception:
+        logger.exception("Chat error")
+        return jsonify({"error": "Internal server error"}), 500
+
+def _sse_event(payload: dict) -> str:
+    """Format a payload as a Server-Sent Events data message"""
+    return f"data: {orjson.dumps(payload, option=_ORJSON_OPTIONS).decode()}\n\n"
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Chat endpoint that streams the AI reply as Server-Sent Events
+    
+    Each event carries a {"delta": text} section of the reply; a final event
+    with "done": true carries the sentiment and any command result.
+    """
+    try:
+        body, error = _parse_body(ChatRequest, "Message is required")
+        if error:
+            return error
+        
+        data = body.model_dump()
+        user_message = body.message
+        personality_mode = body.personality_mode
+        language = body.language
+        message_is_command = is_command(user_message)
+        
+        # Analyze sentiment in the background while the reply streams
+        sentiment_future = _chat_pool.submit(sentiment_analyzer.analyze, user_message)
+        state = {"command_processed": False}
+        
+        def generate():
+            for delta in conversation_chain.stream_message(
+                user_message,
+                personality_mode=personality_mode,
+                language=language
+            ):
+                yield _sse_event({"delta": delta})
+            
+            command_result = None
+            if message_is_command:
+                state["command_processed"] = True
+                command_result = process_command(user_message, data)
+            
+            yield _sse_event({
+                "done": True,
+                "sentiment": sentiment_future.result(),
+                "personality_mode": personality_mode,
+                "language": language,
+                "command_result": command_result,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            })
+        
+        response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        
+        @response.call_on_close
+        def finish_command():
+            # Still carry out the command if the client disconnected mid-stream
+            if message_is_command and not state["command_processed"]:
+                with app.app_context():
+                    process_command(user_message, data)
+        
+        return response
+        
+    except Exception:
+        logger.exception("Chat stream error")
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/api/mood', methods=['POST'])
 def log_mood():
     """Endpoint for mood logging"""
     try:
-        data = request.get_json()
-        
-        if not data or 'mood' not in data:
-            return jsonify({"error": "Mood is required"}), 400
-        
-        mood = data['mood']
-        note = data.get('note', '')
+        body, error = _parse_body(MoodRequest, "Mood is required")
+        if error:
+            return error
         
-        # Log mood
-        result = mood_tracker.log_mood(mood, note)
+        # Written before responding: the client reads analytics right after logging
+        result = mood_tracker.log_mood(body.mood, body.note or "")
         
         return jsonify({
             "success": True,
             "result": result,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": _ts_cache["s"]
         })
         
-    except Exception as e:
-        print(f"❌ Mood logging error: {e}")
+    except Exception:
+        logger.exception("Mood logging error")
         return jsonify({"error": "Failed to log mood"}), 500
 
+@app.route('/api/mood/bulk', methods=['POST'])
+def log_moods_bulk():
+    """Endpoint for logging several mood entries in one write"""
+    try:
+        body, error = _parse_body(MoodBulkRequest, "A list of mood entries is required")
+        if error:
+            return error
+        
+        result = mood_tracker.log_moods_bulk(body.entries)
+        
+        return jsonify({
+            "success": result.get("success", False),
+            "result": result,
+            "timestamp": _ts_cache["s"]
+        })
+        
+    except Exception:
+        logger.exception("Bulk mood logging error")
+        return jsonify({"error": "Failed to log moods"}), 500
+
 @app.route('/api/mood/analytics', methods=['GET'])
 def get_mood_analytics():
     """Get mood analytics and insights"""
@@ -172,77 +368,133 @@ def get_mood_analytics():
         
         return jsonify({
             "analytics": analytics,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": _ts_cache["s"]
         })
         
-    except Exception as e:
-        print(f"❌ Mood analytics error: {e}")
+    except Exception:
+        logger.exception("Mood analytics error")
         return jsonify({"error": "Failed to get analytics"}), 500
 
-@app.route('/api/tasks', methods=['GET', 'POST'])
-def manage_tasks():
-    """Task management endpoint"""
+# Task routes, registered per method so Flask's URL map dispatches straight to each handler
+tasks_bp = Blueprint('tasks', __name__, url_prefix='/api/tasks')
+
+# Read-through cache for task analytics/upcoming polling: (name, days, version) -> (time, result).
+# Task writes bump the version, so entries from before a write are never served again
+_TASK_CACHE_TTL_SECONDS = 60.0
+_TASK_CACHE_MAX_ENTRIES = 128
+_task_cache = {}
+_task_cache_version = 0
+_task_cache_lock = threading.Lock()
+# Writes in another worker process can't invalidate this cache, so it is off unless the app
+# runs in a single process (see set_worker_count)
+_task_cache_enabled = True
+# Worker processes serving the app; memory mirrors, the profile cache and mood analytics
+# caching are only kept with one
+_worker_count = 1
+
+def set_worker_count(workers: int):
+    """Tell the app how many worker processes serve it; per-process caches need exactly one"""
+    global _task_cache_enabled, _worker_count
+    _worker_count = workers
+    _task_cache_enabled = workers == 1
+    if memory_manager is not None:
+        memory_manager.set_worker_count(workers)
+    if mood_tracker is not None:
+        mood_tracker.set_worker_count(workers)
+
+def _invalidate_task_cache():
+    """Stop serving cached task reads after a task write"""
+    global _task_cache_version
+    with _task_cache_lock:
+        _task_cache_version += 1
+        _task_cache.clear()
+
+def _cached_task_read(name: str, days: int, compute):
+    """Return a cached task read for the window, computing and storing it on a miss"""
+    if not _task_cache_enabled:
+        return compute(days=days)
+    
+    with _task_cache_lock:
+        key = (name, days, _task_cache_version)
+        cached = _task_cache.get(key)
+    if cached and time.monotonic() - cached[0] < _TASK_CACHE_TTL_SECONDS:
+        return cached[1]
+    
+    result = compute(days=days)
+    with _task_cache_lock:
+        if key[2] == _task_cache_version:
+            if len(_task_cache) >= _TASK_CACHE_MAX_ENTRIES:
+                _task_cache.clear()
+            _task_cache[key] = (time.monotonic(), result)
+    return result
+
+@tasks_bp.get('')
+def list_tasks():
+    """Get all tasks"""
     try:
-        if request.method == 'GET':
-            # Get all tasks
-            tasks = task_manager.get_all_tasks()
-            return jsonify({"tasks": tasks})
-            
-        elif request.method == 'POST':
-            # Add new task
-            data = request.get_json()
-            
-            if not data or 'title' not in data:
-                return jsonify({"error": "Task title is required"}), 400
-            
-            task = task_manager.add_task(
-                title=data['title'],
-                description=data.get('description', ''),
-                priority=data.get('priority', 'medium'),
-                due_date=data.get('due_date')
-            )
-            
-            return jsonify({
-                "success": True,
-                "task": task,
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            })
-            
-    except Exception as e:
-        print(f"❌ Task management error: {e}")
+        tasks = task_manager.get_all_tasks()
+        return jsonify({"tasks": tasks})
+    except Exception:
+        logger.exception("Task management error")
+        return jsonify({"error": "Task operation failed"}), 500
+
+@tasks_bp.post('')
+def create_task():
+    """Add a new task"""
+    try:
+        body, error = _parse_body(TaskCreateRequest, "Task title is required")
+        if error:
+            return error
+        
+        task = task_manager.add_task(
+            title=body.title,
+            description=body.description,
+            priority=body.priority,
+            due_date=body.due_date
+        )
+        _invalidate_task_cache()
+        
+        return jsonify({
+            "success": True,
+            "task": task,
+            "timestamp": _ts_cache["s"]
+        })
+        
+    except Exception:
+        logger.exception("Task management error")
         return jsonify({"error": "Task operation failed"}), 500
 
-@app.route('/api/tasks/analytics', methods=['GET'])
+@tasks_bp.get('/analytics')
 def get_task_analytics():
     """Get task analytics, insights, and recommendations"""
     try:
         days = int(request.args.get('days', 30))
-        analytics = task_manager.get_task_analytics(days=days)
+        analytics = _cached_task_read("analytics", days, task_manager.get_task_analytics)
         return jsonify({
             "success": True,
             "analytics": analytics,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": _ts_cache["s"]
         })
-    except Exception as e:
-        print(f"❌ Task analytics error: {e}")
+    except Exception:
+        logger.exception("Task analytics error")
         return jsonify({"error": "Failed to get analytics"}), 500
 
-@app.route('/api/tasks/upcoming', methods=['GET'])
+@tasks_bp.get('/upcoming')
 def get_upcoming_tasks():
     """Get tasks due in the next N days (default 7)"""
     try:
         days = int(request.args.get('days', 7))
-        tasks = task_manager.get_upcoming_tasks(days=days)
+        tasks = _cached_task_read("upcoming", days, task_manager.get_upcoming_tasks)
         return jsonify({
             "success": True,
             "tasks": tasks,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": _ts_cache["s"]
         })
-    except Exception as e:
-        print(f"❌ Upcoming tasks error: {e}")
+    except Exception:
+        logger.exception("Upcoming tasks error")
         return jsonify({"error": "Failed to get upcoming tasks"}), 500
 
-@app.route('/api/tasks/suggested', methods=['GET'])
+@tasks_bp.get('/suggested')
 def get_suggested_tasks():
     """Get daily suggested wellness tasks, optionally using user context (e.g., mood)"""
     try:
@@ -253,106 +505,115 @@ def get_suggested_tasks():
         return jsonify({
             "success": True,
             "suggestions": suggestions,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": _ts_cache["s"]
         })
-    except Exception as e:
-        print(f"❌ Suggested tasks error: {e}")
+    except Exception:
+        logger.exception("Suggested tasks error")
         return jsonify({"error": "Failed to get suggested tasks"}), 500
 
-@app.route('/api/tasks/<task_id>', methods=['PUT', 'DELETE'])
+@tasks_bp.put('/<task_id>')
 def update_task(task_id):
-    """Update or delete specific task"""
+    """Update a specific task"""
     try:
-        if request.method == 'PUT':
-            # Update task
-            data = request.get_json()
-            task = task_manager.update_task(task_id, data)
-            return jsonify({"success": True, "task": task})
-            
-        elif request.method == 'DELETE':
-            # Delete task
-            success = task_manager.delete_task(task_id)
-            return jsonify({"success": success})
-            
-    except Exception as e:
-        print(f"❌ Task update error: {e}")
+        data = request.get_json()
+        task = task_manager.update_task(task_id, data)
+        _invalidate_task_cache()
+        return jsonify({"success": True, "task": task})
+    except Exception:
+        logger.exception("Task update error")
         return jsonify({"error": "Task operation failed"}), 500
 
+@tasks_bp.delete('/<task_id>')
+def delete_task(task_id):
+    """Delete a specific task"""
+    try:
+        success = task_manager.delete_task(task_id)
+        _invalidate_task_cache()
+        return jsonify({"success": success})
+    except Exception:
+        logger.exception("Task delete error")
+        return jsonify({"error": "Task operation failed"}), 500
+
+app.register_blueprint(tasks_bp)
+
 @app.route('/api/memory/reflect', methods=['POST'])
 def save_reflection():
     """Save user reflection to long-term memory"""
     try:
-        data = request.get_json()
-        
-        if not data or 'reflection' not in data:
-            return jsonify({"error": "Reflection content is required"}), 400
+        body, error = _parse_body(ReflectionRequest, "Reflection content is required")
+        if error:
+            return error
         
-        reflection = data['reflection']
-        category = data.get('category', 'general')
+        reflection = body.reflection
+        category = body.category
         
-        # Save to long-term memory
+        # Queued for the memory manager's next batched write; its reads flush the queue first
         result = memory_manager.save_reflection(reflection, category)
+        if not result.get("saved"):
+            return jsonify({"error": "Failed to save reflection"}), 500
         
         return jsonify({
             "success": True,
             "result": result,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        })
+            "timestamp": _ts_cache["s"]
+        }), 202
         
-    except Exception as e:
-        print(f"❌ Reflection save error: {e}")
+    except Exception:
+        logger.exception("Reflection save error")
         return jsonify({"error": "Failed to save reflection"}), 500
 
 @app.route('/api/memory/remember', methods=['POST'])
 def remember_conversation():
     """Move important conversation data to long-term memory"""
     try:
-        data = request.get_json()
-        
-        if not data or 'content' not in data:
-            return jsonify({"error": "Content is required"}), 400
+        body, error = _parse_body(RememberRequest, "Content is required")
+        if error:
+            return error
         
-        content = data['content']
-        importance = data.get('importance', 'medium')
+        content = body.content
+        importance = body.importance
         
-        # Save to long-term memory
+        # Queued for the memory manager's next batched write; its reads flush the queue first
         result = memory_manager.remember_important(content, importance)
+        if not result.get("saved"):
+            return jsonify({"error": "Failed to save to memory"}), 500
         
         return jsonify({
             "success": True,
             "result": result,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        })
+            "timestamp": _ts_cache["s"]
+        }), 202
         
-    except Exception as e:
-        print(f"❌ Remember operation error: {e}")
+    except Exception:
+        logger.exception("Remember operation error")
         return jsonify({"error": "Failed to save to memory"}), 500
 
 @app.route('/api/memory/show', methods=['GET'])
 def show_memories():
     """Show user's stored memories and facts"""
     try:
-        # Get user profile and memories
-        user_profile = memory_manager.get_user_profile()
-        reflections = memory_manager.get_user_reflections(limit=5)
-        important_memories = memory_manager.get_relevant_memories("", n_results=5)
+        # Get user profile, memories and stats concurrently; each reads a different collection
+        profile_future = _memory_pool.submit(memory_manager.get_user_profile)
+        reflections_future = _memory_pool.submit(memory_manager.get_user_reflections, limit=5)
+        important_future = _memory_pool.submit(memory_manager.get_relevant_memories, "", n_results=5)
+        stats_future = _memory_pool.submit(memory_manager.get_memory_stats)
         
         # Format memories for display
         memories = {
-            "profile": user_profile.get("profile", {}),
-            "recent_reflections": reflections,
-            "important_memories": important_memories,
-            "memory_stats": memory_manager.get_memory_stats()
+            "profile": profile_future.result().get("profile", {}),
+            "recent_reflections": reflections_future.result(),
+            "important_memories": important_future.result(),
+            "memory_stats": stats_future.result()
         }
         
         return jsonify({
             "success": True,
             "memories": memories,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": _ts_cache["s"]
         })
         
-    except Exception as e:
-        print(f"❌ Error showing memories: {e}")
+    except Exception:
+        logger.exception("Error showing memories")
         return jsonify({"error": "Failed to retrieve memories"}), 500
 
 @app.route('/api/memory/category', methods=['GET'])
@@ -367,10 +628,10 @@ def get_memory_by_category():
             "success": True,
             "category": category,
             "facts": facts,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": _ts_cache["s"]
         })
-    except Exception as e:
-        print(f"❌ Error getting memory by category: {e}")
+    except Exception:
+        logger.exception("Error getting memory by category")
         return jsonify({"error": "Failed to retrieve category memories"}), 500
 
 @app.route('/api/personality/modes', methods=['GET'])
@@ -378,53 +639,53 @@ def get_personality_modes():
     """Get available personality modes"""
     try:
         modes = personality_manager.get_available_modes()
-        current_mode = personality_manager.get_current_mode()
         
+        # The selected mode lives with the client; report the default for new sessions
         return jsonify({
             "modes": modes,
-            "current_mode": current_mode,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "current_mode": personality_manager.default_mode,
+            "timestamp": _ts_cache["s"]
         })
         
-    except Exception as e:
-        print(f"❌ Personality modes error: {e}")
+    except Exception:
+        logger.exception("Personality modes error")
         return jsonify({"error": "Failed to get personality modes"}), 500
 
 @app.route('/api/personality/mode', methods=['POST'])
 def set_personality_mode():
-    """Set the AI personality mode"""
+    """Validate a personality mode for the client to send with its chat messages"""
     try:
-        data = request.get_json()
+        body, error = _parse_body(PersonalityModeRequest, "Personality mode is required")
+        if error:
+            return error
         
-        if not data or 'mode' not in data:
-            return jsonify({"error": "Personality mode is required"}), 400
-        
-        mode = data['mode']
-        success = personality_manager.set_mode(mode)
+        # Modes are passed per chat request, so nothing is changed on the server
+        mode = body.mode
+        success = personality_manager.is_valid_mode(mode)
         
         return jsonify({
             "success": success,
             "current_mode": mode,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": _ts_cache["s"]
         })
         
-    except Exception as e:
-        print(f"❌ Set personality mode error: {e}")
+    except Exception:
+        logger.exception("Set personality mode error")
         return jsonify({"error": "Failed to set personality mode"}), 500
 
 @app.route('/api/journal/start', methods=['POST'])
 def start_journal_entry():
     """Start a new journal entry (save to journals collection)"""
     try:
-        data = request.get_json()
-        user_id = data.get('userId')
-        text = data.get('text')
-        if not user_id or not text:
-            return jsonify({"error": "userId and text are required."}), 400
-        result = memory_manager.save_journal_entry(user_id, text)
-        return jsonify(result)
-    except Exception as e:
-        print(f"❌ Error saving journal entry: {e}")
+        body, error = _parse_body(JournalEntryRequest, "userId and text are required.")
+        if error:
+            return error
+        result = memory_manager.save_journal_entry(body.userId, body.text)
+        if not result.get("success"):
+            return jsonify({"error": "Failed to save journal entry."}), 500
+        return jsonify(dict(result, queued=True)), 202
+    except Exception:
+        logger.exception("Error saving journal entry")
         return jsonify({"error": "Failed to save journal entry."}), 500
 
 @app.route('/api/journal/latest', methods=['GET'])
@@ -436,57 +697,80 @@ def get_latest_journal_entry():
             return jsonify({"error": "userId is required as a query parameter."}), 400
         result = memory_manager.get_latest_journal_entry(user_id)
         return jsonify(result)
-    except Exception as e:
-        print(f"❌ Error retrieving latest journal entry: {e}")
+    except Exception:
+        logger.exception("Error retrieving latest journal entry")
         return jsonify({"error": "Failed to retrieve journal entry."}), 500
 
+@app.route('/api/sos/resources', methods=['GET'])
+def sos_resources():
+    """Get emergency mental health resources"""
+    return Response(_EMERGENCY_JSON, mimetype='application/json')
+
+def _cmd_reflect(content: str, data: dict) -> dict:
+    """Save a reflection"""
+    category = data.get('category', 'general')
+    result = memory_manager.save_reflection(content, category)
+    return {"type": "reflection", "success": True, "result": result}
+
+def _cmd_mood(content: str, data: dict) -> dict:
+    """Log a mood"""
+    mood_value = content if content else data.get('mood', 'neutral')
+    note = data.get('note', '')
+    result = mood_tracker.log_mood(mood_value, note)
+    return {"type": "mood", "success": True, "result": result}
+
+def _cmd_todo(content: str, data: dict) -> dict:
+    """Add a task"""
+    priority = data.get('priority', 'medium')
+    due_date = data.get('due_date')
+    task = task_manager.add_task(content, priority=priority, due_date=due_date)
+    _invalidate_task_cache()
+    return {"type": "task", "success": True, "task": task}
+
+def _cmd_remember(content: str, data: dict) -> dict:
+    """Save to long-term memory"""
+    importance = data.get('importance', 'medium')
+    result = memory_manager.remember_important(content, importance)
+    return {"type": "remember", "success": True, "result": result}
+
+def _cmd_sos(content: str, data: dict) -> dict:
+    """Emergency support"""
+    result = handle_sos_request(content, data)
+    return {"type": "sos", "success": True, "result": result}
+
+def _cmd_show(content: str, data: dict) -> dict:
+    """Show user memories"""
+    return {"type": "show_memories", "success": True, "result": show_memories()}
+
+# Chat command -> handler(content, request data)
+_COMMANDS = {
+    '#reflect': _cmd_reflect,
+    '#mood': _cmd_mood,
+    '#todo': _cmd_todo,
+    '#remember': _cmd_remember,
+    '#sos': _cmd_sos,
+    '#show': _cmd_show
+}
+_COMMAND_SET = frozenset(_COMMANDS)
+
+def is_command(message: str) -> bool:
+    """Check whether a chat message starts with a known command; other #words are plain chat"""
+    command, _, _ = message.partition(' ')
+    return command.lower() in _COMMAND_SET
+
 def process_command(message: str, data: dict) -> dict:
     """Process special commands like #reflect, #mood, #todo, #sos, #remember"""
     try:
-        command_parts = message.split(' ', 1)
-        command = command_parts[0].lower()
-        content = command_parts[1] if len(command_parts) > 1 else ""
-        
-        if command == '#reflect':
-            # Save reflection
-            category = data.get('category', 'general')
-            result = memory_manager.save_reflection(content, category)
-            return {"type": "reflection", "success": True, "result": result}
-            
-        elif command == '#mood':
-            # Log mood
-            mood_value = content if content else data.get('mood', 'neutral')
-            note = data.get('note', '')
-            result = mood_tracker.log_mood(mood_value, note)
-            return {"type": "mood", "success": True, "result": result}
-            
-        elif command == '#todo':
-            # Add task
-            priority = data.get('priority', 'medium')
-            due_date = data.get('due_date')
-            task = task_manager.add_task(content, priority=priority, due_date=due_date)
-            return {"type": "task", "success": True, "task": task}
-            
-        elif command == '#remember':
-            # Save to long-term memory
-            importance = data.get('importance', 'medium')
-            result = memory_manager.remember_important(content, importance)
-            return {"type": "remember", "success": True, "result": result}
-            
-        elif command == '#sos':
-            # Emergency support
-            result = handle_sos_request(content, data)
-            return {"type": "sos", "success": True, "result": result}
-            
-        elif command == '#show':
-            # Show user memories
-            return {"type": "show_memories", "success": True, "result": show_memories()}
-            
-        else:
+        command, _, content = message.partition(' ')
+        
+        handler = _COMMANDS.get(command.lower())
+        if handler is None:
             return {"type": "unknown", "success": False, "error": "Unknown command"}
+        
+        return handler(content, data)
             
     except Exception as e:
-        print(f"❌ Command processing error: {e}")
+        logger.exception("Command processing error")
         return {"type": "error", "success": False, "error": str(e)}
 
 def handle_sos_request(content: str, data: dict) -> dict:
@@ -512,8 +796,8 @@ def handle_sos_request(content: str, data: dict) -> dict:
             "logged": True
         }
         
-    except Exception as e:
-        print(f"❌ SOS handling error: {e}")
+    except Exception:
+        logger.exception("SOS handling error")
         return {"error": "Failed to process SOS request"}
 
 def generate_sos_response(content: str, urgency: str) -> str:
@@ -527,45 +811,47 @@ def generate_sos_response(content: str, urgency: str) -> str:
                 "I'm here to listen and support you. Would you like to talk about what's on your mind or "
                 "explore some coping techniques together?")
 
-def get_emergency_resources() -> list:
+# Static crisis resources, serialized once for the resources endpoint
+_EMERGENCY_RESOURCES = (
+    {
+        "name": "988 Suicide & Crisis Lifeline",
+        "phone": "988",
+        "description": "24/7 crisis support",
+        "website": "https://988lifeline.org"
+    },
+    {
+        "name": "Crisis Text Line",
+        "phone": "Text HOME to 741741",
+        "description": "24/7 text-based crisis support",
+        "website": "https://www.crisistextline.org"
+    },
+    {
+        "name": "NAMI (National Alliance on Mental Illness)",
+        "phone": "1-800-950-NAMI",
+        "description": "Mental health information and support",
+        "website": "https://www.nami.org"
+    }
+)
+_EMERGENCY_JSON = orjson.dumps({"resources": _EMERGENCY_RESOURCES})
+
+def get_emergency_resources() -> tuple:
     """Get list of emergency mental health resources"""
-    return [
-        {
-            "name": "988 Suicide & Crisis Lifeline",
-            "phone": "988",
-            "description": "24/7 crisis support",
-            "website": "https://988lifeline.org"
-        },
-        {
-            "name": "Crisis Text Line",
-            "phone": "Text HOME to 741741",
-            "description": "24/7 text-based crisis support",
-            "website": "https://www.crisistextline.org"
-        },
-        {
-            "name": "NAMI (National Alliance on Mental Illness)",
-            "phone": "1-800-950-NAMI",
-            "description": "Mental health information and support",
-            "website": "https://www.nami.org"
-        }
-    ]
+    return _EMERGENCY_RESOURCES
 
 if __name__ == '__main__':
     try:
         # Check for required environment variables
         if not os.getenv('OPENAI_API_KEY'):
-            print("⚠️  Warning: OPENAI_API_KEY not found in environment variables")
-            print("Please add your OpenAI API key to the .env file")
+            logger.warning("OPENAI_API_KEY not found in environment variables; add it to the .env file")
         
         # Initialize all services
         initialize_services()
         
-        # Start the Flask app
+        # Start the Flask development server (use wsgi.py under gunicorn in production)
         port = int(os.getenv('PORT', 5000))
         debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
         
-        print(f"🚀 Starting Mental Wellness AI Assistant on port {port}")
-        print(f"🧠 Debug mode: {debug_mode}")
+        logger.info("Starting Mental Wellness AI Assistant on port %d (debug mode: %s)", port, debug_mode)
         
         app.run(
             host='0.0.0.0',
@@ -573,6 +859,6 @@ if __name__ == '__main__':
             debug=debug_mode
         )
         
-    except Exception as e:
-        print(f"❌ Failed to start application: {e}")
+    except Exception:
+        logger.exception("Failed to start application")
         exit(1)
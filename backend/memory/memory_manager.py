@@ -1,61 +1,218 @@
 """
 🧠 Memory Manager - Handles Short-term and Long-term Memory Systems
 
-Short-term Memory: ConversationBufferMemory (recent chat context)
+Short-term Memory: bounded window of recent messages (recent chat context)
 Long-term Memory: ChromaDB (persistent user data, reflections, important info)
 """
 
 import os
 import json
+import logging
 import uuid
+import atexit
+import copy
+import heapq
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 import chromadb
+import orjson
 from chromadb.config import Settings
-from langchain.memory import ConversationBufferMemory
+from chromadb.utils import embedding_functions
 from langchain.schema import BaseMessage, HumanMessage, AIMessage
 
+from cache.embedding_cache import EmbeddingCache, embedding_cache_key
+from memory.vector_index import MirroredCollection
+
+
+logger = logging.getLogger(f"wellness.{__name__}")
+
+# Short-term memory keeps this many recent messages; the context string uses the newest few
+_SHORT_TERM_WINDOW = 20
+_SHORT_TERM_CONTEXT_MESSAGES = 10
+
+# How long collection counts in get_memory_stats are reused; writes made through this
+# manager are added to the cached counts as they happen
+_STATS_CACHE_TTL_SECONDS = 5.0
+
+# How long the parsed user profile is reused before re-reading it; with several worker
+# processes it is always re-read (see MemoryManager.set_worker_count)
+_PROFILE_CACHE_TTL_SECONDS = 30.0
+
+# Query embedding cache (repeated chat turns like "hi" or "thanks" embed once)
+_EMBEDDING_CACHE_SIZE = 1024
+_EMBEDDING_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Model behind Chroma's default embedding function, part of the on-disk cache key
+_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+_EMBEDDING_DISK_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH", os.path.join(os.getcwd(), "embedding_cache.sqlite3")
+)
+
+
+# Long-term memory writes are queued and written by a background thread, at most this many
+# per flush (Chroma recommends batches of roughly 50-250), waiting up to the flush interval
+# for a batch to fill
+_WRITE_BATCH_SIZE = 100
+_WRITE_BATCH_SIZE_RANGE = (50, 250)
+_WRITE_FLUSH_INTERVAL_SECONDS = 1.0
+
+
+# Chroma server to use instead of the embedded database, e.g. a sidecar container
+_CHROMA_HOST = os.getenv("CHROMA_HOST")
+_CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
+
+
+# Id of the single user profile record in the user_profile collection
+_USER_PROFILE_ID = "user_profile_main"
+
+# Collections reported by get_memory_stats: collection name -> name in the stats
+_STATS_COLLECTION_NAMES = {
+    "user_reflections": "reflections",
+    "important_memories": "important_memories",
+    "mood_data": "mood_data",
+    "sos_requests": "sos_requests",
+    "user_profile": "user_profile"
+}
+
+
+def _journal_entry(document: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the API form of a stored journal entry"""
+    if "epoch" not in metadata:
+        # Saved before entries were stored as plain text: the document is the JSON entry
+        entry = json.loads(document)
+    else:
+        entry = {"userId": metadata.get("userId"), "date": metadata.get("date"), "text": document}
+    entry["metadata"] = metadata
+    return entry
+
 
 class MemoryManager:
     """Manages both short-term and long-term memory for the AI assistant"""
     
-    def __init__(self, max_token_limit: int = 2000):
+    # Shared instance; the Chroma client and collection handles are opened once per process.
+    # A forked child doesn't reuse its parent's instance, whose SQLite connections can't cross a fork
+    _instance: Optional["MemoryManager"] = None
+    _instance_pid: Optional[int] = None
+    _instance_lock = threading.Lock()
+    
+    @classmethod
+    def get_instance(cls) -> "MemoryManager":
+        """Get the process-wide MemoryManager, creating it on first use in each process"""
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance_pid != os.getpid():
+                cls._instance = cls()
+                cls._instance_pid = os.getpid()
+            return cls._instance
+    
+    def __init__(self, max_token_limit: int = 2000, batch_size: int = _WRITE_BATCH_SIZE,
+                 flush_interval: float = _WRITE_FLUSH_INTERVAL_SECONDS,
+                 short_term_window: int = _SHORT_TERM_WINDOW):
         """
         Initialize memory systems
         
         Args:
             max_token_limit: Token limit for short-term memory buffer
+            batch_size: Most queued writes written in one flush (clamped to 50-250)
+            flush_interval: Seconds the writer waits for more writes before flushing
+            short_term_window: Number of recent messages kept in short-term memory
         """
         self.max_token_limit = max_token_limit
+        self.batch_size = min(max(batch_size, _WRITE_BATCH_SIZE_RANGE[0]), _WRITE_BATCH_SIZE_RANGE[1])
+        self.flush_interval = flush_interval
         
-        # Initialize short-term memory (conversation buffer)
-        self.short_term_memory = ConversationBufferMemory(
-            max_token_limit=max_token_limit,
-            return_messages=True,
-            memory_key="history"
-        )
+        # Writes from the save_* methods as (collection name, record); None asks the
+        # writer to flush what it has collected right away
+        self._write_queue: "queue.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = queue.Queue()
+        # Process running the writer thread (threads do not survive a fork)
+        self._writer_pid: Optional[int] = None
+        self._writer_lock = threading.Lock()
+        
+        # Whether this is the only process using the store; the profile cache and the
+        # unchanged-profile check only see this process's writes (see set_worker_count)
+        self._single_process = True
+        
+        # Serialized profile from the last update, to skip rewriting an unchanged profile
+        self._profile_content: Optional[str] = None
+        # Last get_user_profile result and when it was loaded; replaced on every update
+        self._profile_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._profile_lock = threading.Lock()
+        
+        # Collection counts for get_memory_stats: stats name -> count, and when they were read
+        self._stats_counts: Optional[Dict[str, int]] = None
+        self._stats_counts_time = 0.0
+        self._stats_lock = threading.Lock()
+        
+        # Newest journal entry written or read per user: user id -> (epoch, date, entry id).
+        # Only a starting point for lookups, since other processes may add newer entries
+        self._latest_journals: Dict[str, Tuple[int, str, str]] = {}
+        self._latest_journals_lock = threading.Lock()
+        
+        # Searches the memory collections of one query concurrently
+        self._query_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="memory-query")
+        
+        # Initialize short-term memory: the most recent messages, built once when added
+        self._stm: "deque[BaseMessage]" = deque(maxlen=short_term_window)
+        # The newest messages pre-formatted as "Human: ..." / "AI: ..." for the context string
+        self._stm_strings: "deque[str]" = deque(maxlen=_SHORT_TERM_CONTEXT_MESSAGES)
+        # Messages added since the last clear, including ones that left the window
+        self._stm_total = 0
+        self._stm_lock = threading.Lock()
+        
+        # Query embeddings keyed by a hash of the normalized query: key -> (stored at, embedding)
+        self._embedding_cache: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        
+        # Embeddings kept on disk across restarts
+        try:
+            self.embedding_disk_cache: Optional[EmbeddingCache] = EmbeddingCache(_EMBEDDING_DISK_CACHE_PATH)
+        except Exception:
+            logger.warning("Embedding cache unavailable", exc_info=True)
+            self.embedding_disk_cache = None
         
         # Initialize ChromaDB for long-term memory
         self._init_chromadb()
         
-        print("✅ Memory Manager initialized successfully")
+        # Don't lose queued writes on shutdown
+        atexit.register(self.flush)
+        
+        logger.info("Memory Manager initialized")
     
     def _init_chromadb(self):
         """Initialize ChromaDB client and collections"""
         try:
-            # Create ChromaDB data directory
-            chroma_db_path = os.path.join(os.getcwd(), "chroma_db")
-            os.makedirs(chroma_db_path, exist_ok=True)
-            
-            # Initialize ChromaDB client
-            self.chroma_client = chromadb.PersistentClient(
-                path=chroma_db_path,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
+            if _CHROMA_HOST:
+                # Client/server mode: the Chroma server handles concurrent writers
+                self.chroma_client = chromadb.HttpClient(
+                    host=_CHROMA_HOST,
+                    port=_CHROMA_PORT,
+                    settings=Settings(
+                        anonymized_telemetry=False,
+                        allow_reset=True
+                    )
+                )
+            else:
+                # Create ChromaDB data directory
+                chroma_db_path = os.path.join(os.getcwd(), "chroma_db")
+                os.makedirs(chroma_db_path, exist_ok=True)
+                
+                # Initialize embedded ChromaDB client
+                self.chroma_client = chromadb.PersistentClient(
+                    path=chroma_db_path,
+                    settings=Settings(
+                        anonymized_telemetry=False,
+                        allow_reset=True
+                    )
                 )
-            )
+            
+            # One embedding function (and loaded model) shared by every collection and by
+            # query embedding, so stored and query vectors always come from the same model
+            self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
             
             # Create collections for different types of long-term memory
             self.reflections_collection = self._get_or_create_collection("user_reflections")
@@ -65,115 +222,218 @@ class MemoryManager:
             self.user_profile_collection = self._get_or_create_collection("user_profile")
             self.journals_collection = self._get_or_create_collection("journals")
             
-            print("✅ ChromaDB collections initialized")
+            # Collections by name, for batch writes
+            self.collections = {
+                "user_reflections": self.reflections_collection,
+                "important_memories": self.important_memories_collection,
+                "mood_data": self.mood_data_collection,
+                "sos_requests": self.sos_requests_collection,
+                "user_profile": self.user_profile_collection,
+                "journals": self.journals_collection
+            }
             
-        except Exception as e:
-            print(f"❌ ChromaDB initialization error: {e}")
+            logger.info("ChromaDB collections initialized")
+            
+        except Exception:
+            logger.exception("ChromaDB initialization error")
             raise
     
-    def _get_or_create_collection(self, name: str):
-        """Get existing collection or create new one"""
-        try:
-            return self.chroma_client.get_collection(name)
-        except Exception:
-            return self.chroma_client.create_collection(
-                name=name,
-                metadata={"description": f"Collection for {name}"}
-            )
+    def _get_or_create_collection(self, name: str) -> MirroredCollection:
+        """Get existing collection or create new one, mirrored in memory for fast search"""
+        collection = self.chroma_client.get_or_create_collection(
+            name=name,
+            metadata={"description": f"Collection for {name}"},
+            embedding_function=self.embedding_function
+        )
+        # A Chroma server can take writes from other processes, which a local mirror would miss
+        return MirroredCollection(collection, mirrored=not _CHROMA_HOST)
     
     def add_message_to_short_term(self, human_message: str, ai_response: str):
         """Add conversation exchange to short-term memory"""
         try:
-            self.short_term_memory.chat_memory.add_user_message(human_message)
-            self.short_term_memory.chat_memory.add_ai_message(ai_response)
+            with self._stm_lock:
+                self._stm.append(HumanMessage(content=human_message))
+                self._stm.append(AIMessage(content=ai_response))
+                self._stm_strings.append(f"Human: {human_message}")
+                self._stm_strings.append(f"AI: {ai_response}")
+                self._stm_total += 2
             
-        except Exception as e:
-            print(f"❌ Error adding to short-term memory: {e}")
+        except Exception:
+            logger.exception("Error adding to short-term memory")
+    
+    def get_short_term_messages(self) -> Tuple[List[BaseMessage], int]:
+        """
+        Get the short-term memory window as chat messages
+        
+        Returns:
+            The messages still in the window, oldest first, and the number of
+            messages added since short-term memory was last cleared
+        """
+        with self._stm_lock:
+            return list(self._stm), self._stm_total
     
     def get_short_term_context(self) -> str:
         """Get recent conversation context from short-term memory"""
         try:
-            messages = self.short_term_memory.chat_memory.messages
+            with self._stm_lock:
+                return "\n".join(self._stm_strings)
             
-            context_parts = []
-            for message in messages[-10:]:  # Last 10 messages
-                if isinstance(message, HumanMessage):
-                    context_parts.append(f"Human: {message.content}")
-                elif isinstance(message, AIMessage):
-                    context_parts.append(f"AI: {message.content}")
-            
-            return "\n".join(context_parts)
-            
-        except Exception as e:
-            print(f"❌ Error getting short-term context: {e}")
+        except Exception:
+            logger.exception("Error getting short-term context")
             return ""
     
+    def build_reflection_record(self, reflection_content: str, category: str = "general") -> Dict[str, Any]:
+        """Prepare a reflection for batch_add, assigning its id and timestamp"""
+        reflection_id = str(uuid.uuid4())
+        timestamp = datetime.now(timezone.utc).isoformat()
+        
+        metadata = {
+            "id": reflection_id,
+            "category": category or "general",
+            "timestamp": timestamp,
+            "type": "reflection"
+        }
+        
+        return {"id": reflection_id, "document": reflection_content, "metadata": metadata}
+    
     def save_reflection(self, reflection_content: str, category: str = "general") -> Dict[str, Any]:
         """Save user reflection to long-term memory"""
         try:
-            reflection_id = str(uuid.uuid4())
-            timestamp = datetime.now(timezone.utc).isoformat()
-            
-            metadata = {
-                "id": reflection_id,
-                "category": category,
-                "timestamp": timestamp,
-                "type": "reflection"
-            }
-            
-            # Clean metadata to remove None values
-            metadata = {k: v for k, v in metadata.items() if v is not None}
-            
-            self.reflections_collection.add(
-                ids=[reflection_id],
-                documents=[reflection_content],
-                metadatas=[metadata]
-            )
+            record = self.build_reflection_record(reflection_content, category)
+            self._buffer_add("user_reflections", record)
             
             return {
-                "id": reflection_id,
+                "id": record["id"],
                 "saved": True,
-                "category": category,
-                "timestamp": timestamp
+                "category": category or "general",
+                "timestamp": record["metadata"]["timestamp"]
             }
             
         except Exception as e:
-            print(f"❌ Error saving reflection: {e}")
+            logger.exception("Error saving reflection")
             return {"saved": False, "error": str(e)}
     
+    def build_important_memory_record(self, content: str, importance: str = "medium") -> Dict[str, Any]:
+        """Prepare an important memory for batch_add, assigning its id and timestamp"""
+        memory_id = str(uuid.uuid4())
+        timestamp = datetime.now(timezone.utc).isoformat()
+        
+        metadata = {
+            "id": memory_id,
+            "importance": importance or "medium",
+            "timestamp": timestamp,
+            "type": "important_memory"
+        }
+        
+        return {"id": memory_id, "document": content, "metadata": metadata}
+    
     def remember_important(self, content: str, importance: str = "medium") -> Dict[str, Any]:
         """Save important conversation data to long-term memory"""
         try:
-            memory_id = str(uuid.uuid4())
-            timestamp = datetime.now(timezone.utc).isoformat()
-            
-            metadata = {
-                "id": memory_id,
-                "importance": importance,
-                "timestamp": timestamp,
-                "type": "important_memory"
-            }
-            
-            # Clean metadata to remove None values
-            metadata = {k: v for k, v in metadata.items() if v is not None}
-            
-            self.important_memories_collection.add(
-                ids=[memory_id],
-                documents=[content],
-                metadatas=[metadata]
-            )
+            record = self.build_important_memory_record(content, importance)
+            self._buffer_add("important_memories", record)
             
             return {
-                "id": memory_id,
+                "id": record["id"],
                 "saved": True,
-                "importance": importance,
-                "timestamp": timestamp
+                "importance": importance or "medium",
+                "timestamp": record["metadata"]["timestamp"]
             }
             
         except Exception as e:
-            print(f"❌ Error saving important memory: {e}")
+            logger.exception("Error saving important memory")
             return {"saved": False, "error": str(e)}
     
+    def batch_add(self, collection_name: str, items: List[Dict[str, Any]]):
+        """
+        Write several prepared records to one collection with a single add call
+        
+        Args:
+            collection_name: Name of the collection, e.g. "user_reflections"
+            items: Records from the build_*_record methods, each with id, document and metadata
+        """
+        if not items:
+            return
+        
+        self._add_records(
+            collection_name,
+            [item["id"] for item in items],
+            [item["document"] for item in items],
+            [item["metadata"] for item in items]
+        )
+    
+    def _add_records(self, collection_name: str, ids: List[str], documents: List[str],
+                     metadatas: List[Dict[str, Any]]):
+        """Add records to a collection, noting each user's newest journal entry"""
+        self.collections[collection_name].add(ids=ids, documents=documents, metadatas=metadatas)
+        
+        with self._stats_lock:
+            stats_name = _STATS_COLLECTION_NAMES.get(collection_name)
+            if self._stats_counts is not None and stats_name in self._stats_counts:
+                self._stats_counts[stats_name] += len(ids)
+        
+        if collection_name == "journals":
+            for entry_id, metadata in zip(ids, metadatas):
+                if metadata.get("type") == "journal_entry" and "epoch" in metadata:
+                    self._note_latest_journal(metadata["userId"], metadata["epoch"], metadata["date"], entry_id)
+    
+    def _note_latest_journal(self, user_id: str, epoch: int, date: str, entry_id: str):
+        """Remember a user's journal entry if it is the newest one seen"""
+        with self._latest_journals_lock:
+            known = self._latest_journals.get(user_id)
+            if known is None or date >= known[1]:
+                self._latest_journals[user_id] = (epoch, date, entry_id)
+    
+    def _buffer_add(self, collection_name: str, record: Dict[str, Any]):
+        """Queue a prepared record for the background writer"""
+        self._ensure_writer()
+        self._write_queue.put((collection_name, record))
+    
+    def _ensure_writer(self):
+        """Start the writer thread in this process if it isn't running"""
+        if self._writer_pid == os.getpid():
+            return
+        with self._writer_lock:
+            if self._writer_pid != os.getpid():
+                threading.Thread(target=self._drain_writes, name="memory-manager-writer", daemon=True).start()
+                self._writer_pid = os.getpid()
+    
+    def _drain_writes(self):
+        """Write queued records with one add call per collection per batch"""
+        while True:
+            batch = [self._write_queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._write_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            by_collection: Dict[str, List[Dict[str, Any]]] = {}
+            for item in batch:
+                if item is not None:
+                    by_collection.setdefault(item[0], []).append(item[1])
+            
+            for collection_name, records in by_collection.items():
+                try:
+                    self.batch_add(collection_name, records)
+                except Exception:
+                    logger.exception("Error flushing %d writes to %s", len(records), collection_name)
+            
+            for _ in batch:
+                self._write_queue.task_done()
+    
+    def flush(self):
+        """Wait until all queued long-term memory is written, e.g. before reading it back"""
+        if self._write_queue.unfinished_tasks == 0:
+            return
+        self._ensure_writer()
+        self._write_queue.put(None)
+        self._write_queue.join()
+    
     def save_sos_request(self, sos_data: Dict[str, Any]) -> Dict[str, Any]:
         """Save SOS request to long-term memory for tracking"""
         try:
@@ -181,20 +441,13 @@ class MemoryManager:
             
             metadata = {
                 "id": sos_id,
-                "urgency": sos_data.get("urgency", "medium"),
+                "urgency": sos_data.get("urgency") or "medium",
                 "timestamp": sos_data["timestamp"],
                 "type": "sos_request",
-                "location": sos_data.get("location", "unknown")
+                "location": sos_data.get("location") or "unknown"
             }
             
-            # Clean metadata to remove None values
-            metadata = {k: v for k, v in metadata.items() if v is not None}
-            
-            self.sos_requests_collection.add(
-                ids=[sos_id],
-                documents=[sos_data["content"]],
-                metadatas=[metadata]
-            )
+            self._buffer_add("sos_requests", {"id": sos_id, "document": sos_data["content"], "metadata": metadata})
             
             return {
                 "id": sos_id,
@@ -203,93 +456,185 @@ class MemoryManager:
             }
             
         except Exception as e:
-            print(f"❌ Error saving SOS request: {e}")
+            logger.exception("Error saving SOS request")
             return {"saved": False, "error": str(e)}
     
+    def embed_query_cached(self, text: str) -> List[float]:
+        """
+        Embed a search query, reusing the embedding of a recent identical query
+        
+        Recent embeddings are kept in memory; older ones are read back from the
+        on-disk embedding cache before falling back to the embedding model.
+        
+        Args:
+            text: Query text; case and surrounding whitespace are ignored for reuse
+            
+        Returns:
+            Embedding vector for the query
+        """
+        key = embedding_cache_key(_EMBEDDING_MODEL, text.strip().lower())
+        now = time.monotonic()
+        
+        with self._embedding_cache_lock:
+            cached = self._embedding_cache.get(key)
+            if cached is not None and now - cached[0] < _EMBEDDING_CACHE_TTL_SECONDS:
+                self._embedding_cache.move_to_end(key)
+                return cached[1]
+        
+        embedding = None
+        if self.embedding_disk_cache is not None:
+            try:
+                stored = self.embedding_disk_cache.get(key)
+                if stored is not None:
+                    embedding = stored.tolist()
+            except Exception:
+                logger.warning("Error reading embedding cache", exc_info=True)
+        
+        if embedding is None:
+            embedding = list(self.embedding_function([text])[0])
+            if self.embedding_disk_cache is not None:
+                try:
+                    self.embedding_disk_cache.set(key, embedding)
+                except Exception:
+                    logger.warning("Error writing embedding cache", exc_info=True)
+        
+        with self._embedding_cache_lock:
+            self._embedding_cache[key] = (now, embedding)
+            self._embedding_cache.move_to_end(key)
+            while len(self._embedding_cache) > _EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        
+        return embedding
+    
     def get_relevant_memories(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
         """Retrieve relevant memories based on similarity search"""
         try:
+            # Include memories saved moments ago
+            self.flush()
+            
             # Search across different collections
             relevant_memories = []
             
+            # Embed the query once for all collections
+            query_embedding = self.embed_query_cached(query)
+            
             collections = [
                 ("reflections", self.reflections_collection),
                 ("important_memories", self.important_memories_collection),
                 ("user_profile", self.user_profile_collection)
             ]
             
-            for collection_name, collection in collections:
-                try:
-                    results = collection.query(
-                        query_texts=[query],
-                        n_results=min(n_results, 3)  # Get up to 3 from each collection
-                    )
-                    
-                    if results['documents'] and results['documents'][0]:
-                        for i, doc in enumerate(results['documents'][0]):
-                            metadata = results['metadatas'][0][i] if results['metadatas'] else {}
-                            relevant_memories.append({
-                                "content": doc,
-                                "metadata": metadata,
-                                "collection": collection_name,
-                                "distance": results['distances'][0][i] if results['distances'] else 0
-                            })
-                            
-                except Exception as e:
-                    print(f"❌ Error querying {collection_name}: {e}")
-                    continue
-            
-            # Sort by relevance (lower distance = more relevant)
-            relevant_memories.sort(key=lambda x: x.get('distance', 0))
-            
-            return relevant_memories[:n_results]
+            # Exact search over the in-memory mirror of each collection, in parallel
+            futures = {
+                self._query_pool.submit(
+                    collection.search,
+                    query_embedding,
+                    n_results=min(n_results, 3)  # Get up to 3 from each collection
+                ): collection_name
+                for collection_name, collection in collections
+            }
             
-        except Exception as e:
-            print(f"❌ Error retrieving relevant memories: {e}")
+            # Empty collections return empty results rather than raising
+            for future in as_completed(futures):
+                collection_name = futures[future]
+                results = future.result()
+                for doc, metadata, distance in zip(
+                    results['documents'][0], results['metadatas'][0], results['distances'][0]
+                ):
+                    relevant_memories.append({
+                        "content": doc,
+                        "metadata": metadata,
+                        "collection": collection_name,
+                        "distance": distance
+                    })
+            
+            # Most relevant first (lower distance = more relevant)
+            return heapq.nsmallest(n_results, relevant_memories, key=lambda x: x['distance'])
+            
+        except Exception:
+            logger.exception("Error retrieving relevant memories")
             return []
     
+    def set_worker_count(self, workers: int):
+        """Tell the manager how many worker processes share the store; per-process caches need exactly one"""
+        self._single_process = workers == 1
+        mirrored = self._single_process and not _CHROMA_HOST
+        for collection in (self.reflections_collection, self.important_memories_collection,
+                           self.user_profile_collection):
+            collection.set_mirrored(mirrored)
+    
+    def warm_up(self):
+        """Load the searched collections into memory ahead of the first query"""
+        for collection in (self.reflections_collection, self.important_memories_collection,
+                           self.user_profile_collection):
+            try:
+                collection.preload()
+            except Exception:
+                logger.warning("Could not preload collection %s", collection.name, exc_info=True)
+    
+    def close(self):
+        """Write queued memories and stop the query threads"""
+        self.flush()
+        self._query_pool.shutdown(wait=False)
+    
     def get_user_reflections(self, category: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """Get user reflections, optionally filtered by category"""
         try:
+            self.flush()
+            
             where_filter = {}
             if category:
                 where_filter = {"category": category}
             
-            results = self.reflections_collection.get(
+            # Pick the newest reflections from their metadata alone...
+            candidates = self.reflections_collection.get(
                 where=where_filter if where_filter else None,
-                limit=limit,
-                include=["documents", "metadatas"]
+                include=["metadatas"]
             )
+            newest = heapq.nlargest(
+                limit,
+                zip(candidates['ids'], candidates['metadatas']),
+                key=lambda item: item[1].get('timestamp', '')
+            )
+            if not newest:
+                return []
             
-            reflections = []
-            if results['documents']:
-                for i, doc in enumerate(results['documents']):
-                    metadata = results['metadatas'][i] if results['metadatas'] else {}
-                    reflections.append({
-                        "id": metadata.get('id'),
-                        "content": doc,
-                        "category": metadata.get('category'),
-                        "timestamp": metadata.get('timestamp'),
-                        "type": metadata.get('type')
-                    })
-            
-            # Sort by timestamp (newest first)
-            reflections.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+            # ...then fetch documents for just those
+            results = self.reflections_collection.get(
+                ids=[record_id for record_id, _ in newest],
+                include=["documents"]
+            )
+            documents = dict(zip(results['ids'], results['documents']))
+            
+            # Newest first
+            reflections = [
+                {
+                    "id": metadata.get('id'),
+                    "content": documents.get(record_id),
+                    "category": metadata.get('category'),
+                    "timestamp": metadata.get('timestamp'),
+                    "type": metadata.get('type')
+                }
+                for record_id, metadata in newest
+            ]
             
             return reflections
             
-        except Exception as e:
-            print(f"❌ Error getting reflections: {e}")
+        except Exception:
+            logger.exception("Error getting reflections")
             return []
     
     def update_user_profile(self, profile_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update or create user profile data"""
         try:
-            profile_id = "user_profile_main"
-            timestamp = datetime.now(timezone.utc).isoformat()
+            profile_id = _USER_PROFILE_ID
+            
+            # Prepare profile content (compact JSON)
+            profile_content = orjson.dumps(profile_data, option=orjson.OPT_NON_STR_KEYS).decode()
+            if self._single_process and profile_content == self._profile_content:
+                return {"updated": False, "unchanged": True, "profile_id": profile_id}
             
-            # Prepare profile content
-            profile_content = json.dumps(profile_data, indent=2)
+            timestamp = datetime.now(timezone.utc).isoformat()
             
             metadata = {
                 "id": profile_id,
@@ -298,33 +643,20 @@ class MemoryManager:
                 "last_updated": timestamp
             }
             
-            # Clean metadata to remove None values
-            metadata = {k: v for k, v in metadata.items() if v is not None}
+            # Insert or replace the profile in one write
+            self.user_profile_collection.upsert(
+                ids=[profile_id],
+                documents=[profile_content],
+                metadatas=[metadata]
+            )
             
-            # Check if profile exists
-            try:
-                existing = self.user_profile_collection.get(ids=[profile_id])
-                if existing['ids']:
-                    # Update existing profile
-                    self.user_profile_collection.update(
-                        ids=[profile_id],
-                        documents=[profile_content],
-                        metadatas=[metadata]
-                    )
-                else:
-                    # Create new profile
-                    self.user_profile_collection.add(
-                        ids=[profile_id],
-                        documents=[profile_content],
-                        metadatas=[metadata]
-                    )
-            except Exception:
-                # Create new profile if collection is empty
-                self.user_profile_collection.add(
-                    ids=[profile_id],
-                    documents=[profile_content],
-                    metadatas=[metadata]
-                )
+            self._profile_content = profile_content
+            with self._profile_lock:
+                self._profile_cache = (time.monotonic(), {
+                    "profile": orjson.loads(profile_content),
+                    "metadata": metadata,
+                    "exists": True
+                })
             
             return {
                 "updated": True,
@@ -333,136 +665,161 @@ class MemoryManager:
             }
             
         except Exception as e:
-            print(f"❌ Error updating user profile: {e}")
+            logger.exception("Error updating user profile")
             return {"updated": False, "error": str(e)}
     
+    def _load_user_profile(self) -> Dict[str, Any]:
+        """Get the cached profile result, reading it from ChromaDB when missing or expired"""
+        with self._profile_lock:
+            cached = self._profile_cache
+        if self._single_process and cached and time.monotonic() - cached[0] < _PROFILE_CACHE_TTL_SECONDS:
+            return cached[1]
+        
+        profile_id = _USER_PROFILE_ID
+        results = self.user_profile_collection.get(
+            ids=[profile_id],
+            include=["documents", "metadatas"]
+        )
+        
+        if results['documents'] and results['documents'][0]:
+            profile_data = json.loads(results['documents'][0])
+            metadata = results['metadatas'][0] if results['metadatas'] else {}
+            
+            profile = {
+                "profile": profile_data,
+                "metadata": metadata,
+                "exists": True
+            }
+        else:
+            profile = {"exists": False, "profile": {}}
+        
+        with self._profile_lock:
+            self._profile_cache = (time.monotonic(), profile)
+        return profile
+    
     def get_user_profile(self) -> Dict[str, Any]:
         """Get current user profile"""
         try:
-            profile_id = "user_profile_main"
-            results = self.user_profile_collection.get(
-                ids=[profile_id],
-                include=["documents", "metadatas"]
-            )
-            
-            if results['documents'] and results['documents'][0]:
-                profile_data = json.loads(results['documents'][0])
-                metadata = results['metadatas'][0] if results['metadatas'] else {}
-                
-                return {
-                    "profile": profile_data,
-                    "metadata": metadata,
-                    "exists": True
-                }
-            else:
-                return {"exists": False, "profile": {}}
+            # Callers may modify the result; keep the cached copy intact
+            return copy.deepcopy(self._load_user_profile())
                 
         except Exception as e:
-            print(f"❌ Error getting user profile: {e}")
+            logger.exception("Error getting user profile")
             return {"exists": False, "error": str(e)}
     
     def get_user_memory_category(self, category: str) -> list:
         """Get a list of facts for a given category from the user's profile memories."""
         try:
-            profile = self.get_user_profile()
-            memories = profile.get('profile', {}).get('memories', {})
-            return memories.get(category, [])
-        except Exception as e:
-            print(f"❌ Error getting user memory category '{category}': {e}")
+            memories = self._load_user_profile().get('profile', {}).get('memories', {})
+            return list(memories.get(category, []))
+        except Exception:
+            logger.exception("Error getting user memory category '%s'", category)
             return []
     
     def clear_short_term_memory(self):
         """Clear the short-term conversation buffer"""
         try:
-            self.short_term_memory.clear()
-            print("✅ Short-term memory cleared")
+            with self._stm_lock:
+                self._stm.clear()
+                self._stm_strings.clear()
+                self._stm_total = 0
+            logger.info("Short-term memory cleared")
             
-        except Exception as e:
-            print(f"❌ Error clearing short-term memory: {e}")
+        except Exception:
+            logger.exception("Error clearing short-term memory")
     
     def get_memory_stats(self) -> Dict[str, Any]:
         """Get statistics about memory usage"""
         try:
             stats = {
                 "short_term": {
-                    "message_count": len(self.short_term_memory.chat_memory.messages),
+                    "message_count": len(self._stm),
                     "max_token_limit": self.max_token_limit
                 },
                 "long_term": {}
             }
             
-            # Get counts from each collection
-            collections = [
-                ("reflections", self.reflections_collection),
-                ("important_memories", self.important_memories_collection),
-                ("mood_data", self.mood_data_collection),
-                ("sos_requests", self.sos_requests_collection),
-                ("user_profile", self.user_profile_collection)
-            ]
-            
-            for name, collection in collections:
+            # Get counts from each collection, including pending writes
+            self.flush()
+            with self._stats_lock:
+                if (self._stats_counts is not None
+                        and time.monotonic() - self._stats_counts_time < _STATS_CACHE_TTL_SECONDS):
+                    stats["long_term"] = dict(self._stats_counts)
+                    return stats
+            
+            counts = {}
+            complete = True
+            for collection_name, name in _STATS_COLLECTION_NAMES.items():
                 try:
-                    count = collection.count()
-                    stats["long_term"][name] = count
-                except Exception as e:
-                    print(f"❌ Error getting count for {name}: {e}")
-                    stats["long_term"][name] = 0
-            
+                    counts[name] = self.collections[collection_name].count()
+                except Exception:
+                    logger.warning("Error getting count for %s", name, exc_info=True)
+                    counts[name] = 0
+                    complete = False
+            
+            if complete:
+                with self._stats_lock:
+                    self._stats_counts = counts
+                    self._stats_counts_time = time.monotonic()
+            
+            stats["long_term"] = dict(counts)
             return stats
             
         except Exception as e:
-            print(f"❌ Error getting memory stats: {e}")
+            logger.exception("Error getting memory stats")
             return {"error": str(e)}
 
+    def build_journal_record(self, user_id: str, text: str) -> dict:
+        """Prepare a journal entry for batch_add, assigning its id and date."""
+        entry_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        metadata = {
+            "id": entry_id,
+            "userId": user_id,
+            "date": now.isoformat(),
+            "epoch": int(now.timestamp()),
+            "type": "journal_entry"
+        }
+        # The document is the text itself; userId and date live in the metadata
+        return {"id": entry_id, "document": text, "metadata": metadata}
+
     def save_journal_entry(self, user_id: str, text: str) -> dict:
         """Save a journal entry for a user."""
         try:
-            entry_id = str(uuid.uuid4())
-            timestamp = datetime.now(timezone.utc).isoformat()
-            entry = {
-                "userId": user_id,
-                "date": timestamp,
-                "text": text
-            }
-            metadata = {
-                "id": entry_id,
-                "userId": user_id,
-                "date": timestamp,
-                "type": "journal_entry"
-            }
-            self.journals_collection.add(
-                ids=[entry_id],
-                documents=[json.dumps(entry)],
-                metadatas=[metadata]
-            )
-            return {"success": True, "id": entry_id, "timestamp": timestamp}
+            record = self.build_journal_record(user_id, text)
+            self._buffer_add("journals", record)
+            return {"success": True, "id": record["id"], "timestamp": record["metadata"]["date"]}
         except Exception as e:
-            print(f"❌ Error saving journal entry: {e}")
+            logger.exception("Error saving journal entry")
             return {"success": False, "error": str(e)}
 
     def get_latest_journal_entry(self, user_id: str) -> dict:
         """Retrieve the latest journal entry for a user."""
         try:
-            results = self.journals_collection.get(
-                where={"userId": user_id, "type": "journal_entry"},
-                include=["documents", "metadatas"]
-            )
-            entries = []
-            if results['documents']:
-                for i, doc in enumerate(results['documents']):
-                    try:
-                        entry = json.loads(doc)
-                        entry['metadata'] = results['metadatas'][i] if results['metadatas'] else {}
-                        entries.append(entry)
-                    except Exception as e:
-                        print(f"❌ Error parsing journal entry: {e}")
-                        continue
-            if not entries:
+            self.flush()
+            
+            # Once the newest entry is known, only entries from that second on can be newer
+            conditions = [{"userId": user_id}, {"type": "journal_entry"}]
+            with self._latest_journals_lock:
+                known = self._latest_journals.get(user_id)
+            if known is not None:
+                conditions.append({"epoch": {"$gte": known[0]}})
+            
+            # Pick the newest by its metadata date, then fetch only that entry's document
+            candidates = self.journals_collection.get(where={"$and": conditions}, include=["metadatas"])
+            if known is not None and not candidates['ids']:
+                # The remembered entry is gone; look through all of the user's entries
+                candidates = self.journals_collection.get(where={"$and": conditions[:2]}, include=["metadatas"])
+            if not candidates['ids']:
                 return {"success": False, "error": "No journal entries found."}
-            # Sort by date descending
-            entries.sort(key=lambda x: x['date'], reverse=True)
-            latest = entries[0]
-            return {"success": True, "entry": latest}
+            newest_id, newest = max(
+                zip(candidates['ids'], candidates['metadatas']),
+                key=lambda item: item[1].get('date', '')
+            )
+            if "epoch" in newest:
+                self._note_latest_journal(user_id, newest["epoch"], newest["date"], newest_id)
+            results = self.journals_collection.get(ids=[newest_id], include=["documents", "metadatas"])
+            return {"success": True, "entry": _journal_entry(results['documents'][0], results['metadatas'][0])}
         except Exception as e:
-            print(f"❌ Error retrieving latest journal entry: {e}")
+            logger.exception("Error retrieving latest journal entry")
             return {"success": False, "error": str(e)}
@@ -0,0 +1,263 @@
+"""
+🔎 Vector Index - In-memory mirror of a ChromaDB collection for fast search
+
+Wraps a Chroma collection so reads and writes behave as before, while a copy
+of its embeddings is kept in a NumPy matrix. Nearest-neighbour queries over
+small collections are then an exact matrix-vector product instead of a
+round trip through Chroma's persistence layer.
+
+Once a collection is large enough, the copy is scalar-quantized to INT8 with
+a per-dimension scale, cutting its memory to a quarter. Chroma keeps the
+full-precision embeddings as the source of truth.
+
+The mirror only sees writes made through this process. When other processes
+write to the same store, mirroring is turned off and searches go to Chroma.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# Rows in the mirror before it is quantized; the scales are trained on these rows
+_QUANTIZE_MIN_ROWS = 10000
+# Room above the largest value seen in training before later vectors are clipped
+_SCALE_HEADROOM = 1.1
+# Quantized rows dequantized at a time during a search
+_SCAN_BLOCK_ROWS = 4096
+
+
+class MirroredCollection:
+    """Chroma collection proxy that mirrors embeddings, documents and metadata in memory"""
+    
+    def __init__(self, collection, quantize_min_rows: int = _QUANTIZE_MIN_ROWS, mirrored: bool = True):
+        """
+        Wrap a collection; the mirror is loaded on the first search
+        
+        Args:
+            collection: ChromaDB collection to wrap
+            quantize_min_rows: Mirror size at which embeddings are stored as INT8
+            mirrored: Whether to search a local mirror; off when other processes write to the collection
+        """
+        self._collection = collection
+        self.quantize_min_rows = quantize_min_rows
+        self._space = (collection.metadata or {}).get("hnsw:space", "l2")
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._mirrored = mirrored
+        
+        self._ids: List[str] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        # float32 rows, or int8 codes once _scale is set (value = code * scale)
+        self._embeddings: Optional[np.ndarray] = None
+        self._scale: Optional[np.ndarray] = None
+        # Squared length of each stored (dequantized) row
+        self._squared_norms: Optional[np.ndarray] = None
+        self._row_by_id: Dict[str, int] = {}
+    
+    def __getattr__(self, name: str):
+        # Everything not overridden here (get, count, name, ...) goes to the collection
+        return getattr(self._collection, name)
+    
+    def add(self, ids, **kwargs):
+        """Add records to the collection and the mirror"""
+        self._collection.add(ids=ids, **kwargs)
+        self._refresh(ids)
+    
+    def update(self, ids, **kwargs):
+        """Update records in the collection and the mirror"""
+        self._collection.update(ids=ids, **kwargs)
+        self._refresh(ids)
+    
+    def upsert(self, ids, **kwargs):
+        """Insert or update records in the collection and the mirror"""
+        self._collection.upsert(ids=ids, **kwargs)
+        self._refresh(ids)
+    
+    def delete(self, ids: Optional[List[str]] = None, **kwargs):
+        """Delete records from the collection and the mirror"""
+        self._collection.delete(ids=ids, **kwargs)
+        with self._lock:
+            if not self._loaded:
+                return
+            if ids is None or any(value is not None for value in kwargs.values()):
+                # Filtered deletes can't be replayed locally; reload on the next search
+                self._loaded = False
+            else:
+                self._remove_rows([self._row_by_id[i] for i in set(ids) if i in self._row_by_id])
+    
+    def preload(self):
+        """Load the mirror now instead of on the first search"""
+        with self._lock:
+            if self._mirrored and not self._loaded:
+                self._load()
+    
+    def set_mirrored(self, mirrored: bool):
+        """Turn the mirror on or off; turning it off frees the mirrored rows"""
+        with self._lock:
+            self._mirrored = mirrored
+            if not mirrored:
+                self._loaded = False
+                self._clear()
+    
+    def _refresh(self, ids):
+        """Copy the stored state of written records into the mirror"""
+        with self._lock:
+            if not self._loaded:
+                return
+            ids = [ids] if isinstance(ids, str) else list(ids)
+            results = self._collection.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+            self._upsert_rows(results)
+    
+    def _clear(self):
+        """Empty the mirror"""
+        self._ids, self._documents, self._metadatas = [], [], []
+        self._embeddings = None
+        self._scale = None
+        self._squared_norms = None
+        self._row_by_id = {}
+    
+    def _load(self):
+        """Read the whole collection into the mirror"""
+        self._clear()
+        self._upsert_rows(self._collection.get(include=["embeddings", "documents", "metadatas"]))
+        self._loaded = True
+    
+    def _upsert_rows(self, results: Dict[str, Any]):
+        """Insert or replace rows from a collection.get result"""
+        if not results["ids"]:
+            return
+        
+        vectors = np.asarray(results["embeddings"], dtype=np.float32)
+        if self._scale is not None:
+            vectors = self._quantize(vectors)
+        squared_norms = self._row_squared_norms(vectors)
+        new_rows = []
+        for position, record_id in enumerate(results["ids"]):
+            row = self._row_by_id.get(record_id)
+            document = results["documents"][position] if results["documents"] else None
+            metadata = results["metadatas"][position] if results["metadatas"] else None
+            if row is None:
+                self._row_by_id[record_id] = len(self._ids)
+                self._ids.append(record_id)
+                self._documents.append(document)
+                self._metadatas.append(metadata or {})
+                new_rows.append(position)
+            else:
+                self._embeddings[row] = vectors[position]
+                self._squared_norms[row] = squared_norms[position]
+                self._documents[row] = document
+                self._metadatas[row] = metadata or {}
+        
+        if new_rows:
+            added = vectors[new_rows]
+            self._embeddings = added if self._embeddings is None else np.vstack((self._embeddings, added))
+            added_norms = squared_norms[new_rows]
+            self._squared_norms = (
+                added_norms if self._squared_norms is None else np.concatenate((self._squared_norms, added_norms))
+            )
+        
+        if self._scale is None and len(self._ids) >= self.quantize_min_rows:
+            # Train per-dimension scales on the rows so far, then store everything as INT8
+            self._scale = np.maximum(np.abs(self._embeddings).max(axis=0) * _SCALE_HEADROOM, 1e-6) / 127
+            self._embeddings = self._quantize(self._embeddings)
+            self._squared_norms = self._row_squared_norms(self._embeddings)
+    
+    def _quantize(self, vectors: np.ndarray) -> np.ndarray:
+        """Encode float32 vectors as INT8 codes with the trained scales"""
+        return np.clip(np.rint(vectors / self._scale), -127, 127).astype(np.int8)
+    
+    def _row_squared_norms(self, vectors: np.ndarray) -> np.ndarray:
+        """Squared lengths of stored rows, dequantizing INT8 codes"""
+        if self._scale is not None:
+            vectors = vectors * self._scale
+        return np.einsum("ij,ij->i", vectors, vectors)
+    
+    def _dots(self, query: np.ndarray) -> np.ndarray:
+        """Dot products of every row with the query"""
+        if self._scale is None:
+            return self._embeddings @ query
+        
+        # code . (query * scale) equals the dequantized dot product; convert the codes
+        # in blocks so a search never holds a full float32 copy
+        scaled_query = query * self._scale
+        dots = np.empty(len(self._embeddings), dtype=np.float32)
+        for start in range(0, len(self._embeddings), _SCAN_BLOCK_ROWS):
+            block = self._embeddings[start:start + _SCAN_BLOCK_ROWS]
+            dots[start:start + len(block)] = block.astype(np.float32) @ scaled_query
+        return dots
+    
+    def _remove_rows(self, rows: List[int]):
+        """Drop rows from the mirror"""
+        if not rows:
+            return
+        removed = set(rows)
+        keep = [row for row in range(len(self._ids)) if row not in removed]
+        self._ids = [self._ids[row] for row in keep]
+        self._documents = [self._documents[row] for row in keep]
+        self._metadatas = [self._metadatas[row] for row in keep]
+        self._embeddings = self._embeddings[keep]
+        self._squared_norms = self._squared_norms[keep]
+        self._row_by_id = {record_id: row for row, record_id in enumerate(self._ids)}
+    
+    def _distances(self, query: np.ndarray) -> np.ndarray:
+        """Distances from the query to every row, in the collection's distance space"""
+        dots = self._dots(query)
+        if self._space == "ip":
+            return 1.0 - dots
+        if self._space == "cosine":
+            norms = np.sqrt(self._squared_norms) * np.linalg.norm(query)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return 1.0 - np.where(norms > 0, dots / norms, 0.0)
+        # Squared L2, as Chroma reports it
+        return self._squared_norms - 2.0 * dots + query @ query
+    
+    def search(self, query_embedding: Sequence[float], n_results: int = 10) -> Dict[str, List[list]]:
+        """
+        Nearest-neighbour search over the mirrored embeddings
+        
+        Exact until the mirror is quantized; after that, distances are computed
+        from the INT8 codes. Without a mirror, the collection is queried directly.
+        
+        Args:
+            query_embedding: Embedding to search with
+            n_results: Maximum number of results
+        
+        Returns:
+            Result in the shape of collection.query for a single query:
+            ids, documents, metadatas and distances, each a list holding one list
+        """
+        if not self._mirrored:
+            if n_results <= 0:
+                return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+            results = self._collection.query(
+                query_embeddings=[list(map(float, query_embedding))],
+                n_results=n_results,
+                include=["documents", "metadatas", "distances"]
+            )
+            results["metadatas"] = [[metadata or {} for metadata in results["metadatas"][0]]]
+            return results
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            
+            count = len(self._ids)
+            if not count or n_results <= 0 or self._embeddings.shape[1] != query.shape[0]:
+                return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+            
+            distances = self._distances(query)
+            k = min(n_results, count)
+            nearest = np.argpartition(distances, k - 1)[:k] if k < count else np.arange(count)
+            nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+            
+            return {
+                "ids": [[self._ids[row] for row in nearest]],
+                "documents": [[self._documents[row] for row in nearest]],
+                "metadatas": [[dict(self._metadatas[row]) for row in nearest]],
+                "distances": [distances[nearest].tolist()]
+            }
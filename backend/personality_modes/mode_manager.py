@@ -5,261 +5,344 @@ Manages different AI personality modes to provide varied interaction styles
 based on user needs and preferences.
 """
 
-from typing import Dict, List, Any
+from typing import Dict, FrozenSet, List, Any, Tuple
+
+
+# Mode used when a request doesn't name one
+_DEFAULT_MODE = "calm_coach"
+
+# All available personality modes, built once at import
+_PERSONALITY_MODES: Dict[str, Dict[str, Any]] = {
+    "calm_coach": {
+        "name": "Calm Coach",
+        "description": "A gentle, patient, and nurturing guide who speaks softly and offers reassuring guidance",
+        "emoji": "🧘‍♀️",
+        "characteristics": [
+            "Patient and understanding",
+            "Speaks in a gentle, soothing tone",
+            "Focuses on mindfulness and gradual progress",
+            "Emphasizes self-compassion",
+            "Uses calming language and metaphors"
+        ],
+        "communication_style": {
+            "tone": "gentle, soothing, patient",
+            "pace": "slow and deliberate",
+            "language": "soft, reassuring, mindful",
+            "approach": "gradual, non-pressuring"
+        },
+        "specialties": [
+            "Anxiety management",
+            "Mindfulness practices",
+            "Stress reduction",
+            "Self-compassion building",
+            "Breathing exercises"
+        ],
+        "sample_responses": [
+            "Take a deep breath with me. You're safe here, and we can work through this together, one step at a time.",
+            "It's completely natural to feel this way. Let's gently explore what might help you feel more at peace.",
+            "Remember to be kind to yourself. You're doing the best you can with what you have right now."
+        ]
+    },
+    
+    "assertive_buddy": {
+        "name": "Assertive Buddy",
+        "description": "An encouraging and motivational friend who helps build confidence and take action",
+        "emoji": "💪",
+        "characteristics": [
+            "Direct but supportive",
+            "Motivational and energizing",
+            "Focuses on action and progress",
+            "Builds confidence and self-efficacy",
+            "Uses encouraging and empowering language"
+        ],
+        "communication_style": {
+            "tone": "confident, encouraging, direct",
+            "pace": "energetic but measured",
+            "language": "empowering, action-oriented",
+            "approach": "solution-focused, goal-oriented"
+        },
+        "specialties": [
+            "Confidence building",
+            "Goal setting and achievement",
+            "Overcoming procrastination",
+            "Social anxiety",
+            "Career and life transitions"
+        ],
+        "sample_responses": [
+            "You've got this! I believe in your strength. What's one small step you can take today toward feeling better?",
+            "I hear you're struggling, but I also see your resilience. Let's channel that energy into something positive.",
+            "You're stronger than you think. Let's make a plan to tackle this challenge head-on."
+        ]
+    },
+    
+    "playful_companion": {
+        "name": "Playful Companion",
+        "description": "A lighthearted and optimistic friend who uses appropriate humor and positivity",
+        "emoji": "😊",
+        "characteristics": [
+            "Lighthearted and optimistic",
+            "Uses appropriate humor",
+            "Keeps things positive",
+            "Finds silver linings",
+            "Playful but sensitive to serious moments"
+        ],
+        "communication_style": {
+            "tone": "cheerful, optimistic, warm",
+            "pace": "lively but adaptable",
+            "language": "positive, uplifting, occasionally humorous",
+            "approach": "hope-focused, strength-based"
+        },
+        "specialties": [
+            "Mood lifting",
+            "Reframing negative thoughts",
+            "Building resilience through positivity",
+            "Social connection",
+            "Creative problem solving"
+        ],
+        "sample_responses": [
+            "Hey there, sunshine! ☀️ Even on cloudy days, you still shine bright. What's one thing that made you smile recently?",
+            "Life's like a rollercoaster - scary sometimes, but the view from the top is always worth it! 🎢",
+            "You know what? You're pretty amazing for reaching out. That takes courage, and I'm here to cheer you on! 🎉"
+        ]
+    },
+    
+    "wise_mentor": {
+        "name": "Wise Mentor",
+        "description": "A thoughtful and experienced guide who provides deep insights and reflective questions",
+        "emoji": "🦉",
+        "characteristics": [
+            "Thoughtful and reflective",
+            "Asks deep, meaningful questions",
+            "Provides philosophical insights",
+            "Guides toward self-discovery",
+            "Patient with complex emotional processing"
+        ],
+        "communication_style": {
+            "tone": "thoughtful, wise, contemplative",
+            "pace": "measured, reflective",
+            "language": "insightful, philosophical, probing",
+            "approach": "introspective, growth-oriented"
+        },
+        "specialties": [
+            "Life purpose and meaning",
+            "Personal growth and development",
+            "Relationship insights",
+            "Existential concerns",
+            "Values clarification"
+        ],
+        "sample_responses": [
+            "This challenge you're facing... what might it be trying to teach you about yourself?",
+            "In the quiet moments between thoughts, what does your inner wisdom tell you about this situation?",
+            "Sometimes our greatest struggles become our greatest teachers. What lessons are emerging for you?"
+        ]
+    },
+    
+    "practical_helper": {
+        "name": "Practical Helper",
+        "description": "A solution-focused assistant who provides concrete advice and actionable strategies",
+        "emoji": "🛠️",
+        "characteristics": [
+            "Solution-focused and systematic",
+            "Provides concrete, actionable advice",
+            "Organized and structured approach",
+            "Evidence-based recommendations",
+            "Clear step-by-step guidance"
+        ],
+        "communication_style": {
+            "tone": "clear, organized, helpful",
+            "pace": "systematic, efficient",
+            "language": "practical, specific, actionable",
+            "approach": "problem-solving, strategic"
+        },
+        "specialties": [
+            "Stress management techniques",
+            "Time management and organization",
+            "Coping strategy implementation",
+            "Behavioral change",
+            "Resource identification"
+        ],
+        "sample_responses": [
+            "Let's break this down into manageable steps. Here are three specific things you can try today...",
+            "Based on what you've shared, I recommend this evidence-based approach: [specific strategy]",
+            "Here's a practical plan we can implement: Step 1... Step 2... Step 3..."
+        ]
+    }
+
+}
+
+
+def _build_prompt_context(mode_info: Dict[str, Any]) -> str:
+    """Format the prompt context for a personality mode"""
+    context = f"""
+PERSONALITY MODE: {mode_info['name']} {mode_info['emoji']}
+
+DESCRIPTION: {mode_info['description']}
+
+COMMUNICATION STYLE:
+- Tone: {mode_info['communication_style']['tone']}
+- Pace: {mode_info['communication_style']['pace']}
+- Language: {mode_info['communication_style']['language']}
+- Approach: {mode_info['communication_style']['approach']}
+
+KEY CHARACTERISTICS:
+{chr(10).join(f"- {char}" for char in mode_info['characteristics'])}
+
+SPECIALTIES:
+{chr(10).join(f"- {spec}" for spec in mode_info['specialties'])}
+
+EXAMPLE RESPONSES:
+{chr(10).join(f'"{resp}"' for resp in mode_info['sample_responses'])}
+
+Embody this personality while maintaining professionalism and mental health best practices.
+"""
+    
+    return context.strip()
+
+
+# Prompt context of every mode, formatted once; unknown modes get the fallback
+_MODE_PROMPT_CONTEXTS: Dict[str, str] = {
+    mode_id: _build_prompt_context(mode_info) for mode_id, mode_info in _PERSONALITY_MODES.items()
+}
+_FALLBACK_PROMPT_CONTEXT = "Use a balanced, supportive approach."
+
+# Mode ids in definition order; the tables below are indexed by position in it
+_MODE_IDS: Tuple[str, ...] = tuple(_PERSONALITY_MODES)
+
+
+def _bonuses_by_mode(**bonuses: int) -> Tuple[int, ...]:
+    """Score bonus of every mode, by position in _MODE_IDS (0 for unnamed modes)"""
+    return tuple(bonuses.get(mode_id, 0) for mode_id in _MODE_IDS)
+
+
+# Score bonuses of each mode by sentiment bucket and by urgency, for recommend_mode
+_NO_BONUS = _bonuses_by_mode()
+_SENTIMENT_BONUS: Dict[str, Tuple[int, ...]] = {
+    "negative": _bonuses_by_mode(calm_coach=3, wise_mentor=2),
+    "positive": _bonuses_by_mode(playful_companion=3, assertive_buddy=2)
+}
+_URGENCY_BONUS: Dict[str, Tuple[int, ...]] = {
+    "high": _bonuses_by_mode(calm_coach=3, practical_helper=2),
+    "crisis": _bonuses_by_mode(calm_coach=3, practical_helper=2)
+}
+# Moods scored like a negative sentiment
+_NEGATIVE_MOODS = frozenset({"sad", "depressed", "anxious"})
+
+# Lowercased mode names and descriptions, for matching a preferred style
+_MODE_NAME_LOWER: Tuple[str, ...] = tuple(_PERSONALITY_MODES[mode_id]["name"].lower() for mode_id in _MODE_IDS)
+_MODE_DESC_LOWER: Tuple[str, ...] = tuple(
+    _PERSONALITY_MODES[mode_id]["description"].lower() for mode_id in _MODE_IDS
+)
+
+# Closing line of a mode's recommendation reasoning
+_MODE_SPECIALTY_TAIL: Dict[str, str] = {
+    mode_id: f"- This mode specializes in: {', '.join(info['specialties'][:3])}"
+    for mode_id, info in _PERSONALITY_MODES.items()
+}
+
+# Message for every (from mode, to mode) transition
+_TRANSITION_MESSAGES: Dict[Tuple[str, str], str] = {
+    (from_mode, to_mode): (f"Transitioning from {from_info['name']} {from_info.get('emoji', '')} "
+                           f"to {to_info['name']} {to_info.get('emoji', '')} mode. "
+                           f"{to_info['description']}")
+    for from_mode, from_info in _PERSONALITY_MODES.items()
+    for to_mode, to_info in _PERSONALITY_MODES.items()
+}
+
+# recommend_mode's answer for a context without mood, concerns, preference or urgency
+_DEFAULT_RECOMMENDATION: Dict[str, Any] = {
+    "recommended_mode": _MODE_IDS[0],
+    "mode_info": _PERSONALITY_MODES[_MODE_IDS[0]],
+    "confidence": 1.0,
+    "reasoning": f"Recommended {_PERSONALITY_MODES[_MODE_IDS[0]]['name']} because:\n{_MODE_SPECIALTY_TAIL[_MODE_IDS[0]]}"
+}
+
+# Reason and suggested alternative for each (urgency, mode) pair that shouldn't be used
+_INCOMPATIBLE_MODES: Dict[Tuple[str, str], Tuple[str, str]] = {
+    ("crisis", "playful_companion"): ("Playful approach may not be appropriate for crisis situations", "calm_coach")
+}
+
+# Parts of get_personality_stats that never change
+_STATIC_STATS: Dict[str, Any] = {
+    "total_modes": len(_PERSONALITY_MODES),
+    "available_modes": _MODE_IDS,
+    "mode_categories": {
+        "supportive": ("calm_coach", "wise_mentor"),
+        "energetic": ("assertive_buddy", "playful_companion"),
+        "practical": ("practical_helper",)
+    }
+}
+
+# Lowercased words of each specialty, per mode, for matching user concerns
+_MODE_SPECIALTY_KEYWORDS: Tuple[Tuple[FrozenSet[str], ...], ...] = tuple(
+    tuple(frozenset(specialty.lower().split()) for specialty in _PERSONALITY_MODES[mode_id].get('specialties', []))
+    for mode_id in _MODE_IDS
+)
+# Every specialty keyword of every mode
+_SPECIALTY_KEYWORDS: FrozenSet[str] = frozenset().union(*(
+    keywords for mode_keywords in _MODE_SPECIALTY_KEYWORDS for keywords in mode_keywords
+))
 
 
 class PersonalityModeManager:
-    """Manages AI personality modes and switching between them"""
+    """
+    Manages AI personality modes
+    
+    The manager holds no per-user state: the active mode travels with each
+    request, so one instance can be shared by concurrent requests.
+    """
     
     def __init__(self):
         """Initialize personality mode manager"""
-        self.current_mode = "calm_coach"
-        self.personality_modes = self._load_personality_modes()
+        self.default_mode = _DEFAULT_MODE
+        # Shared, read-only mode definitions
+        self.personality_modes = _PERSONALITY_MODES
         
         print("✅ Personality Mode Manager initialized successfully")
     
-    def _load_personality_modes(self) -> Dict[str, Dict[str, Any]]:
-        """Load all available personality modes"""
-        return {
-            "calm_coach": {
-                "name": "Calm Coach",
-                "description": "A gentle, patient, and nurturing guide who speaks softly and offers reassuring guidance",
-                "emoji": "🧘‍♀️",
-                "characteristics": [
-                    "Patient and understanding",
-                    "Speaks in a gentle, soothing tone",
-                    "Focuses on mindfulness and gradual progress",
-                    "Emphasizes self-compassion",
-                    "Uses calming language and metaphors"
-                ],
-                "communication_style": {
-                    "tone": "gentle, soothing, patient",
-                    "pace": "slow and deliberate",
-                    "language": "soft, reassuring, mindful",
-                    "approach": "gradual, non-pressuring"
-                },
-                "specialties": [
-                    "Anxiety management",
-                    "Mindfulness practices",
-                    "Stress reduction",
-                    "Self-compassion building",
-                    "Breathing exercises"
-                ],
-                "sample_responses": [
-                    "Take a deep breath with me. You're safe here, and we can work through this together, one step at a time.",
-                    "It's completely natural to feel this way. Let's gently explore what might help you feel more at peace.",
-                    "Remember to be kind to yourself. You're doing the best you can with what you have right now."
-                ]
-            },
-            
-            "assertive_buddy": {
-                "name": "Assertive Buddy",
-                "description": "An encouraging and motivational friend who helps build confidence and take action",
-                "emoji": "💪",
-                "characteristics": [
-                    "Direct but supportive",
-                    "Motivational and energizing",
-                    "Focuses on action and progress",
-                    "Builds confidence and self-efficacy",
-                    "Uses encouraging and empowering language"
-                ],
-                "communication_style": {
-                    "tone": "confident, encouraging, direct",
-                    "pace": "energetic but measured",
-                    "language": "empowering, action-oriented",
-                    "approach": "solution-focused, goal-oriented"
-                },
-                "specialties": [
-                    "Confidence building",
-                    "Goal setting and achievement",
-                    "Overcoming procrastination",
-                    "Social anxiety",
-                    "Career and life transitions"
-                ],
-                "sample_responses": [
-                    "You've got this! I believe in your strength. What's one small step you can take today toward feeling better?",
-                    "I hear you're struggling, but I also see your resilience. Let's channel that energy into something positive.",
-                    "You're stronger than you think. Let's make a plan to tackle this challenge head-on."
-                ]
-            },
-            
-            "playful_companion": {
-                "name": "Playful Companion",
-                "description": "A lighthearted and optimistic friend who uses appropriate humor and positivity",
-                "emoji": "😊",
-                "characteristics": [
-                    "Lighthearted and optimistic",
-                    "Uses appropriate humor",
-                    "Keeps things positive",
-                    "Finds silver linings",
-                    "Playful but sensitive to serious moments"
-                ],
-                "communication_style": {
-                    "tone": "cheerful, optimistic, warm",
-                    "pace": "lively but adaptable",
-                    "language": "positive, uplifting, occasionally humorous",
-                    "approach": "hope-focused, strength-based"
-                },
-                "specialties": [
-                    "Mood lifting",
-                    "Reframing negative thoughts",
-                    "Building resilience through positivity",
-                    "Social connection",
-                    "Creative problem solving"
-                ],
-                "sample_responses": [
-                    "Hey there, sunshine! ☀️ Even on cloudy days, you still shine bright. What's one thing that made you smile recently?",
-                    "Life's like a rollercoaster - scary sometimes, but the view from the top is always worth it! 🎢",
-                    "You know what? You're pretty amazing for reaching out. That takes courage, and I'm here to cheer you on! 🎉"
-                ]
-            },
-            
-            "wise_mentor": {
-                "name": "Wise Mentor",
-                "description": "A thoughtful and experienced guide who provides deep insights and reflective questions",
-                "emoji": "🦉",
-                "characteristics": [
-                    "Thoughtful and reflective",
-                    "Asks deep, meaningful questions",
-                    "Provides philosophical insights",
-                    "Guides toward self-discovery",
-                    "Patient with complex emotional processing"
-                ],
-                "communication_style": {
-                    "tone": "thoughtful, wise, contemplative",
-                    "pace": "measured, reflective",
-                    "language": "insightful, philosophical, probing",
-                    "approach": "introspective, growth-oriented"
-                },
-                "specialties": [
-                    "Life purpose and meaning",
-                    "Personal growth and development",
-                    "Relationship insights",
-                    "Existential concerns",
-                    "Values clarification"
-                ],
-                "sample_responses": [
-                    "This challenge you're facing... what might it be trying to teach you about yourself?",
-                    "In the quiet moments between thoughts, what does your inner wisdom tell you about this situation?",
-                    "Sometimes our greatest struggles become our greatest teachers. What lessons are emerging for you?"
-                ]
-            },
-            
-            "practical_helper": {
-                "name": "Practical Helper",
-                "description": "A solution-focused assistant who provides concrete advice and actionable strategies",
-                "emoji": "🛠️",
-                "characteristics": [
-                    "Solution-focused and systematic",
-                    "Provides concrete, actionable advice",
-                    "Organized and structured approach",
-                    "Evidence-based recommendations",
-                    "Clear step-by-step guidance"
-                ],
-                "communication_style": {
-                    "tone": "clear, organized, helpful",
-                    "pace": "systematic, efficient",
-                    "language": "practical, specific, actionable",
-                    "approach": "problem-solving, strategic"
-                },
-                "specialties": [
-                    "Stress management techniques",
-                    "Time management and organization",
-                    "Coping strategy implementation",
-                    "Behavioral change",
-                    "Resource identification"
-                ],
-                "sample_responses": [
-                    "Let's break this down into manageable steps. Here are three specific things you can try today...",
-                    "Based on what you've shared, I recommend this evidence-based approach: [specific strategy]",
-                    "Here's a practical plan we can implement: Step 1... Step 2... Step 3..."
-                ]
-            }
-        }
-    
     def get_available_modes(self) -> Dict[str, Dict[str, Any]]:
         """Get all available personality modes"""
         return self.personality_modes
     
-    def get_current_mode(self) -> str:
-        """Get current personality mode"""
-        return self.current_mode
-    
-    def set_mode(self, mode: str) -> bool:
+    def is_valid_mode(self, mode: str) -> bool:
         """
-        Set the current personality mode
+        Check whether a personality mode exists
         
         Args:
-            mode: Personality mode to set
+            mode: Personality mode to check
             
         Returns:
-            True if successful, False if mode doesn't exist
+            True if the mode exists, False otherwise
         """
-        if mode in self.personality_modes:
-            self.current_mode = mode
-            print(f"✅ Personality mode set to: {mode}")
-            return True
-        else:
-            print(f"❌ Unknown personality mode: {mode}")
-            return False
+        return mode in self.personality_modes
     
     def get_mode_info(self, mode: str = None) -> Dict[str, Any]:
         """
         Get detailed information about a personality mode
         
         Args:
-            mode: Mode to get info for (current mode if None)
+            mode: Mode to get info for (default mode if None)
             
         Returns:
             Mode information dictionary
         """
-        target_mode = mode or self.current_mode
+        target_mode = mode or self.default_mode
         
-        if target_mode in self.personality_modes:
-            return self.personality_modes[target_mode]
-        else:
-            return {"error": f"Mode '{target_mode}' not found"}
+        mode_info = self.personality_modes.get(target_mode)
+        if mode_info is not None:
+            return mode_info
+        return {"error": f"Mode '{target_mode}' not found"}
     
     def get_mode_prompt_context(self, mode: str = None) -> str:
         """
         Get prompt context for a personality mode
         
         Args:
-            mode: Mode to get context for (current mode if None)
+            mode: Mode to get context for (default mode if None)
             
         Returns:
             Formatted prompt context string
         """
-        target_mode = mode or self.current_mode
-        mode_info = self.get_mode_info(target_mode)
-        
-        if "error" in mode_info:
-            return "Use a balanced, supportive approach."
-        
-        context = f"""
-PERSONALITY MODE: {mode_info['name']} {mode_info['emoji']}
-
-DESCRIPTION: {mode_info['description']}
-
-COMMUNICATION STYLE:
-- Tone: {mode_info['communication_style']['tone']}
-- Pace: {mode_info['communication_style']['pace']}
-- Language: {mode_info['communication_style']['language']}
-- Approach: {mode_info['communication_style']['approach']}
-
-KEY CHARACTERISTICS:
-{chr(10).join(f"- {char}" for char in mode_info['characteristics'])}
-
-SPECIALTIES:
-{chr(10).join(f"- {spec}" for spec in mode_info['specialties'])}
-
-EXAMPLE RESPONSES:
-{chr(10).join(f'"{resp}"' for resp in mode_info['sample_responses'])}
-
-Embody this personality while maintaining professionalism and mental health best practices.
-"""
-        
-        return context.strip()
+        return _MODE_PROMPT_CONTEXTS.get(mode or self.default_mode, _FALLBACK_PROMPT_CONTEXT)
     
     def recommend_mode(self, user_context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -271,81 +354,72 @@ Embody this personality while maintaining professionalism and mental health best
         Returns:
             Recommendation with mode and reasoning
         """
-        try:
-            # Extract context information
-            mood = user_context.get('mood', '')
-            concerns = user_context.get('concerns', [])
-            urgency = user_context.get('urgency', 'low')
-            user_preference = user_context.get('preferred_style', '')
-            sentiment = user_context.get('sentiment', 'neutral')
-            
-            # Scoring system for mode recommendation
-            mode_scores = {}
-            
-            for mode_id, mode_info in self.personality_modes.items():
-                score = 0
-                
-                # Base score
-                score += 1
-                
-                # Mood-based scoring
-                if sentiment == 'negative' or mood in ['sad', 'depressed', 'anxious']:
-                    if mode_id == 'calm_coach':
-                        score += 3
-                    elif mode_id == 'wise_mentor':
-                        score += 2
-                elif sentiment == 'positive':
-                    if mode_id == 'playful_companion':
-                        score += 3
-                    elif mode_id == 'assertive_buddy':
-                        score += 2
-                
-                # Urgency-based scoring
-                if urgency in ['high', 'crisis']:
-                    if mode_id == 'calm_coach':
-                        score += 3
-                    elif mode_id == 'practical_helper':
-                        score += 2
-                
-                # Concern-based scoring
-                for concern in concerns:
-                    specialties = mode_info.get('specialties', [])
-                    for specialty in specialties:
-                        if any(keyword in concern.lower() for keyword in specialty.lower().split()):
-                            score += 1
-                
-                # User preference scoring
-                if user_preference:
-                    if user_preference.lower() in mode_info['name'].lower():
-                        score += 3
-                    elif user_preference.lower() in mode_info['description'].lower():
-                        score += 2
-                
-                mode_scores[mode_id] = score
+        if not isinstance(user_context, dict):
+            return {**_DEFAULT_RECOMMENDATION, "all_scores": dict.fromkeys(_MODE_IDS, 1)}
+        
+        # Extract context information
+        mood = user_context.get('mood', '')
+        concerns = user_context.get('concerns', [])
+        urgency = user_context.get('urgency', 'low')
+        user_preference = user_context.get('preferred_style', '')
+        sentiment = user_context.get('sentiment', 'neutral')
+        
+        # Without any signal every mode scores the base point and the first one wins
+        if not (concerns or mood or user_preference) and sentiment == 'neutral' and urgency == 'low':
+            return {**_DEFAULT_RECOMMENDATION, "all_scores": dict.fromkeys(_MODE_IDS, 1)}
+        
+        # Scoring system for mode recommendation
+        scores = [0] * len(_MODE_IDS)
+        # Method lookups bound once for the scoring loops
+        lower, isdisjoint = str.lower, frozenset.isdisjoint
+        
+        # Specialty keywords found (as substrings) in each concern
+        concern_keywords = []
+        for concern in concerns:
+            concern = lower(concern)
+            concern_keywords.append(frozenset(keyword for keyword in _SPECIALTY_KEYWORDS if keyword in concern))
+        preference = lower(user_preference) if user_preference else ""
+        if sentiment == 'negative' or mood in _NEGATIVE_MOODS:
+            sentiment_bonus = _SENTIMENT_BONUS['negative']
+        else:
+            sentiment_bonus = _SENTIMENT_BONUS.get(sentiment, _NO_BONUS)
+        urgency_bonus = _URGENCY_BONUS.get(urgency, _NO_BONUS)
+        
+        for index in range(len(_MODE_IDS)):
+            # Base score plus mood- and urgency-based scoring
+            score = 1 + sentiment_bonus[index] + urgency_bonus[index]
             
-            # Get the highest scoring mode
-            recommended_mode = max(mode_scores.items(), key=lambda x: x[1])[0]
-            recommended_info = self.personality_modes[recommended_mode]
+            # Concern-based scoring: one point per specialty with a keyword in the concern
+            for found in concern_keywords:
+                for keywords in _MODE_SPECIALTY_KEYWORDS[index]:
+                    if not isdisjoint(keywords, found):
+                        score += 1
             
-            return {
-                "recommended_mode": recommended_mode,
-                "mode_info": recommended_info,
-                "confidence": mode_scores[recommended_mode] / max(mode_scores.values()) if mode_scores.values() else 0,
-                "reasoning": self._generate_recommendation_reasoning(
-                    recommended_mode, recommended_info, user_context
-                ),
-                "all_scores": mode_scores
-            }
+            # User preference scoring
+            if preference:
+                if preference in _MODE_NAME_LOWER[index]:
+                    score += 3
+                elif preference in _MODE_DESC_LOWER[index]:
+                    score += 2
             
-        except Exception as e:
-            print(f"❌ Error recommending mode: {e}")
-            return {
-                "recommended_mode": "calm_coach",
-                "mode_info": self.personality_modes["calm_coach"],
-                "confidence": 0.5,
-                "reasoning": "Default recommendation due to analysis error",
-                "error": str(e)
-            }
+            scores[index] = score
+        
+        # Highest scoring mode (the first one wins ties)
+        best_score = max(scores)
+        recommended_mode = _MODE_IDS[scores.index(best_score)]
+        
+        recommended_info = self.personality_modes[recommended_mode]
+        
+        return {
+            "recommended_mode": recommended_mode,
+            "mode_info": recommended_info,
+            # Relative to the top score, which the recommended mode holds
+            "confidence": 1.0 if best_score else 0,
+            "reasoning": self._generate_recommendation_reasoning(
+                recommended_mode, recommended_info, user_context
+            ),
+            "all_scores": dict(zip(_MODE_IDS, scores))
+        }
     
     def _generate_recommendation_reasoning(self, mode: str, mode_info: Dict[str, Any], 
                                          context: Dict[str, Any]) -> str:
@@ -369,54 +443,36 @@ Embody this personality while maintaining professionalism and mental health best
             reasoning_parts.append("- Your positive mood aligns well with an uplifting, optimistic approach")
         
         # Add mode strengths
-        reasoning_parts.append(f"- This mode specializes in: {', '.join(mode_info['specialties'][:3])}")
+        reasoning_parts.append(_MODE_SPECIALTY_TAIL[mode])
         
         return "\n".join(reasoning_parts)
     
     def get_mode_transition_message(self, from_mode: str, to_mode: str) -> str:
         """Get a friendly message for mode transitions"""
-        from_info = self.personality_modes.get(from_mode, {})
-        to_info = self.personality_modes.get(to_mode, {})
+        message = _TRANSITION_MESSAGES.get((from_mode, to_mode))
+        if message is not None:
+            return message
         
-        if not from_info or not to_info:
-            return f"Switching to {to_info.get('name', to_mode)} mode."
-        
-        return (f"Transitioning from {from_info['name']} {from_info.get('emoji', '')} "
-                f"to {to_info['name']} {to_info.get('emoji', '')} mode. "
-                f"{to_info['description']}")
+        to_info = self.personality_modes.get(to_mode, {})
+        return f"Switching to {to_info.get('name', to_mode)} mode."
     
     def get_personality_stats(self) -> Dict[str, Any]:
         """Get statistics about personality mode usage"""
-        return {
-            "total_modes": len(self.personality_modes),
-            "current_mode": self.current_mode,
-            "available_modes": list(self.personality_modes.keys()),
-            "mode_categories": {
-                "supportive": ["calm_coach", "wise_mentor"],
-                "energetic": ["assertive_buddy", "playful_companion"],
-                "practical": ["practical_helper"]
-            }
-        }
+        return {**_STATIC_STATS, "default_mode": self.default_mode}
     
     def validate_mode_compatibility(self, mode: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
         """Validate if a mode is appropriate for the user context"""
-        try:
-            if mode not in self.personality_modes:
-                return {"compatible": False, "reason": "Mode does not exist"}
-            
-            urgency = user_context.get('urgency', 'low')
-            sentiment = user_context.get('sentiment', 'neutral')
-            
-            # Check for incompatible combinations
-            if urgency == 'crisis' and mode == 'playful_companion':
-                return {
-                    "compatible": False,
-                    "reason": "Playful approach may not be appropriate for crisis situations",
-                    "suggested_alternative": "calm_coach"
-                }
-            
-            return {"compatible": True, "reason": "Mode is appropriate for current context"}
-            
-        except Exception as e:
-            print(f"❌ Error validating mode compatibility: {e}")
+        if not isinstance(mode, str) or mode not in self.personality_modes:
+            return {"compatible": False, "reason": "Mode does not exist"}
+        if not isinstance(user_context, dict):
             return {"compatible": True, "reason": "Default compatibility"}
+        
+        urgency = user_context.get('urgency', 'low')
+        
+        # Check for incompatible combinations
+        incompatibility = _INCOMPATIBLE_MODES.get((urgency, mode)) if isinstance(urgency, str) else None
+        if incompatibility is not None:
+            reason, alternative = incompatibility
+            return {"compatible": False, "reason": reason, "suggested_alternative": alternative}
+        
+        return {"compatible": True, "reason": "Mode is appropriate for current context"}
@@ -0,0 +1,70 @@
+"""
+📋 Request Schemas - Validated JSON bodies for the API endpoints
+
+Each model parses a request body in a single pydantic-core call, so handlers
+read typed attributes instead of checking and fetching fields one by one.
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ChatRequest(BaseModel):
+    """Body of /api/chat and /api/chat/stream"""
+    
+    # Commands read extra fields (category, mood, note, priority, ...) from the body
+    model_config = ConfigDict(extra="allow")
+    
+    message: str
+    personality_mode: str = "calm_coach"
+    language: str = "english"
+
+
+class MoodRequest(BaseModel):
+    """Body of POST /api/mood"""
+    
+    mood: Union[int, float, str]
+    note: Optional[str] = ""
+
+
+class MoodBulkRequest(BaseModel):
+    """Body of POST /api/mood/bulk"""
+    
+    entries: List[Dict[str, Any]]
+
+
+class TaskCreateRequest(BaseModel):
+    """Body of POST /api/tasks"""
+    
+    title: str
+    description: str = ""
+    priority: str = "medium"
+    due_date: Optional[str] = None
+
+
+class ReflectionRequest(BaseModel):
+    """Body of POST /api/memory/reflect"""
+    
+    reflection: str
+    category: str = "general"
+
+
+class RememberRequest(BaseModel):
+    """Body of POST /api/memory/remember"""
+    
+    content: str
+    importance: str = "medium"
+
+
+class PersonalityModeRequest(BaseModel):
+    """Body of POST /api/personality/mode"""
+    
+    mode: str
+
+
+class JournalEntryRequest(BaseModel):
+    """Body of POST /api/journal/start"""
+    
+    userId: str = Field(min_length=1)
+    text: str = Field(min_length=1)
@@ -5,10 +5,220 @@ Manages tasks with a focus on mental health, wellbeing, and gradual progress.
 Integrates with the memory system for persistence and insights.
 """
 
+import functools
+import heapq
 import json
+import random
+import sys
 import uuid
-from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Optional
+from collections import Counter
+from datetime import date, datetime, time, timezone, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+import orjson
+
+
+# Task fields stored in metadata only when set
+_OPTIONAL_TASK_METADATA = ("created_ts", "due_date", "due_ts")
+
+# Non-ISO due date formats accepted by add_task, tried in order
+_DUE_DATE_FORMATS = ('%Y-%m-%d', '%Y-%m-%d %H:%M', '%m/%d/%Y', '%d/%m/%Y')
+
+# fromisoformat reads a trailing 'Z' as UTC from Python 3.11 on
+_HAS_Z_ISO = sys.version_info >= (3, 11)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp, reading naive values as UTC"""
+    parsed = datetime.fromisoformat(value if _HAS_Z_ISO else value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parse_due_date(due_date: str) -> Optional[datetime]:
+    """Parse a due date into an aware datetime, or None if it can't be parsed"""
+    try:
+        # Plain dates are the common case and skip the datetime parser
+        if len(due_date) == 10 and due_date[4] == '-':
+            return datetime.combine(date.fromisoformat(due_date), time(), timezone.utc)
+        return _parse_timestamp(due_date)
+    except (ValueError, AttributeError):
+        pass
+    
+    # Fall back to common date formats
+    for fmt in _DUE_DATE_FORMATS:
+        try:
+            return datetime.strptime(due_date, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def _task_epoch(task: Dict[str, Any], epoch_key: str, iso_key: str) -> Optional[float]:
+    """POSIX time stored on a task, parsed from the ISO field for tasks saved without it"""
+    epoch = task.get(epoch_key)
+    if epoch is None and task.get(iso_key):
+        epoch = _parse_timestamp(task[iso_key]).timestamp()
+    return epoch
+
+
+# Common wellness-related tags and the keywords that mark them
+_TAG_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("exercise", ("exercise", "workout", "gym", "run", "walk", "bike")),
+    ("meditation", ("meditate", "mindfulness", "breathe", "calm")),
+    ("social", ("call", "meet", "friend", "family", "visit")),
+    ("creative", ("draw", "write", "paint", "music", "create")),
+    ("learning", ("study", "learn", "read", "course", "skill")),
+    ("health", ("doctor", "appointment", "medicine", "therapy")),
+    ("urgent", ("urgent", "asap", "deadline", "important")),
+    ("relaxing", ("relax", "rest", "sleep", "break", "vacation"))
+)
+
+# Keywords of high and low effort tasks
+_HIGH_EFFORT_KEYWORDS = ("project", "complete", "finish", "major", "big", "complex")
+_LOW_EFFORT_KEYWORDS = ("quick", "simple", "easy", "call", "email", "check")
+
+
+@functools.lru_cache(maxsize=2048)
+def _tags_for_text(text: str) -> Tuple[str, ...]:
+    """Wellness tags of a task text, memoized since recurring tasks repeat their text"""
+    text_lower = text.lower()
+    # Keywords match inside words too, so "walking" and "friends" still count
+    return tuple(
+        tag for tag, keywords in _TAG_KEYWORDS
+        if any(keyword in text_lower for keyword in keywords)
+    )
+
+
+@functools.lru_cache(maxsize=2048)
+def _effort_for_text(text: str) -> str:
+    """Effort level of a task text, memoized like _tags_for_text"""
+    text = text.lower()
+    
+    if any(keyword in text for keyword in _HIGH_EFFORT_KEYWORDS):
+        return "high"
+    elif any(keyword in text for keyword in _LOW_EFFORT_KEYWORDS):
+        return "low"
+    else:
+        return "medium"
+
+
+# Category-specific wellness suggestions for a new task
+_CATEGORY_SUGGESTIONS: Dict[str, Tuple[str, ...]] = {
+    "self_care": (
+        "Set a peaceful environment before starting",
+        "Practice self-compassion throughout",
+        "Celebrate completing this self-care activity"
+    ),
+    "work": (
+        "Take breaks every hour",
+        "Practice deep breathing if you feel stressed",
+        "Remember that your worth isn't tied to productivity"
+    ),
+    "exercise": (
+        "Start slowly and listen to your body",
+        "Focus on how movement makes you feel",
+        "Celebrate any movement, no matter how small"
+    ),
+    "social": (
+        "Be present and engaged",
+        "Practice active listening",
+        "It's okay if social interactions feel challenging"
+    )
+}
+# Suggestions added after the category's for a wellness impact
+_IMPACT_SUGGESTIONS: Dict[str, Tuple[str, ...]] = {
+    "challenging": (
+        "Break this task into smaller, manageable steps",
+        "Plan a self-care activity for after completion",
+        "Remember it's okay to ask for help"
+    ),
+    "positive": (
+        "Savor the positive feelings this task brings",
+        "Notice how accomplishing this improves your mood"
+    )
+}
+
+# Motivational message for a new task, by category
+_MOTIVATIONAL_MESSAGES: Dict[str, str] = {
+    'self_care': "🌸 Taking care of yourself is not selfish—it's essential!",
+    'exercise': "💪 Every step counts towards a healthier, happier you!",
+    'social': "🤝 Connection is a fundamental human need. Great choice!",
+    'mindfulness': "🧘‍♀️ A few moments of mindfulness can transform your entire day.",
+    'creative': "🎨 Creativity feeds the soul. Enjoy this creative journey!",
+    'work': "⭐ Approach this with intention and remember to take breaks.",
+    'learning': "📚 Learning is growing. Your mind will thank you!",
+    'health': "❤️ Prioritizing your health is an act of self-love."
+}
+_DEFAULT_MOTIVATION = "🌟 You've got this! Every task completed is progress made."
+_URGENT_ENCOURAGEMENT = " Remember to breathe and take it one step at a time."
+_CHALLENGING_ENCOURAGEMENT = " Be gentle with yourself as you work on this."
+
+# Celebration templates for a completed task, formatted with its title
+_CELEBRATIONS = (
+    "🎉 Fantastic! You completed '{}'! Take a moment to appreciate your accomplishment.",
+    "✨ Well done! Finishing '{}' shows your dedication and strength.",
+    "🏆 Awesome job completing '{}'! You're making great progress.",
+    "🌟 Congratulations on finishing '{}'! Your effort is paying off.",
+    "💪 You did it! '{}' is complete. Feel proud of your achievement!"
+)
+# Added to a celebration for these categories
+_CELEBRATION_SUFFIXES: Dict[str, str] = {
+    'self_care': " Your future self will thank you for this self-care! 💖",
+    'exercise': " Your body and mind are stronger for it! 💪",
+    'social': " Connection and relationships matter so much! 🤗"
+}
+
+# Wellness tip for a task, by category
+_WELLNESS_TIPS: Dict[str, str] = {
+    'work': "Remember: You are not your productivity. Take breaks and be kind to yourself.",
+    'self_care': "Self-care isn't selfish—it's how you show up better for everything else.",
+    'exercise': "Listen to your body. The goal is to feel good, not to punish yourself.",
+    'social': "Quality over quantity. One meaningful connection is worth more than many shallow ones.",
+    'mindfulness': "Start small. Even 3 minutes of mindfulness can shift your entire day.",
+    'creative': "There's no wrong way to be creative. Enjoy the process, not just the outcome.",
+    'health': "Small, consistent actions in health create the biggest transformations.",
+    'learning': "Learning is a gift you give yourself. Be patient with the process."
+}
+_DEFAULT_WELLNESS_TIP = "Remember to be patient and kind with yourself through this task. 🌸"
+
+# Daily wellness task ideas, by area
+_DAILY_SUGGESTIONS: Dict[str, Tuple[str, ...]] = {
+    "self_care": (
+        "Take 5 deep breaths mindfully",
+        "Write down 3 things you're grateful for",
+        "Do something kind for yourself"
+    ),
+    "movement": (
+        "Take a 10-minute walk",
+        "Do gentle stretches",
+        "Dance to your favorite song"
+    ),
+    "connection": (
+        "Text a friend to check in",
+        "Call a family member",
+        "Smile at a stranger"
+    ),
+    "mindfulness": (
+        "Practice 5 minutes of meditation",
+        "Eat one meal mindfully",
+        "Notice 5 things you can see, 4 you can hear, 3 you can touch"
+    ),
+    "creativity": (
+        "Doodle or draw for 10 minutes",
+        "Write in a journal",
+        "Try a new recipe"
+    )
+}
+# Areas put first for a mood, in order
+_MOOD_PRIORITY_AREAS: Dict[str, Tuple[str, str]] = {
+    'stressed': ("mindfulness", "self_care"),
+    'anxious': ("mindfulness", "self_care"),
+    'sad': ("connection", "movement"),
+    'lonely': ("connection", "movement"),
+    'bored': ("creativity", "movement"),
+    'restless': ("creativity", "movement")
+}
+_DAILY_TIP = "Pick just 1-2 activities that feel good to you today. Small actions create big changes! 🌱"
 
 
 class TaskManager:
@@ -30,6 +240,8 @@ class TaskManager:
             "high": 3,
             "urgent": 4
         }
+        # Sort key per priority, most urgent first
+        self._priority_sort_key = {name: -level for name, level in self.priority_levels.items()}
         
         # Task categories focused on mental wellness
         self.task_categories = {
@@ -45,6 +257,19 @@ class TaskManager:
             "household": "Home and daily maintenance"
         }
         
+        # Decoded tasks by id, with the stored document they were decoded from
+        self._decoded_tasks: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        
+        # Wellness suggestions of every known category and wellness impact
+        self._suggestions_table = {
+            (category, impact): tuple(self._build_wellness_suggestions(category, impact))
+            for category in self.task_categories
+            for impact in ("positive", "neutral", "challenging")
+        }
+        
+        # Date-window queries filter on epoch metadata, which older tasks lack
+        self._backfill_task_epochs()
+        
         print("✅ Task Manager initialized successfully")
     
     def add_task(self, title: str, description: str = "", priority: str = "medium", 
@@ -67,21 +292,13 @@ class TaskManager:
         try:
             # Generate task ID
             task_id = str(uuid.uuid4())
-            timestamp = datetime.now(timezone.utc).isoformat()
+            created = datetime.now(timezone.utc)
             
             # Validate and process due date
-            parsed_due_date = None
-            if due_date:
-                try:
-                    parsed_due_date = datetime.fromisoformat(due_date.replace('Z', '+00:00')).isoformat()
-                except (ValueError, AttributeError):
-                    # Try parsing common date formats
-                    for fmt in ['%Y-%m-%d', '%Y-%m-%d %H:%M', '%m/%d/%Y', '%d/%m/%Y']:
-                        try:
-                            parsed_due_date = datetime.strptime(due_date, fmt).replace(tzinfo=timezone.utc).isoformat()
-                            break
-                        except ValueError:
-                            continue
+            parsed_due_date = _parse_due_date(due_date) if due_date else None
+            
+            # Keywords never contain spaces, so an empty description adds nothing to scan
+            task_text = title + " " + description if description else title
             
             # Create task object
             task = {
@@ -92,10 +309,12 @@ class TaskManager:
                 "category": category if category in self.task_categories else "personal",
                 "wellness_impact": wellness_impact,
                 "status": "pending",
-                "created_at": timestamp,
-                "due_date": parsed_due_date,
+                "created_at": created.isoformat(),
+                "created_ts": created.timestamp(),
+                "due_date": parsed_due_date.isoformat() if parsed_due_date else None,
+                "due_ts": parsed_due_date.timestamp() if parsed_due_date else None,
                 "completed_at": None,
-                "tags": self._extract_tags(title + " " + description),
+                "tags": self._extract_tags(task_text),
                 "estimated_effort": self._estimate_effort(title, description),
                 "wellness_suggestions": self._generate_wellness_suggestions(category, wellness_impact)
             }
@@ -119,109 +338,37 @@ class TaskManager:
     
     def _extract_tags(self, text: str) -> List[str]:
         """Extract relevant tags from task text"""
-        text_lower = text.lower()
-        
-        # Common wellness-related tags
-        tag_keywords = {
-            "exercise": ["exercise", "workout", "gym", "run", "walk", "bike"],
-            "meditation": ["meditate", "mindfulness", "breathe", "calm"],
-            "social": ["call", "meet", "friend", "family", "visit"],
-            "creative": ["draw", "write", "paint", "music", "create"],
-            "learning": ["study", "learn", "read", "course", "skill"],
-            "health": ["doctor", "appointment", "medicine", "therapy"],
-            "urgent": ["urgent", "asap", "deadline", "important"],
-            "relaxing": ["relax", "rest", "sleep", "break", "vacation"]
-        }
-        
-        tags = []
-        for tag, keywords in tag_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                tags.append(tag)
-        
-        return tags
+        return list(_tags_for_text(text))
     
     def _estimate_effort(self, title: str, description: str) -> str:
         """Estimate effort level for task"""
-        text = (title + " " + description).lower()
-        
-        # High effort keywords
-        high_effort_keywords = ["project", "complete", "finish", "major", "big", "complex"]
-        
-        # Low effort keywords  
-        low_effort_keywords = ["quick", "simple", "easy", "call", "email", "check"]
-        
-        if any(keyword in text for keyword in high_effort_keywords):
-            return "high"
-        elif any(keyword in text for keyword in low_effort_keywords):
-            return "low"
-        else:
-            return "medium"
+        return _effort_for_text(title + " " + description if description else title)
     
     def _generate_wellness_suggestions(self, category: str, wellness_impact: str) -> List[str]:
         """Generate wellness suggestions for the task"""
-        suggestions = []
-        
-        # Category-specific suggestions
-        category_suggestions = {
-            "self_care": [
-                "Set a peaceful environment before starting",
-                "Practice self-compassion throughout",
-                "Celebrate completing this self-care activity"
-            ],
-            "work": [
-                "Take breaks every hour",
-                "Practice deep breathing if you feel stressed",
-                "Remember that your worth isn't tied to productivity"
-            ],
-            "exercise": [
-                "Start slowly and listen to your body",
-                "Focus on how movement makes you feel",
-                "Celebrate any movement, no matter how small"
-            ],
-            "social": [
-                "Be present and engaged",
-                "Practice active listening",
-                "It's okay if social interactions feel challenging"
-            ]
-        }
-        
-        suggestions.extend(category_suggestions.get(category, []))
-        
-        # Wellness impact suggestions
-        if wellness_impact == "challenging":
-            suggestions.extend([
-                "Break this task into smaller, manageable steps",
-                "Plan a self-care activity for after completion",
-                "Remember it's okay to ask for help"
-            ])
-        elif wellness_impact == "positive":
-            suggestions.extend([
-                "Savor the positive feelings this task brings",
-                "Notice how accomplishing this improves your mood"
-            ])
+        suggestions = self._suggestions_table.get((category, wellness_impact))
+        if suggestions is not None:
+            return list(suggestions)
+        return self._build_wellness_suggestions(category, wellness_impact)
+    
+    def _build_wellness_suggestions(self, category: str, wellness_impact: str) -> List[str]:
+        """Build the wellness suggestions for a category and wellness impact"""
+        # Category-specific suggestions come first; only the top 3 are kept
+        suggestions = _CATEGORY_SUGGESTIONS.get(category, ())
+        if len(suggestions) >= 3:
+            return list(suggestions[:3])
         
-        return suggestions[:3]  # Return top 3 suggestions
+        # Wellness impact suggestions fill the rest
+        return list((suggestions + _IMPACT_SUGGESTIONS.get(wellness_impact, ()))[:3])
     
     def _save_task_to_memory(self, task: Dict[str, Any]):
         """Save task to ChromaDB memory"""
         try:
-            # Prepare content for storage
-            content = json.dumps(task, indent=2)
-            
-            metadata = {
-                "id": task["id"],
-                "type": "task",
-                "status": task["status"],
-                "priority": task["priority"],
-                "category": task["category"],
-                "created_at": task["created_at"],
-                "due_date": task.get("due_date"),
-                "wellness_impact": task["wellness_impact"]
-            }
+            # Prepare content for storage (compact JSON)
+            content = orjson.dumps(task).decode()
+            
+            metadata = self._build_task_metadata(task)
             
-            # Clean metadata to remove None values
-            metadata = {k: v for k, v in metadata.items() if v is not None}
-
             # Use a collection specifically for tasks (we'll create it in memory manager)
             # For now, use the important_memories collection
             self.memory_manager.important_memories_collection.add(
@@ -235,38 +382,73 @@ class TaskManager:
         except Exception as e:
             print(f"❌ Error saving task to memory: {e}")
     
-    def get_all_tasks(self, status: str = None, category: str = None) -> List[Dict[str, Any]]:
-        """Get all tasks, optionally filtered by status or category"""
+    def _build_task_metadata(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the Chroma metadata stored with a task"""
+        metadata = {
+            "id": task["id"],
+            "type": "task",
+            "status": task["status"],
+            "priority": task["priority"],
+            "category": task["category"],
+            "created_at": task["created_at"],
+            "wellness_impact": task["wellness_impact"]
+        }
+        
+        # Chroma rejects None values, so unset fields are left out
+        for key in _OPTIONAL_TASK_METADATA:
+            value = task.get(key)
+            if value is not None:
+                metadata[key] = value
+        
+        return metadata
+    
+    def get_all_tasks(self, status: str = None, category: str = None,
+                      fields_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get all tasks, optionally filtered by status or category
+        
+        With fields_only, tasks are returned as their stored metadata (status,
+        priority, category, dates and wellness impact) without decoding the
+        full documents.
+        """
+        # Build filter criteria
+        conditions = [{"type": "task"}]
+        
+        if status:
+            conditions.append({"status": status})
+        
+        if category:
+            conditions.append({"category": category})
+        
+        return self._query_tasks(conditions, fields_only)
+    
+    def _query_tasks(self, conditions: List[Dict[str, Any]],
+                     fields_only: bool = False) -> List[Dict[str, Any]]:
+        """Get the tasks whose metadata matches every condition, sorted by priority and due date"""
         try:
-            # Build filter criteria
-            where_filter = {"type": "task"}
-            
-            if status:
-                where_filter["status"] = status
-            
-            if category:
-                where_filter["category"] = category
+            # Chroma takes a single condition as is and several under $and
+            where_filter = conditions[0] if len(conditions) == 1 else {"$and": conditions}
             
             # Query tasks from memory
             results = self.memory_manager.important_memories_collection.get(
                 where=where_filter,
-                include=["documents", "metadatas"]
+                include=["metadatas"] if fields_only else ["documents"]
             )
             
             tasks = []
-            if results['documents']:
-                for i, doc in enumerate(results['documents']):
-                    try:
-                        task = json.loads(doc)
+            if fields_only:
+                tasks = results['metadatas'] or []
+            elif results['documents']:
+                for task_id, doc in zip(results['ids'], results['documents']):
+                    task = self._decode_task(task_id, doc)
+                    if task is not None:
                         tasks.append(task)
-                    except json.JSONDecodeError as e:
-                        print(f"❌ Error parsing task: {e}")
-                        continue
             
             # Sort tasks by priority and due date
+            priority_sort_key = self._priority_sort_key
             tasks.sort(key=lambda t: (
-                -self.priority_levels.get(t.get('priority', 'medium'), 2),
-                t.get('due_date', '9999-12-31')
+                priority_sort_key.get(t.get('priority'), -2),
+                t.get('due_date') or '9999-12-31'
             ))
             
             return tasks
@@ -275,12 +457,53 @@ class TaskManager:
             print(f"❌ Error getting tasks: {e}")
             return []
     
+    def _decode_task(self, task_id: str, doc: str) -> Optional[Dict[str, Any]]:
+        """Decode a stored task document, or None if it isn't valid JSON"""
+        # Reuse the decoded task while its stored document is unchanged
+        cached = self._decoded_tasks.get(task_id)
+        if cached is not None and cached[0] == doc:
+            return dict(cached[1])
+        try:
+            task = json.loads(doc)
+        except json.JSONDecodeError as e:
+            print(f"❌ Error parsing task: {e}")
+            return None
+        self._decoded_tasks[task_id] = (doc, task)
+        return dict(task)
+    
+    def _backfill_task_epochs(self):
+        """Add created_ts/due_ts metadata to tasks saved before it was stored"""
+        try:
+            collection = self.memory_manager.important_memories_collection
+            results = collection.get(where={"type": "task"}, include=["metadatas"])
+            
+            ids, metadatas = [], []
+            for task_id, metadata in zip(results['ids'], results['metadatas']):
+                if "created_ts" in metadata:
+                    continue
+                metadata = dict(metadata, created_ts=_parse_timestamp(metadata["created_at"]).timestamp())
+                if metadata.get("due_date"):
+                    metadata["due_ts"] = _parse_timestamp(metadata["due_date"]).timestamp()
+                ids.append(task_id)
+                metadatas.append(metadata)
+            
+            if ids:
+                collection.update(ids=ids, metadatas=metadatas)
+                print(f"✅ Backfilled task timestamps: {len(ids)} tasks")
+                
+        except Exception as e:
+            print(f"❌ Error backfilling task timestamps: {e}")
+    
     def update_task(self, task_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
         """Update an existing task"""
         try:
-            # Get existing task
-            existing_tasks = self.get_all_tasks()
-            task = next((t for t in existing_tasks if t['id'] == task_id), None)
+            # Get existing task by id
+            results = self.memory_manager.important_memories_collection.get(
+                ids=[task_id],
+                where={"type": "task"},
+                include=["documents"]
+            )
+            task = self._decode_task(task_id, results['documents'][0]) if results['documents'] else None
             
             if not task:
                 return {"success": False, "error": "Task not found"}
@@ -289,14 +512,25 @@ class TaskManager:
             allowed_updates = ['title', 'description', 'priority', 'category', 'status', 
                              'due_date', 'wellness_impact']
             
+            now = datetime.now(timezone.utc).isoformat()
             for key, value in updates.items():
                 if key in allowed_updates:
                     if key == 'status' and value == 'completed' and task['status'] != 'completed':
-                        task['completed_at'] = datetime.now(timezone.utc).isoformat()
+                        task['completed_at'] = now
+                    if key == 'due_date':
+                        # Normalized like in add_task, keeping due_ts in step
+                        due = _parse_due_date(value) if value else None
+                        value = due.isoformat() if due else None
+                        task['due_ts'] = due.timestamp() if due else None
                     task[key] = value
             
+            # Tasks saved before epochs were stored get them on their next write
+            task['created_ts'] = _task_epoch(task, 'created_ts', 'created_at')
+            if 'due_ts' not in task:
+                task['due_ts'] = _task_epoch(task, 'due_ts', 'due_date')
+            
             # Update last modified timestamp
-            task['updated_at'] = datetime.now(timezone.utc).isoformat()
+            task['updated_at'] = now
             
             # Save updated task
             self._update_task_in_memory(task)
@@ -319,21 +553,9 @@ class TaskManager:
     def _update_task_in_memory(self, task: Dict[str, Any]):
         """Update task in ChromaDB memory"""
         try:
-            content = json.dumps(task, indent=2)
-            
-            metadata = {
-                "id": task["id"],
-                "type": "task",
-                "status": task["status"],
-                "priority": task["priority"],
-                "category": task["category"],
-                "created_at": task["created_at"],
-                "due_date": task.get("due_date"),
-                "wellness_impact": task["wellness_impact"]
-            }
+            content = orjson.dumps(task).decode()
             
-            # Clean metadata to remove None values
-            metadata = {k: v for k, v in metadata.items() if v is not None}
+            metadata = self._build_task_metadata(task)
             
             # Update in memory
             self.memory_manager.important_memories_collection.update(
@@ -352,6 +574,7 @@ class TaskManager:
         try:
             # Delete from memory
             self.memory_manager.important_memories_collection.delete(ids=[task_id])
+            self._decoded_tasks.pop(task_id, None)
             
             print(f"✅ Task deleted: {task_id}")
             return True
@@ -363,17 +586,14 @@ class TaskManager:
     def get_task_analytics(self, days: int = 30) -> Dict[str, Any]:
         """Get task completion analytics"""
         try:
-            tasks = self.get_all_tasks()
-            
-            # Filter tasks from the specified period
+            # Tasks from the specified period
             end_date = datetime.now(timezone.utc)
             start_date = end_date - timedelta(days=days)
-            
-            period_tasks = []
-            for task in tasks:
-                created_at = datetime.fromisoformat(task['created_at'].replace('Z', '+00:00'))
-                if created_at >= start_date:
-                    period_tasks.append(task)
+            # The counted fields are all in the metadata, so documents aren't decoded
+            period_tasks = self._query_tasks([
+                {"type": "task"},
+                {"created_ts": {"$gte": start_date.timestamp()}}
+            ], fields_only=True)
             
             if not period_tasks:
                 return {
@@ -382,39 +602,40 @@ class TaskManager:
                     "message": "No tasks found for this period"
                 }
             
-            # Calculate analytics
+            # Count each distinct (category, priority, impact, completed) combination in C,
+            # then fold the few combinations into the per-field breakdowns
             total_tasks = len(period_tasks)
-            completed_tasks = [t for t in period_tasks if t['status'] == 'completed']
-            completion_rate = len(completed_tasks) / total_tasks if total_tasks > 0 else 0
-            
-            # Category breakdown
-            category_counts = {}
-            for task in period_tasks:
-                category = task.get('category', 'personal')
-                category_counts[category] = category_counts.get(category, 0) + 1
-            
-            # Priority breakdown
-            priority_counts = {}
-            for task in period_tasks:
-                priority = task.get('priority', 'medium')
-                priority_counts[priority] = priority_counts.get(priority, 0) + 1
-            
-            # Wellness impact analysis
-            wellness_impact_counts = {}
-            for task in period_tasks:
-                impact = task.get('wellness_impact', 'neutral')
-                wellness_impact_counts[impact] = wellness_impact_counts.get(impact, 0) + 1
+            combinations = Counter([
+                (task.get('category', 'personal'), task.get('priority', 'medium'),
+                 task.get('wellness_impact', 'neutral'), task['status'] == 'completed')
+                for task in period_tasks
+            ])
+            category_counts, priority_counts, wellness_impact_counts = Counter(), Counter(), Counter()
+            completed_count = positive_completed_count = 0
+            for (category, priority, impact, completed), count in combinations.items():
+                category_counts[category] += count
+                priority_counts[priority] += count
+                wellness_impact_counts[impact] += count
+                if completed:
+                    completed_count += count
+                    if impact == 'positive':
+                        positive_completed_count += count
+            completion_rate = completed_count / total_tasks
             
             analytics = {
                 "period": f"Last {days} days",
                 "total_tasks": total_tasks,
-                "completed_tasks": len(completed_tasks),
+                "completed_tasks": completed_count,
                 "completion_rate": completion_rate,
-                "category_breakdown": category_counts,
-                "priority_breakdown": priority_counts,
-                "wellness_impact_breakdown": wellness_impact_counts,
-                "insights": self._generate_task_insights(period_tasks, completed_tasks),
-                "recommendations": self._generate_task_recommendations(period_tasks, completion_rate)
+                "category_breakdown": dict(category_counts),
+                "priority_breakdown": dict(priority_counts),
+                "wellness_impact_breakdown": dict(wellness_impact_counts),
+                "insights": self._generate_task_insights(
+                    completion_rate, category_counts, positive_completed_count
+                ),
+                "recommendations": self._generate_task_recommendations(
+                    total_tasks, completion_rate, category_counts
+                )
             }
             
             return analytics
@@ -423,13 +644,12 @@ class TaskManager:
             print(f"❌ Error generating task analytics: {e}")
             return {"error": str(e)}
     
-    def _generate_task_insights(self, all_tasks: List[Dict], completed_tasks: List[Dict]) -> List[str]:
-        """Generate insights from task data"""
+    def _generate_task_insights(self, completion_rate: float, category_counts: Dict[str, int],
+                                positive_completed_count: int) -> List[str]:
+        """Generate insights from task counts"""
         insights = []
         
         try:
-            completion_rate = len(completed_tasks) / len(all_tasks) if all_tasks else 0
-            
             # Completion rate insights
             if completion_rate >= 0.8:
                 insights.append("🏆 Excellent! You're completing most of your tasks.")
@@ -441,19 +661,13 @@ class TaskManager:
                 insights.append("💪 Consider breaking larger tasks into smaller, more manageable steps.")
             
             # Category insights
-            category_counts = {}
-            for task in all_tasks:
-                category = task.get('category', 'personal')
-                category_counts[category] = category_counts.get(category, 0) + 1
-            
             if category_counts:
                 most_common_category = max(category_counts.items(), key=lambda x: x[1])[0]
                 insights.append(f"📊 Your most common task category is '{most_common_category}'.")
             
             # Wellness impact insights
-            positive_wellness_tasks = [t for t in completed_tasks if t.get('wellness_impact') == 'positive']
-            if positive_wellness_tasks:
-                insights.append(f"🌟 You completed {len(positive_wellness_tasks)} wellness-positive tasks!")
+            if positive_completed_count:
+                insights.append(f"🌟 You completed {positive_completed_count} wellness-positive tasks!")
             
             return insights
             
@@ -461,7 +675,8 @@ class TaskManager:
             print(f"❌ Error generating task insights: {e}")
             return ["Unable to generate insights from current task data."]
     
-    def _generate_task_recommendations(self, tasks: List[Dict], completion_rate: float) -> List[str]:
+    def _generate_task_recommendations(self, total_tasks: int, completion_rate: float,
+                                       category_counts: Dict[str, int]) -> List[str]:
         """Generate task management recommendations"""
         recommendations = []
         
@@ -475,13 +690,7 @@ class TaskManager:
                 ])
             
             # Category balance recommendations
-            category_counts = {}
-            for task in tasks:
-                category = task.get('category', 'personal')
-                category_counts[category] = category_counts.get(category, 0) + 1
-            
             self_care_count = category_counts.get('self_care', 0)
-            total_tasks = len(tasks)
             
             if total_tasks > 0 and self_care_count / total_tasks < 0.2:
                 recommendations.append("Consider adding more self-care tasks to maintain balance")
@@ -505,89 +714,53 @@ class TaskManager:
         wellness_impact = task.get('wellness_impact', 'neutral')
         priority = task.get('priority', 'medium')
         
-        motivational_messages = {
-            'self_care': "🌸 Taking care of yourself is not selfish—it's essential!",
-            'exercise': "💪 Every step counts towards a healthier, happier you!",
-            'social': "🤝 Connection is a fundamental human need. Great choice!",
-            'mindfulness': "🧘‍♀️ A few moments of mindfulness can transform your entire day.",
-            'creative': "🎨 Creativity feeds the soul. Enjoy this creative journey!",
-            'work': "⭐ Approach this with intention and remember to take breaks.",
-            'learning': "📚 Learning is growing. Your mind will thank you!",
-            'health': "❤️ Prioritizing your health is an act of self-love."
-        }
-        
-        base_message = motivational_messages.get(category, "🌟 You've got this! Every task completed is progress made.")
+        base_message = _MOTIVATIONAL_MESSAGES.get(category, _DEFAULT_MOTIVATION)
         
         # Add priority-specific encouragement
         if priority == 'urgent':
-            base_message += " Remember to breathe and take it one step at a time."
+            base_message += _URGENT_ENCOURAGEMENT
         elif wellness_impact == 'challenging':
-            base_message += " Be gentle with yourself as you work on this."
+            base_message += _CHALLENGING_ENCOURAGEMENT
         
         return base_message
     
     def _generate_completion_celebration(self, task: Dict[str, Any]) -> str:
         """Generate celebration message for completed task"""
-        celebrations = [
-            "🎉 Fantastic! You completed '{}'! Take a moment to appreciate your accomplishment.",
-            "✨ Well done! Finishing '{}' shows your dedication and strength.",
-            "🏆 Awesome job completing '{}'! You're making great progress.",
-            "🌟 Congratulations on finishing '{}'! Your effort is paying off.",
-            "💪 You did it! '{}' is complete. Feel proud of your achievement!"
-        ]
-        
-        import random
-        celebration = random.choice(celebrations).format(task['title'])
+        celebration = random.choice(_CELEBRATIONS).format(task['title'])
         
         # Add category-specific celebration
-        category = task.get('category', 'personal')
-        if category == 'self_care':
-            celebration += " Your future self will thank you for this self-care! 💖"
-        elif category == 'exercise':
-            celebration += " Your body and mind are stronger for it! 💪"
-        elif category == 'social':
-            celebration += " Connection and relationships matter so much! 🤗"
-        
-        return celebration
+        return celebration + _CELEBRATION_SUFFIXES.get(task.get('category', 'personal'), "")
     
     def _get_wellness_tip_for_task(self, task: Dict[str, Any]) -> str:
         """Get a wellness tip related to the task"""
         category = task.get('category', 'personal')
-        
-        wellness_tips = {
-            'work': "Remember: You are not your productivity. Take breaks and be kind to yourself.",
-            'self_care': "Self-care isn't selfish—it's how you show up better for everything else.",
-            'exercise': "Listen to your body. The goal is to feel good, not to punish yourself.",
-            'social': "Quality over quantity. One meaningful connection is worth more than many shallow ones.",
-            'mindfulness': "Start small. Even 3 minutes of mindfulness can shift your entire day.",
-            'creative': "There's no wrong way to be creative. Enjoy the process, not just the outcome.",
-            'health': "Small, consistent actions in health create the biggest transformations.",
-            'learning': "Learning is a gift you give yourself. Be patient with the process."
-        }
-        
-        return wellness_tips.get(category, "Remember to be patient and kind with yourself through this task. 🌸")
+        return _WELLNESS_TIPS.get(category, _DEFAULT_WELLNESS_TIP)
     
-    def get_upcoming_tasks(self, days: int = 7) -> List[Dict[str, Any]]:
-        """Get tasks due in the next specified days"""
+    def get_upcoming_tasks(self, days: int = 7, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get tasks due in the next specified days, soonest first, at most limit of them"""
         try:
-            all_tasks = self.get_all_tasks(status="pending")
-            
-            end_date = datetime.now(timezone.utc) + timedelta(days=days)
+            now_ts = datetime.now(timezone.utc).timestamp()
+            end_ts = now_ts + timedelta(days=days).total_seconds()
+            candidates = self._query_tasks([
+                {"type": "task"},
+                {"status": "pending"},
+                {"due_ts": {"$lte": end_ts}}
+            ])
             upcoming_tasks = []
             
-            for task in all_tasks:
-                if task.get('due_date'):
-                    try:
-                        due_date = datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
-                        if due_date <= end_date:
-                            # Calculate days until due
-                            days_until_due = (due_date - datetime.now(timezone.utc)).days
-                            task['days_until_due'] = days_until_due
-                            upcoming_tasks.append(task)
-                    except (ValueError, AttributeError):
-                        continue
-            
-            # Sort by due date
+            for task in candidates:
+                # Metadata updates can't drop a key, so a cleared due date leaves a stale due_ts
+                due_ts = _task_epoch(task, 'due_ts', 'due_date')
+                if due_ts is None or due_ts > end_ts:
+                    continue
+                # Calculate whole days until due (negative once overdue)
+                days_until_due = int((due_ts - now_ts) // 86400)
+                task['days_until_due'] = days_until_due
+                upcoming_tasks.append(task)
+            
+            # Sort by due date, only selecting the first few when limited
+            if limit is not None:
+                return heapq.nsmallest(limit, upcoming_tasks, key=lambda t: t['due_date'])
             upcoming_tasks.sort(key=lambda t: t['due_date'])
             
             return upcoming_tasks
@@ -599,48 +772,18 @@ class TaskManager:
     def suggest_daily_tasks(self, user_context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Suggest wellness-focused daily tasks based on user context"""
         try:
-            suggestions = {
-                "self_care": [
-                    "Take 5 deep breaths mindfully",
-                    "Write down 3 things you're grateful for",
-                    "Do something kind for yourself"
-                ],
-                "movement": [
-                    "Take a 10-minute walk",
-                    "Do gentle stretches",
-                    "Dance to your favorite song"
-                ],
-                "connection": [
-                    "Text a friend to check in",
-                    "Call a family member",
-                    "Smile at a stranger"
-                ],
-                "mindfulness": [
-                    "Practice 5 minutes of meditation",
-                    "Eat one meal mindfully",
-                    "Notice 5 things you can see, 4 you can hear, 3 you can touch"
-                ],
-                "creativity": [
-                    "Doodle or draw for 10 minutes",
-                    "Write in a journal",
-                    "Try a new recipe"
-                ]
-            }
+            suggestions = dict(_DAILY_SUGGESTIONS)
             
             # Customize based on user context if provided
             if user_context:
-                mood = user_context.get('mood', '')
-                if mood in ['stressed', 'anxious']:
-                    suggestions['priority'] = suggestions['mindfulness'] + suggestions['self_care']
-                elif mood in ['sad', 'lonely']:
-                    suggestions['priority'] = suggestions['connection'] + suggestions['movement']
-                elif mood in ['bored', 'restless']:
-                    suggestions['priority'] = suggestions['creativity'] + suggestions['movement']
+                areas = _MOOD_PRIORITY_AREAS.get(user_context.get('mood', ''))
+                if areas:
+                    suggestions['priority'] = suggestions[areas[0]] + suggestions[areas[1]]
             
             return {
                 "date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
                 "suggestions": suggestions,
-                "tip": "Pick just 1-2 activities that feel good to you today. Small actions create big changes! 🌱"
+                "tip": _DAILY_TIP
             }
             
         except Exception as e:
@@ -0,0 +1,13 @@
+"""
+🚀 WSGI entry point for production servers
+
+Services are initialized in each worker process, after any fork, so every
+worker opens its own ChromaDB client and embedding cache connection:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from main import app, ensure_services
+
+# Servers without a post-fork hook initialize on the first request instead
+app.before_request(ensure_services)